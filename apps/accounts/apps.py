@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
-    verbose_name = 'Comptes Utilisateurs'
\ No newline at end of file
+    verbose_name = 'Comptes Utilisateurs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,57 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .services import INACTIVE, cache_user, get_cached_user, get_user_version, init_user_version
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sans SELECT sur accounts_user à chaque requête.
+
+    Le compte est lu dans le cache sous (id, version) ; User.save() change
+    la version, si bien qu'une désactivation ou un changement de mot de
+    passe s'applique dès la requête suivante.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    def get_user_version(self, user_id):
+        version = get_user_version(user_id)
+        if version == INACTIVE:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return version
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        version = self.get_user_version(user_id)
+        if version is not None:
+            user = get_cached_user(self.user_model, user_id, version)
+            if user is not None:
+                return user
+
+        user = super().get_user(validated_token)
+        if version is None:
+            version = init_user_version(user.pk)
+        if version is not None:
+            cache_user(user, version)
+        return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Voie rapide des lectures qui n'ont besoin que de l'identifiant :
+    l'utilisateur est construit depuis les claims du token (TokenUser),
+    après la seule vérification de la version (compte actif).
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if self.get_user_version(user_id) is None:
+            # Version inconnue : vérification complète, qui la crée
+            super().get_user(validated_token)
+        return api_settings.TOKEN_USER_CLASS(validated_token)
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.contrib.auth.signals import user_login_failed
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from core.localstore import SharedLocalStore
+from .models import User
+
+SLOTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS slots (
+        id INTEGER PRIMARY KEY,
+        pid INTEGER NOT NULL,
+        started REAL NOT NULL
+    );
+"""
+
+
+class HashingOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Trop de connexions simultanées, réessayez dans un instant.'
+    default_code = 'hashing_overloaded'
+    # Repris par DRF dans l'en-tête Retry-After
+    wait = 1
+
+
+class HashingPool:
+    """
+    Hachage des mots de passe (PBKDF2) à l'écart du trafic ordinaire.
+
+    Le nombre de hachages en cours est borné pour toute la machine par
+    des jetons dans un magasin SQLite partagé par les workers : au-delà,
+    la requête est refusée (503) au lieu d'occuper un worker de plus.
+    Le calcul lui-même passe par un pool de threads par processus
+    (hashlib libère le GIL pendant PBKDF2).
+    """
+
+    def __init__(self):
+        self.store = SharedLocalStore('password_hashing', SLOTS_SCHEMA)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    @property
+    def executor(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.PASSWORD_HASH_WORKERS,
+                        thread_name_prefix='password-hashing'
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def acquire(self):
+        """Prend un jeton, ou None si la limite est atteinte"""
+        now = time.time()
+        with self.store.transaction() as conn:
+            # Jetons d'un worker tué en plein calcul
+            conn.execute('DELETE FROM slots WHERE started < ?', (now - 2 * settings.PASSWORD_HASH_TIMEOUT,))
+            (in_flight,) = conn.execute('SELECT COUNT(*) FROM slots').fetchone()
+            if in_flight >= settings.PASSWORD_HASH_MAX_IN_FLIGHT:
+                return None
+            return conn.execute(
+                'INSERT INTO slots (pid, started) VALUES (?, ?)', (os.getpid(), now)
+            ).lastrowid
+
+    def release(self, slot):
+        self.store.execute('DELETE FROM slots WHERE id = ?', (slot,))
+
+    def submit(self, function, *args):
+        """
+        Planifie function(*args) dans le pool ; HashingOverloaded si saturé.
+        Le jeton est rendu à la fin du calcul, même si l'appelant n'attend plus.
+        """
+        slot = self.acquire()
+        if slot is None:
+            raise HashingOverloaded()
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            self.release(slot)
+            raise
+        future.add_done_callback(lambda _: self.release(slot))
+        return future
+
+    def run(self, function, *args):
+        """Exécute function(*args) dans le pool ; HashingOverloaded si saturé"""
+        future = self.submit(function, *args)
+        try:
+            return future.result(settings.PASSWORD_HASH_TIMEOUT)
+        except TimeoutError:
+            # Retiré de la file s'il n'a pas commencé, sinon le jeton reste pris jusqu'à la fin
+            future.cancel()
+            raise HashingOverloaded()
+
+    async def arun(self, function, *args):
+        """run() pour les vues asynchrones : le calcul est attendu sans occuper de thread"""
+        future = await sync_to_async(self.submit)(function, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), settings.PASSWORD_HASH_TIMEOUT)
+        except TimeoutError:
+            raise HashingOverloaded()
+
+
+hashing_pool = HashingPool()
+
+
+def hash_password(raw_password):
+    """make_password() dans le pool"""
+    return hashing_pool.run(make_password, raw_password)
+
+
+def verify_password(user, raw_password):
+    """
+    user.check_password() dans le pool. Un hash à mettre à niveau
+    (algorithme ou nombre d'itérations) est recalculé puis enregistré.
+    """
+    encoded = user.password
+    if not hashing_pool.run(check_password, raw_password, encoded):
+        return False
+    hasher = identify_hasher(encoded)
+    preferred = get_hasher('default')
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        user.password = hash_password(raw_password)
+        user.save(update_fields=['password'])
+    return True
+
+
+def set_password(user, raw_password):
+    """user.set_password() dans le pool (sans enregistrer)"""
+    user.password = hash_password(raw_password)
+    # Comme set_password() : save() notifiera les validateurs (password_changed)
+    user._password = raw_password
+
+
+def authenticate_user(request, email, password):
+    """
+    Équivalent de authenticate() (ModelBackend) avec le hachage dans le pool.
+    Un email inconnu coûte aussi un hachage (temps de réponse identique).
+    """
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        hash_password(password)
+        user = None
+    if user is not None and verify_password(user, password):
+        return user
+    user_login_failed.send(sender=__name__, credentials={'username': email}, request=request)
+    return None
+
+
+async def ahash_password(raw_password):
+    """hash_password() pour les vues asynchrones"""
+    return await hashing_pool.arun(make_password, raw_password)
+
+
+async def averify_password(user, raw_password):
+    """verify_password() pour les vues asynchrones"""
+    if 'password' in user.get_deferred_fields():
+        # Compte du cache d'authentification : le hash n'est pas chargé, et le
+        # lire sur la boucle d'événements lancerait une requête synchrone
+        await user.arefresh_from_db(fields=['password'])
+    encoded = user.password
+    if not await hashing_pool.arun(check_password, raw_password, encoded):
+        return False
+    hasher = identify_hasher(encoded)
+    preferred = get_hasher('default')
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        user.password = await ahash_password(raw_password)
+        await user.asave(update_fields=['password'])
+    return True
+
+
+async def aset_password(user, raw_password):
+    """set_password() pour les vues asynchrones"""
+    user.password = await ahash_password(raw_password)
+    user._password = raw_password
+
+
+async def aauthenticate_user(request, email, password):
+    """authenticate_user() pour les vues asynchrones"""
+    try:
+        user = await User._default_manager.aget(**{User.USERNAME_FIELD: email})
+    except User.DoesNotExist:
+        await ahash_password(password)
+        user = None
+    if user is not None and await averify_password(user, password):
+        return user
+    await user_login_failed.asend(sender=__name__, credentials={'username': email}, request=request)
+    return None
@@ -0,0 +1,47 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.accounts.revocation import purge_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = 'Supprime les révocations de refresh tokens expirés'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Tourne en continu au lieu de faire un seul passage'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=3600,
+            help='Intervalle en secondes entre deux passages (avec --loop)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Lignes supprimées par DELETE'
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            stop = threading.Event()
+            # Arrêt propre sur SIGTERM/SIGINT : le passage en cours se termine
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+            while not stop.is_set():
+                self.run_once(options['batch_size'])
+                connection.close()
+                stop.wait(options['interval'])
+            return
+
+        self.run_once(options['batch_size'])
+
+    def run_once(self, batch_size):
+        purged = purge_revoked_tokens(batch_size)
+        if purged:
+            self.stdout.write(f'{purged} révocation(s) expirée(s) supprimée(s)')
@@ -0,0 +1,60 @@
+# Generated by Django 5.0 on 2026-10-17 19:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+COPY_BLACKLIST_SQL = """
+    INSERT INTO accounts_revokedtoken (jti, expires_at, revoked_at)
+    SELECT o.jti, o.expires_at, b.blacklisted_at
+    FROM token_blacklist_blacklistedtoken b
+    JOIN token_blacklist_outstandingtoken o ON o.id = b.token_id
+    WHERE o.expires_at > NOW()
+    ON CONFLICT (jti) DO NOTHING
+"""
+
+
+def copy_blacklist(apps, schema_editor):
+    """Reprend les révocations encore valides de token_blacklist (si ses tables existent)"""
+    tables = schema_editor.connection.introspection.table_names()
+    if "token_blacklist_blacklistedtoken" in tables:
+        schema_editor.execute(COPY_BLACKLIST_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0002_user_email_trgm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                (
+                    "jti",
+                    models.CharField(
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="identifiant du token",
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(db_index=True, verbose_name="expiration"),
+                ),
+                (
+                    "revoked_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        verbose_name="révocation",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "token révoqué",
+                "verbose_name_plural": "tokens révoqués",
+            },
+        ),
+        migrations.RunPython(copy_blacklist, migrations.RunPython.noop),
+    ]
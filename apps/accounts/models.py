@@ -1,10 +1,28 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from core.models import TimeStampedModel
+from .services import bump_user_version, forget_user
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    """Requêtes sur les comptes, tenues cohérentes avec le cache d'authentification"""
+    
+    def update(self, **kwargs):
+        """
+        UPDATE en masse (désactivation depuis une action d'admin...) : sans
+        save() ni signal, les comptes modifiés sont retirés du cache ici
+        """
+        with transaction.atomic(using=self.db):
+            user_ids = list(self.values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            for user_id in user_ids:
+                forget_user(user_id)
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Manager personnalisé pour le modèle User"""
     
     def create_user(self, email, password=None, **extra_fields):
@@ -95,6 +113,11 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
         """Retourne le nom complet de l'utilisateur"""
         return f"{self.first_name} {self.last_name}".strip()
     
+    def save(self, *args, **kwargs):
+        """Toute écriture (désactivation, mot de passe...) invalide le compte en cache"""
+        super().save(*args, **kwargs)
+        bump_user_version(self)
+    
     def is_professional(self):
         """Vérifie si l'utilisateur a un compte professionnel"""
         return self.account_type == self.AccountType.PROFESSIONAL
@@ -113,4 +136,23 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
             if not self.cfe_number:
                 raise ValidationError({
                     'cfe_number': _('Le numéro CFE est obligatoire pour un compte professionnel')
-                })
\ No newline at end of file
+                })
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh token révoqué (rotation, déconnexion), conservé jusqu'à son
+    expiration. Lu par clé primaire, derrière le filtre de Bloom de revocation.py.
+    """
+    
+    jti = models.CharField(_('identifiant du token'), max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(_('expiration'), db_index=True)
+    # Sert aux rechargements partiels du filtre de Bloom des workers
+    revoked_at = models.DateTimeField(_('révocation'), default=timezone.now, db_index=True)
+    
+    class Meta:
+        verbose_name = _('token révoqué')
+        verbose_name_plural = _('tokens révoqués')
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .models import RevokedToken
+
+# Changée après chaque révocation : les autres workers rechargent leur filtre
+GENERATION_CACHE_KEY = 'accounts:revoked_tokens:generation'
+
+INSERT_SQL = """
+    INSERT INTO {table} (jti, expires_at, revoked_at)
+    VALUES {values}
+    ON CONFLICT (jti) DO NOTHING
+    RETURNING jti
+"""
+
+
+class RevocationFilter:
+    """
+    Filtre de Bloom des tokens révoqués, en mémoire dans chaque processus.
+
+    Un jti absent du filtre n'est pas révoqué : aucune requête. Un jti
+    présent (révoqué ou faux positif, ~1 %) est confirmé par la clé primaire.
+    Le filtre suit les révocations des autres workers via un numéro de
+    génération en cache ; il est reconstruit périodiquement pour oublier
+    les tokens expirés.
+    """
+
+    HASHES = 7
+    BITS_PER_TOKEN = 10
+    MIN_CAPACITY = 1 << 14
+    REBUILD_INTERVAL = timedelta(hours=1)
+    # Recouvrement des rechargements partiels (révocations horodatées avant leur commit)
+    SYNC_OVERLAP = timedelta(minutes=1)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _reset(self, capacity):
+        self.capacity = capacity
+        self.size = capacity * self.BITS_PER_TOKEN
+        self.bits = bytearray(self.size // 8 + 1)
+        self.count = 0
+
+    def _positions(self, jti):
+        digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.HASHES)]
+
+    def _add(self, jti):
+        for position in self._positions(jti):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def _contains(self, jti):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(jti))
+
+    def _load(self, now, since=None):
+        tokens = RevokedToken.objects.filter(expires_at__gt=now)
+        if since is None:
+            self._reset(max(self.MIN_CAPACITY, 2 * tokens.count()))
+            self._pid = os.getpid()
+            self.built_at = now
+        else:
+            tokens = tokens.filter(revoked_at__gte=since)
+        for jti in tokens.values_list('jti', flat=True).iterator():
+            self._add(jti)
+
+    def sync(self):
+        """Applique les révocations des autres workers depuis le dernier passage"""
+        generation = cache.get(GENERATION_CACHE_KEY)
+        if generation is None:
+            cache.add(GENERATION_CACHE_KEY, time.time_ns(), None)
+            generation = cache.get(GENERATION_CACHE_KEY)
+        now = timezone.now()
+        with self._lock:
+            if (self._pid != os.getpid() or self.count > self.capacity or
+                    now - self.built_at > self.REBUILD_INTERVAL):
+                self._load(now)
+            elif generation is None or generation != self.generation:
+                self._load(now, since=self.synced_at - self.SYNC_OVERLAP)
+            else:
+                return
+            self.generation = generation
+            self.synced_at = now
+
+    def add(self, jtis):
+        with self._lock:
+            if self._pid == os.getpid():
+                for jti in jtis:
+                    self._add(jti)
+
+    def might_contain(self, jti):
+        self.sync()
+        return self._contains(jti)
+
+
+revocation_filter = RevocationFilter()
+
+
+def _bump_generation():
+    # Nouvelle valeur à chaque fois (pas d'incrément perdu entre workers)
+    cache.set(GENERATION_CACHE_KEY, time.time_ns(), None)
+
+
+def is_revoked(jti):
+    """Vrai si le token a été révoqué (requête seulement si le filtre le signale)"""
+    if not revocation_filter.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke_tokens(tokens):
+    """
+    Révoque un lot de tokens [(jti, expiration)] en un seul INSERT.
+    Retourne les jti nouvellement révoqués : un jti déjà présent signale
+    une réutilisation (rotation concurrente ou token volé).
+    """
+    tokens = list(tokens)
+    if not tokens:
+        return set()
+    now = timezone.now()
+    values = ', '.join(['(%s, %s, %s)'] * len(tokens))
+    params = [value for jti, expires_at in tokens for value in (jti, expires_at, now)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(INSERT_SQL.format(table=RevokedToken._meta.db_table, values=values), params)
+        revoked = {row[0] for row in cursor.fetchall()}
+        transaction.on_commit(_bump_generation)
+    revocation_filter.add(revoked)
+    return revoked
+
+
+def purge_revoked_tokens(batch_size=5000, now=None):
+    """Supprime par lots les révocations de tokens expirés. Retourne le nombre supprimé."""
+    now = now or timezone.now()
+    purged = 0
+    while True:
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__lte=now).values_list('jti', flat=True)[:batch_size]
+        )
+        if not jtis:
+            return purged
+        purged += RevokedToken.objects.filter(jti__in=jtis).delete()[0]
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Refresh token vérifié contre les révocations à chaque décodage"""
+
+    @property
+    def jti(self):
+        return self.payload[api_settings.JTI_CLAIM]
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if is_revoked(self.jti):
+            raise TokenError(_('Token is blacklisted'))
+
+    def revoke(self):
+        """Révoque le token ; False s'il l'était déjà"""
+        expires_at = datetime_from_epoch(self.payload['exp'])
+        return self.jti in revoke_tokens([(self.jti, expires_at)])
@@ -1,7 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .hashing import set_password, verify_password
 from .models import User
+from .revocation import RevocableRefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -54,10 +60,18 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
         
-        user = User.objects.create_user(
-            password=password,
-            **validated_data
-        )
+        # Hash déjà calculé par la vue asynchrone (save(encoded_password=...))
+        encoded_password = validated_data.pop('encoded_password', None)
+        
+        # Comme create_user(), avec le hachage dans le pool borné
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        user = User(**validated_data)
+        if encoded_password is None:
+            set_password(user, password)
+        else:
+            user.password = encoded_password
+            user._password = password
+        user.save()
         return user
 
 
@@ -126,8 +140,34 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
     
     def validate_old_password(self, value):
-        """Vérifie l'ancien mot de passe"""
+        """Vérifie l'ancien mot de passe (sauf si la vue asynchrone s'en charge)"""
+        if not self.context.get('verify_old_password', True):
+            return value
         user = self.context['request'].user
-        if not user.check_password(value):
+        if not verify_password(user, value):
             raise serializers.ValidationError('L\'ancien mot de passe est incorrect')
-        return value
\ No newline at end of file
+        return value
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Rafraîchissement avec rotation : l'ancien refresh token est révoqué
+    par un INSERT ... ON CONFLICT DO NOTHING, qui sert aussi de contrôle
+    (deux rafraîchissements concurrents du même token : un seul passe)
+    """
+    
+    token_class = RevocableRefreshToken
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not refresh.revoke():
+                raise InvalidToken(_('Token is blacklisted'))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        
+        return data
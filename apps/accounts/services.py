@@ -0,0 +1,72 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Version d'un compte désactivé : aucune authentification possible
+INACTIVE = 0
+
+
+def user_version_key(user_id):
+    return f'accounts:user:{user_id}:version'
+
+
+def user_entry_key(user_id, version):
+    return f'accounts:user:{user_id}:{version}'
+
+
+def get_user_version(user_id):
+    """Version courante du compte en cache (None si inconnue)"""
+    return cache.get(user_version_key(user_id))
+
+
+def init_user_version(user_id):
+    """
+    Crée la version si elle est absente. Retourne la version créée,
+    ou None si une autre écriture l'a devancée (rien à mettre en cache)
+    """
+    version = time.time_ns()
+    if cache.add(user_version_key(user_id), version, settings.AUTH_USER_CACHE_TIMEOUT):
+        return version
+    return None
+
+
+def bump_user_version(user):
+    """
+    Change la version du compte : les entrées en cache deviennent
+    inaccessibles. Refait après le commit, une lecture concurrente ayant
+    pu mettre en cache l'ancienne ligne sous la version intermédiaire.
+    """
+    def bump():
+        version = time.time_ns() if user.is_active else INACTIVE
+        cache.set(user_version_key(user.pk), version, settings.AUTH_USER_CACHE_TIMEOUT)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def forget_user(user_id):
+    """Compte supprimé : plus de version, les entrées expirent seules"""
+    cache.delete(user_version_key(user_id))
+    transaction.on_commit(lambda: cache.delete(user_version_key(user_id)))
+
+
+def cache_user(user, version):
+    """Colonnes du compte, sans le hash du mot de passe"""
+    fields = {
+        field.attname: field.value_from_object(user)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    }
+    cache.set(user_entry_key(user.pk, version), fields, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def get_cached_user(model, user_id, version):
+    """
+    Compte reconstruit depuis le cache, sans requête ; le mot de passe est
+    un champ différé, chargé seulement si on le lit (changement de mot de passe)
+    """
+    fields = cache.get(user_entry_key(user_id, version))
+    if fields is None:
+        return None
+    return model.from_db(DEFAULT_DB_ALIAS, list(fields), list(fields.values()))
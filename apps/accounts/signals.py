@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import User
+from .services import forget_user
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    """Suppressions unitaires, en masse (admin) ou en cascade : plus d'authentification par le cache"""
+    forget_user(instance.pk)
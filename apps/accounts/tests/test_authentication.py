@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.accounts.models import User
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='cache@example.com',
+            password='testpass123',
+            first_name='Cache',
+            last_name='User'
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def user_queries(self, url, method='get', **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, [q['sql'] for q in queries if 'FROM "accounts_user"' in q['sql']]
+    
+    def test_user_loaded_once(self):
+        url = reverse('accounts:profile')
+        response, queries = self.user_queries(url)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.user_queries(url)
+        self.assertEqual(response.data['email'], 'cache@example.com')
+        self.assertEqual(queries, [])
+    
+    def test_deactivation_is_immediate(self):
+        url = reverse('accounts:profile')
+        self.client.get(url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_bulk_deactivation_and_deletion(self):
+        url = reverse('accounts:profile')
+        self.client.get(url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.client.get(url)
+        # Action « supprimer la sélection » de l'admin : pas de User.delete()
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_password_change_refreshes_cache(self):
+        self.client.get(reverse('accounts:profile'))
+        response = self.client.post(reverse('accounts:change-password'), {
+            'old_password': 'testpass123',
+            'new_password': 'NewSecurePass456!',
+            'new_password_confirm': 'NewSecurePass456!',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('NewSecurePass456!'))
+        response, queries = self.user_queries(reverse('accounts:profile'))
+        self.assertEqual(len(queries), 1)
+    
+    def test_claims_only_reads(self):
+        url = reverse('publications:publication-list')
+        self.user_queries(url)
+        response, queries = self.user_queries(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+        self.assertEqual(response.wsgi_request.user.pk, self.user.pk)
+        
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,156 @@
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.hashing import HashingOverloaded, hashing_pool
+from apps.accounts.models import User
+from apps.accounts.views import ChangePasswordView, LoginView, RegisterView
+
+
+class PasswordHashingPoolTest(APITestCase):
+    def setUp(self):
+        hashing_pool.store.execute('DELETE FROM slots')
+        self.user = User.objects.create_user(
+            email='hash@example.com',
+            password='testpass123',
+            first_name='Hash',
+            last_name='User'
+        )
+    
+    def login(self, password):
+        return self.client.post(reverse('accounts:login'), {
+            'email': 'hash@example.com',
+            'password': password,
+        }, format='json')
+    
+    def test_login_and_register_through_pool(self):
+        self.assertEqual(self.login('testpass123').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login('mauvais').status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        response = self.client.post(reverse('accounts:register'), {
+            'email': 'Nouveau@EXAMPLE.com',
+            'password': 'SecurePass123!',
+            'password_confirm': 'SecurePass123!',
+            'first_name': 'Nouveau',
+            'last_name': 'User',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(User.objects.get(email='Nouveau@example.com').check_password('SecurePass123!'))
+        self.assertEqual(hashing_pool.store.execute('SELECT COUNT(*) FROM slots').fetchone(), (0,))
+    
+    def test_change_password_through_pool(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('accounts:change-password'), {
+            'old_password': 'testpass123',
+            'new_password': 'NewSecurePass456!',
+            'new_password_confirm': 'NewSecurePass456!',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login('NewSecurePass456!').status_code, status.HTTP_200_OK)
+    
+    @override_settings(PASSWORD_HASH_MAX_IN_FLIGHT=0)
+    def test_saturated_pool_returns_503(self):
+        response = self.login('testpass123')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+    
+    @override_settings(PASSWORD_HASH_TIMEOUT=0.5, PASSWORD_HASH_MAX_IN_FLIGHT=1)
+    def test_slot_held_until_hash_finishes(self):
+        done = threading.Event()
+        with self.assertRaises(HashingOverloaded):
+            hashing_pool.run(done.wait, 5)
+        # Le calcul abandonné occupe toujours son jeton
+        self.assertEqual(self.login('testpass123').status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        done.set()
+        for _ in range(100):
+            if hashing_pool.store.execute('SELECT COUNT(*) FROM slots').fetchone() == (0,):
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.login('testpass123').status_code, status.HTTP_200_OK)
+
+
+@override_settings(ASYNC_READS=True)
+class AsyncPasswordViewsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        hashing_pool.store.execute('DELETE FROM slots')
+        self.user = User.objects.create_user(
+            email='async@example.com',
+            password='testpass123',
+            first_name='Async',
+            last_name='User'
+        )
+        self.factory = AsyncRequestFactory()
+    
+    def post(self, view, data, user=None):
+        request = self.factory.post('/', data, content_type='application/json')
+        if user is not None:
+            force_authenticate(request, user)
+        return view.as_view()(request)
+    
+    def test_async_handlers_only_in_async_mode(self):
+        for view in (LoginView, RegisterView, ChangePasswordView):
+            self.assertTrue(iscoroutinefunction(view.as_view()))
+            with self.settings(ASYNC_READS=False):
+                self.assertFalse(iscoroutinefunction(view.as_view()))
+    
+    async def test_login_and_register(self):
+        response = await self.post(LoginView, {'email': 'async@example.com', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = await self.post(LoginView, {'email': 'async@example.com', 'password': 'mauvais'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.post(LoginView, {'email': 'inconnu@example.com', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        response = await self.post(RegisterView, {
+            'email': 'Nouveau@EXAMPLE.com',
+            'password': 'SecurePass123!',
+            'password_confirm': 'SecurePass123!',
+            'first_name': 'Nouveau',
+            'last_name': 'User',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = await User.objects.aget(email='Nouveau@example.com')
+        self.assertTrue(user.check_password('SecurePass123!'))
+        self.assertEqual(hashing_pool.store.execute('SELECT COUNT(*) FROM slots').fetchone(), (0,))
+    
+    async def test_change_password(self):
+        data = {
+            'old_password': 'mauvais',
+            'new_password': 'NewSecurePass456!',
+            'new_password_confirm': 'NewSecurePass456!',
+        }
+        response = await self.post(ChangePasswordView, data, self.user)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('old_password', response.data)
+        
+        response = await self.post(ChangePasswordView, {**data, 'old_password': 'testpass123'}, self.user)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertTrue(user.check_password('NewSecurePass456!'))
+    
+    async def test_change_password_with_cached_account(self):
+        # Compte mis en cache par une requête précédente : mot de passe différé
+        header = f'Bearer {await sync_to_async(AccessToken.for_user)(self.user)}'
+        response = await sync_to_async(self.client.get)(reverse('accounts:profile'), HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        request = self.factory.post('/', {
+            'old_password': 'testpass123',
+            'new_password': 'NewSecurePass456!',
+            'new_password_confirm': 'NewSecurePass456!',
+        }, content_type='application/json', headers={'Authorization': header})
+        response = await ChangePasswordView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertTrue(user.check_password('NewSecurePass456!'))
+    
+    @override_settings(PASSWORD_HASH_MAX_IN_FLIGHT=0)
+    async def test_saturated_pool_returns_503(self):
+        response = await self.post(LoginView, {'email': 'async@example.com', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.accounts.models import RevokedToken, User
+from apps.accounts.revocation import (
+    RevocationFilter,
+    is_revoked,
+    purge_revoked_tokens,
+    revoke_tokens
+)
+
+
+class TokenRevocationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='revocation@example.com',
+            password='testpass123',
+            first_name='Revocation',
+            last_name='User'
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+    
+    def test_rotation_rejects_reuse(self):
+        url = reverse('accounts:token-refresh')
+        response = self.client.post(url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['refresh'], str(self.refresh))
+        
+        response = self.client.post(url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_logout_revokes_refresh_token(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('accounts:logout'), {'refresh_token': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(RevokedToken.objects.filter(jti=self.refresh['jti']).exists())
+        
+        response = self.client.post(reverse('accounts:token-refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_unknown_token_checked_without_query(self):
+        revoke_tokens([('revoque', timezone.now() + timedelta(days=1))])
+        is_revoked('inconnu')
+        with self.assertNumQueries(0):
+            self.assertFalse(is_revoked(self.refresh['jti']))
+        self.assertTrue(is_revoked('revoque'))
+    
+    def test_filter_follows_other_workers(self):
+        worker = RevocationFilter()
+        self.assertFalse(worker.might_contain('ailleurs'))
+        RevokedToken.objects.create(jti='ailleurs', expires_at=timezone.now() + timedelta(days=1))
+        self.assertFalse(worker.might_contain('ailleurs'))
+        cache.set('accounts:revoked_tokens:generation', 'autre', None)
+        self.assertTrue(worker.might_contain('ailleurs'))
+    
+    def test_purge_removes_expired_rows(self):
+        now = timezone.now()
+        revoke_tokens([('expire', now - timedelta(minutes=1)), ('valide', now + timedelta(days=1))])
+        self.assertEqual(purge_revoked_tokens(batch_size=1), 1)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['valide'])
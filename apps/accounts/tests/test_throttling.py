@@ -0,0 +1,91 @@
+from unittest import mock
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.accounts.models import User
+from core.throttling import bucket_store
+
+RATES = {
+    'login.ip': '5/min',
+    'login.email': '2/min',
+    'register.ip': '1/min',
+    'search.user': '1/min',
+}
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES})
+class TokenBucketThrottleTest(APITestCase):
+    def setUp(self):
+        bucket_store.reset()
+        self.user = User.objects.create_user(
+            email='throttle@example.com',
+            password='testpass123',
+            first_name='Throttle',
+            last_name='User'
+        )
+    
+    def tearDown(self):
+        bucket_store.reset()
+    
+    def login(self, email, ip='10.0.0.1'):
+        return self.client.post(
+            reverse('accounts:login'),
+            {'email': email, 'password': 'mauvais'},
+            format='json',
+            REMOTE_ADDR=ip
+        )
+    
+    def test_login_limited_per_email_across_ips(self):
+        self.assertEqual(self.login('throttle@example.com', '10.0.0.1').status_code, 401)
+        self.assertEqual(self.login('THROTTLE@example.com', '10.0.0.2').status_code, 401)
+        response = self.login('throttle@example.com', '10.0.0.3')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        # Autre email depuis la même IP : seau distinct
+        self.assertEqual(self.login('autre@example.com', '10.0.0.3').status_code, 401)
+    
+    def test_spoofed_forwarded_for_shares_ip_bucket(self):
+        def login(spoofed, index):
+            return self.client.post(
+                reverse('accounts:login'),
+                {'email': f'inconnu{index}@example.com', 'password': 'mauvais'},
+                format='json',
+                REMOTE_ADDR='10.0.0.1',
+                HTTP_X_FORWARDED_FOR=spoofed
+            )
+        
+        # Sans proxy : l'en-tête est ignoré ; derrière un proxy : seule compte l'entrée qu'il ajoute
+        for num_proxies, real in ((0, ''), (1, ', 203.0.113.7')):
+            bucket_store.reset()
+            with self.settings(REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES, 'NUM_PROXIES': num_proxies
+            }):
+                for index in range(5):
+                    self.assertEqual(login(f'192.0.2.{index}{real}', index).status_code, 401)
+                response = login(f'192.0.2.99{real}', 99)
+                self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_rejection_skips_shared_store(self):
+        self.client.post(reverse('accounts:register'), {}, format='json')
+        self.assertEqual(self.client.post(reverse('accounts:register'), {}, format='json').status_code, 429)
+        with mock.patch.object(bucket_store.store, 'transaction') as transaction:
+            response = self.client.post(reverse('accounts:register'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        transaction.assert_not_called()
+    
+    def test_search_limited_per_user(self):
+        url = reverse('publications:publication-search')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url, {'q': 'test'}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'q': 'test'}).status_code, 429)
+        
+        other = User.objects.create_user(
+            email='autre@example.com',
+            password='testpass123',
+            first_name='Autre',
+            last_name='User'
+        )
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url, {'q': 'test'}).status_code, 200)
@@ -0,0 +1,20 @@
+from core.throttling import TokenBucketThrottle
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """Par adresse IP et par email visé (force brute répartie sur plusieurs IP)"""
+
+    scope = 'login'
+
+    def get_identities(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return {
+            'ip': self.get_ident(request),
+            'email': email.strip().lower() if isinstance(email, str) and email else None,
+        }
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    """Par adresse IP"""
+
+    scope = 'register'
@@ -2,9 +2,9 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     RegisterView,
-    login_view,
+    LoginView,
     ProfileView,
-    change_password_view,
+    ChangePasswordView,
     logout_view
 )
 
@@ -13,12 +13,12 @@ app_name = 'accounts'
 urlpatterns = [
     # Inscription et connexion
     path('register/', RegisterView.as_view(), name='register'),
-    path('login/', login_view, name='login'),
+    path('login/', LoginView.as_view(), name='login'),
     path('logout/', logout_view, name='logout'),
     
     # Gestion du profil
     path('profile/', ProfileView.as_view(), name='profile'),
-    path('change-password/', change_password_view, name='change-password'),
+    path('change-password/', ChangePasswordView.as_view(), name='change-password'),
     
     # Refresh token
     path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
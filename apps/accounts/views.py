@@ -1,10 +1,22 @@
+from asgiref.sync import sync_to_async
 from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
+from core.mixins import AsyncHandlerMixin, SparseFieldsetMixin
+from .hashing import (
+    aauthenticate_user,
+    ahash_password,
+    aset_password,
+    authenticate_user,
+    averify_password,
+    set_password
+)
 from .models import User
+from .throttling import LoginThrottle, RegisterThrottle
+from .revocation import RevocableRefreshToken
 from .serializers import (
     UserRegistrationSerializer,
     UserSerializer,
@@ -13,20 +25,31 @@ from .serializers import (
 )
 
 
-class RegisterView(generics.CreateAPIView):
+class RegisterView(AsyncHandlerMixin, generics.CreateAPIView):
     """
     Vue pour l'inscription d'un nouvel utilisateur
     POST: Crée un nouveau compte (privé ou professionnel)
+    En mode ASGI (ASYNC_READS), servie par apost() : le hachage est attendu sans bloquer de thread
     """
     queryset = User.objects.all()
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterThrottle]
     serializer_class = UserRegistrationSerializer
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        
+        return self.created_response(user)
+    
+    async def apost(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        encoded_password = await ahash_password(serializer.validated_data['password'])
+        user = await sync_to_async(serializer.save)(encoded_password=encoded_password)
+        return self.created_response(user)
+    
+    def created_response(self, user):
         # Générer les tokens JWT
         refresh = RefreshToken.for_user(user)
         
@@ -40,50 +63,67 @@ class RegisterView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def login_view(request):
+class LoginView(AsyncHandlerMixin, APIView):
     """
     Vue pour la connexion d'un utilisateur
     POST: Authentifie l'utilisateur et retourne les tokens JWT
+    En mode ASGI (ASYNC_READS), servie par apost() : le hachage est attendu sans bloquer de thread
     """
-    email = request.data.get('email')
-    password = request.data.get('password')
+    permission_classes = [AllowAny]
+    throttle_classes = [LoginThrottle]
     
-    if not email or not password:
-        return Response({
-            'error': 'Email et mot de passe requis'
-        }, status=status.HTTP_400_BAD_REQUEST)
+    def post(self, request):
+        email = request.data.get('email')
+        password = request.data.get('password')
+        if not email or not password:
+            return self.missing_credentials_response()
+        
+        # Hachage dans le pool borné : 503 si trop de connexions simultanées
+        user = authenticate_user(request, email, password)
+        return self.login_response(user)
     
-    user = authenticate(request, username=email, password=password)
+    async def apost(self, request):
+        email = request.data.get('email')
+        password = request.data.get('password')
+        if not email or not password:
+            return self.missing_credentials_response()
+        
+        user = await aauthenticate_user(request, email, password)
+        return self.login_response(user)
     
-    if user is None:
+    def missing_credentials_response(self):
         return Response({
-            'error': 'Identifiants incorrects'
-        }, status=status.HTTP_401_UNAUTHORIZED)
+            'error': 'Email et mot de passe requis'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    if not user.is_active:
+    def login_response(self, user):
+        if user is None:
+            return Response({
+                'error': 'Identifiants incorrects'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        
+        if not user.is_active:
+            return Response({
+                'error': 'Ce compte est désactivé'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        # Générer les tokens JWT
+        refresh = RefreshToken.for_user(user)
+        
         return Response({
-            'error': 'Ce compte est désactivé'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
-    # Générer les tokens JWT
-    refresh = RefreshToken.for_user(user)
-    
-    return Response({
-        'user': UserSerializer(user).data,
-        'tokens': {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        },
-        'message': 'Connexion réussie'
-    }, status=status.HTTP_200_OK)
+            'user': UserSerializer(user).data,
+            'tokens': {
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+            },
+            'message': 'Connexion réussie'
+        }, status=status.HTTP_200_OK)
 
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(SparseFieldsetMixin, generics.RetrieveUpdateAPIView):
     """
     Vue pour afficher et mettre à jour le profil utilisateur
-    GET: Récupère le profil de l'utilisateur connecté
+    GET: Récupère le profil de l'utilisateur connecté (?fields= pour un profil partiel)
     PUT/PATCH: Met à jour le profil de l'utilisateur connecté
     """
     permission_classes = [IsAuthenticated]
@@ -109,37 +149,59 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         })
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def change_password_view(request):
+class ChangePasswordView(AsyncHandlerMixin, APIView):
     """
     Vue pour changer le mot de passe de l'utilisateur
     POST: Change le mot de passe de l'utilisateur connecté
+    En mode ASGI (ASYNC_READS), servie par apost() : le hachage est attendu sans bloquer de thread
     """
-    serializer = ChangePasswordSerializer(
-        data=request.data,
-        context={'request': request}
-    )
+    permission_classes = [IsAuthenticated]
     
-    if serializer.is_valid():
+    def post(self, request):
+        serializer = ChangePasswordSerializer(
+            data=request.data,
+            context={'request': request}
+        )
+        
+        if serializer.is_valid():
+            user = request.user
+            set_password(user, serializer.validated_data['new_password'])
+            user.save(update_fields=['password'])
+            return self.changed_response()
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    async def apost(self, request):
+        # L'ancien mot de passe est vérifié ici, hors de la validation synchrone
+        serializer = ChangePasswordSerializer(
+            data=request.data,
+            context={'request': request, 'verify_old_password': False}
+        )
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
         user = request.user
-        user.set_password(serializer.validated_data['new_password'])
-        user.save()
+        if not await averify_password(user, serializer.validated_data['old_password']):
+            return Response({
+                'old_password': ['L\'ancien mot de passe est incorrect']
+            }, status=status.HTTP_400_BAD_REQUEST)
         
+        await aset_password(user, serializer.validated_data['new_password'])
+        await user.asave(update_fields=['password'])
+        return self.changed_response()
+    
+    def changed_response(self):
         return Response({
             'message': 'Mot de passe changé avec succès'
         }, status=status.HTTP_200_OK)
-    
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
     """
-    Vue pour la déconnexion (blacklist du refresh token)
-    POST: Ajoute le refresh token à la blacklist
+    Vue pour la déconnexion (révocation du refresh token)
+    POST: Révoque le refresh token jusqu'à son expiration
     """
     try:
         refresh_token = request.data.get('refresh_token')
@@ -148,8 +210,8 @@ def logout_view(request):
                 'error': 'Refresh token requis'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        token = RefreshToken(refresh_token)
-        token.blacklist()
+        token = RevocableRefreshToken(refresh_token)
+        token.revoke()
         
         return Response({
             'message': 'Déconnexion réussie'
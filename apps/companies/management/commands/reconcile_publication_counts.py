@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from apps.companies.services import reconcile_publication_counts
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les compteurs de publications des entreprises et corrige les écarts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Entreprises verrouillées et recalculées par transaction'
+        )
+
+    def handle(self, *args, **options):
+        repaired = reconcile_publication_counts(options['batch_size'])
+        if repaired:
+            self.stdout.write(f"Entreprises corrigées : {', '.join(map(str, repaired))}")
+        self.stdout.write(self.style.SUCCESS(f'{len(repaired)} entreprise(s) corrigée(s)'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 19:40
+
+from django.db import migrations
+
+from core.operations import AddTrigramIndex, CreateExtensionIfAvailable
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("companies", "0001_initial"),
+    ]
+
+    operations = [
+        CreateExtensionIfAvailable("pg_trgm"),
+        AddTrigramIndex("Company", "name", "companies_company_name_trgm"),
+    ]
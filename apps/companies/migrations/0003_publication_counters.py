@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-17 19:46
+
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+    UPDATE companies_company AS c
+    SET published_count = s.published, draft_count = s.draft, archived_count = s.archived
+    FROM (
+        SELECT company_id,
+               COUNT(*) FILTER (WHERE status = 'PUBLISHED') AS published,
+               COUNT(*) FILTER (WHERE status = 'DRAFT') AS draft,
+               COUNT(*) FILTER (WHERE status = 'ARCHIVED') AS archived
+        FROM publications_publication
+        WHERE company_id IS NOT NULL
+        GROUP BY company_id
+    ) AS s
+    WHERE c.id = s.company_id
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0002_company_name_trgm"),
+        ("publications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="company",
+            name="archived_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="publications archivées"
+            ),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="draft_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="brouillons"
+            ),
+        ),
+        migrations.AddField(
+            model_name="company",
+            name="published_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="publications publiées"
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
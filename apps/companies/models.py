@@ -56,6 +56,12 @@ class Company(TimeStampedModel):
         help_text=_('Indique si l\'entreprise est active')
     )
     
+    # Publications par statut, tenues à jour dans la transaction de chaque
+    # changement (voir services.apply_publication_transitions)
+    published_count = models.IntegerField(_('publications publiées'), default=0, editable=False)
+    draft_count = models.IntegerField(_('brouillons'), default=0, editable=False)
+    archived_count = models.IntegerField(_('publications archivées'), default=0, editable=False)
+    
     class Meta:
         verbose_name = _('entreprise')
         verbose_name_plural = _('entreprises')
@@ -9,4 +9,4 @@ class IsCompanyOwner(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # L'utilisateur doit être le propriétaire de l'entreprise
-        return obj.user == request.user
\ No newline at end of file
+        return obj.user_id == request.user.pk
\ No newline at end of file
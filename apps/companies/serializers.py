@@ -7,21 +7,20 @@ class CompanySerializer(serializers.ModelSerializer):
     """Serializer pour les entreprises"""
     
     user = UserSerializer(read_only=True)
-    publications_count = serializers.SerializerMethodField()
+    # Compteur maintenu sur l'entreprise : aucune requête par ligne
+    publications_count = serializers.IntegerField(source='published_count', read_only=True)
     
     class Meta:
         model = Company
         fields = [
             'id', 'user', 'name', 'cfe_number', 'address',
             'phone', 'email', 'description', 'website',
-            'is_active', 'publications_count',
+            'is_active', 'publications_count', 'draft_count', 'archived_count',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
-    
-    def get_publications_count(self, obj):
-        """Retourne le nombre de publications de l'entreprise"""
-        return obj.publications.filter(status='PUBLISHED').count()
+        read_only_fields = [
+            'id', 'user', 'draft_count', 'archived_count', 'created_at', 'updated_at'
+        ]
     
     def validate(self, attrs):
         """Validation personnalisée"""
@@ -45,7 +44,8 @@ class CompanySerializer(serializers.ModelSerializer):
 class CompanyListSerializer(serializers.ModelSerializer):
     """Serializer simplifié pour la liste des entreprises"""
     
-    publications_count = serializers.SerializerMethodField()
+    # Compteur maintenu sur l'entreprise : aucune requête par ligne
+    publications_count = serializers.IntegerField(source='published_count', read_only=True)
     
     class Meta:
         model = Company
@@ -53,10 +53,6 @@ class CompanyListSerializer(serializers.ModelSerializer):
             'id', 'name', 'cfe_number', 'email',
             'is_active', 'publications_count', 'created_at'
         ]
-    
-    def get_publications_count(self, obj):
-        """Retourne le nombre de publications de l'entreprise"""
-        return obj.publications.filter(status='PUBLISHED').count()
 
 
 class CompanyUpdateSerializer(serializers.ModelSerializer):
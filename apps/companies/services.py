@@ -0,0 +1,92 @@
+from collections import Counter, defaultdict
+from django.db import connection, transaction
+from django.db.models import F
+from .models import Company
+
+# Colonne de compteur par statut de publication
+COUNTER_FIELDS = {
+    'PUBLISHED': 'published_count',
+    'DRAFT': 'draft_count',
+    'ARCHIVED': 'archived_count',
+}
+
+LOCK_SQL = """
+    SELECT id FROM {companies}
+    WHERE id > %(start)s AND id <= %(end)s
+    ORDER BY id
+    FOR UPDATE
+"""
+
+RECONCILE_SQL = """
+    WITH actual AS (
+        SELECT c.id,
+               COUNT(p.id) FILTER (WHERE p.status = 'PUBLISHED') AS published,
+               COUNT(p.id) FILTER (WHERE p.status = 'DRAFT') AS draft,
+               COUNT(p.id) FILTER (WHERE p.status = 'ARCHIVED') AS archived
+        FROM {companies} c
+        LEFT JOIN {publications} p ON p.company_id = c.id
+        WHERE c.id > %(start)s AND c.id <= %(end)s
+        GROUP BY c.id
+    )
+    UPDATE {companies} AS c
+    SET published_count = a.published, draft_count = a.draft, archived_count = a.archived
+    FROM actual a
+    WHERE c.id = a.id
+      AND (c.published_count, c.draft_count, c.archived_count)
+          IS DISTINCT FROM (a.published, a.draft, a.archived)
+    RETURNING c.id
+"""
+
+
+def apply_publication_transitions(transitions):
+    """
+    Répercute des changements de publications sur les compteurs.
+
+    transitions : [(entreprise avant, statut avant, entreprise après, statut après)],
+    None pour l'état avant d'une création ou après une suppression.
+    Les entreprises ayant le même écart sont mises à jour par un seul UPDATE.
+    """
+    deltas = defaultdict(Counter)
+    for old_company, old_status, new_company, new_status in transitions:
+        if (old_company, old_status) == (new_company, new_status):
+            continue
+        if old_company and old_status in COUNTER_FIELDS:
+            deltas[old_company][COUNTER_FIELDS[old_status]] -= 1
+        if new_company and new_status in COUNTER_FIELDS:
+            deltas[new_company][COUNTER_FIELDS[new_status]] += 1
+
+    groups = defaultdict(list)
+    for company_id, delta in deltas.items():
+        changes = tuple(sorted((field, n) for field, n in delta.items() if n))
+        if changes:
+            groups[changes].append(company_id)
+    # Ordre stable des verrous entre transactions concurrentes
+    for changes, ids in sorted(groups.items(), key=lambda item: min(item[1])):
+        Company.objects.filter(pk__in=ids).update(
+            **{field: F(field) + n for field, n in changes}
+        )
+
+
+def reconcile_publication_counts(batch_size=1000):
+    """
+    Recalcule les compteurs par lots d'identifiants et corrige les écarts.
+
+    Les entreprises du lot sont verrouillées avant le comptage : une
+    transition concurrente applique son écart après la correction.
+    Retourne la liste des entreprises corrigées.
+    """
+    tables = {
+        'companies': Company._meta.db_table,
+        'publications': Company._meta.get_field('publications').related_model._meta.db_table,
+    }
+    last_id = Company.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    repaired = []
+    start = 0
+    while start < last_id:
+        params = {'start': start, 'end': start + batch_size}
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(LOCK_SQL.format(**tables), params)
+            cursor.execute(RECONCILE_SQL.format(**tables), params)
+            repaired.extend(row[0] for row in cursor.fetchall())
+        start += batch_size
+    return repaired
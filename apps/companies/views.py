@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count, Sum
 from django.shortcuts import get_object_or_404
 from .models import Company
 from .serializers import (
@@ -10,9 +11,11 @@ from .serializers import (
     CompanyUpdateSerializer
 )
 from .permissions import IsCompanyOwner
+from core.mixins import ConditionalGetMixin, SparseFieldsetMixin
+from core.pagination import KeysetPagination
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des entreprises
     
@@ -22,13 +25,30 @@ class CompanyViewSet(viewsets.ModelViewSet):
     update: Met à jour une entreprise
     partial_update: Met à jour partiellement une entreprise
     destroy: Supprime une entreprise
+    
+    Lectures : ?fields= et ?expand= (user) pour des réponses partielles
     """
     permission_classes = [IsAuthenticated, IsCompanyOwner]
+    expandable_fields = {'user': 'user'}
+    field_sources = {'publications_count': ['published_count']}
+    required_fields = ('user',)
+    # Validateurs : le propriétaire est imbriqué dans les réponses
+    validator_timestamp_fields = ('updated_at', 'user__updated_at')
     
     def get_queryset(self):
         """Retourne uniquement les entreprises de l'utilisateur connecté"""
         return Company.objects.filter(user=self.request.user).select_related('user')
     
+    def get_validator_aggregates(self):
+        """Les compteurs de publications changent sans toucher updated_at"""
+        return {
+            'last_modified': self.get_last_modified_aggregate(),
+            'count': Count('pk'),
+            'published': Sum('published_count'),
+            'draft': Sum('draft_count'),
+            'archived': Sum('archived_count'),
+        }
+    
     def get_serializer_class(self):
         """Retourne le serializer approprié selon l'action"""
         if self.action == 'list':
@@ -97,16 +117,29 @@ class CompanyViewSet(viewsets.ModelViewSet):
             'message': f'Entreprise {status_text} avec succès'
         })
     
+    @action(detail=True, methods=['get'])
+    def analytics(self, request, pk=None):
+        """
+        Vues cumulées des publications de l'entreprise, lues dans les agrégats :
+        ?granularity=hour|day&since=...&until=...
+        """
+        company = self.get_object()
+        
+        from apps.publications.analytics import views_series
+        from apps.publications.serializers import ViewAnalyticsQuerySerializer
+        params = ViewAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(views_series({'company_id': company.pk}, **params.validated_data))
+    
     @action(detail=True, methods=['get'])
     def publications(self, request, pk=None):
         """Récupère toutes les publications d'une entreprise"""
         company = self.get_object()
-        publications = company.publications.all()
+        publications = company.publications.for_list()
         
         from apps.publications.serializers import PublicationListSerializer
-        serializer = PublicationListSerializer(publications, many=True)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(publications, request)
+        serializer = PublicationListSerializer(page, many=True)
         
-        return Response({
-            'count': publications.count(),
-            'publications': serializer.data
-        })
\ No newline at end of file
+        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
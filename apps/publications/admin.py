@@ -17,6 +17,9 @@ class PublicationAdmin(admin.ModelAdmin):
         ('Contenu', {
             'fields': ('content', 'image', 'tags')
         }),
+        ('Programmation', {
+            'fields': ('publish_at', 'expire_at')
+        }),
         ('Statistiques', {
             'fields': ('views_count', 'published_at')
         }),
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import (
+    AnalyticsWatermark,
+    Publication,
+    ViewEvent,
+    ViewRollupDaily,
+    ViewRollupHourly
+)
+
+WATERMARK_NAME = 'view_rollups'
+
+# Un événement n'est compacté qu'après ce délai : les insertions
+# concurrentes plus anciennes sont alors forcément validées
+COMPACTION_GRACE = timedelta(seconds=60)
+
+GRANULARITIES = {
+    'hour': (ViewRollupHourly, timedelta(days=31)),
+    'day': (ViewRollupDaily, timedelta(days=366)),
+}
+
+ROLLUP_SQL = """
+    INSERT INTO {rollup} (publication_id, company_id, bucket, views)
+    SELECT publication_id, MAX(company_id), {bucket}, SUM(hits)
+    FROM {events}
+    WHERE id > %(start)s AND id <= %(end)s
+    GROUP BY publication_id, {bucket}
+    ON CONFLICT (publication_id, bucket)
+    DO UPDATE SET views = {rollup}.views + EXCLUDED.views,
+                  company_id = COALESCE(EXCLUDED.company_id, {rollup}.company_id)
+"""
+
+BUCKETS = {
+    ViewRollupHourly: "date_trunc('hour', occurred_at)",
+    ViewRollupDaily: "(occurred_at AT TIME ZONE %(tz)s)::date",
+}
+
+
+def record_view_events(pending, now):
+    """Ajoute au journal un lot de vues {publication_id: vues} (un INSERT)"""
+    companies = dict(
+        Publication.objects.filter(pk__in=list(pending)).values_list('pk', 'company_id')
+    )
+    ViewEvent.objects.bulk_create([
+        ViewEvent(publication_id=pk, company_id=companies[pk], occurred_at=now, hits=hits)
+        for pk, hits in pending.items()
+        if pk in companies
+    ])
+
+
+def compact_view_events(batch_size=50000, now=None):
+    """
+    Reporte les événements au-delà du marqueur dans les agrégats horaires
+    et journaliers (INSERT ... ON CONFLICT DO UPDATE), puis avance le
+    marqueur, le tout dans une transaction. Retourne le nombre d'événements.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        watermark, _ = AnalyticsWatermark.objects.select_for_update().get_or_create(
+            name=WATERMARK_NAME
+        )
+        start = watermark.last_event_id
+        end = (
+            ViewEvent.objects.filter(
+                id__gt=start,
+                id__lte=start + batch_size,
+                occurred_at__lt=now - COMPACTION_GRACE
+            ).order_by('-id').values_list('id', flat=True).first()
+        )
+        if end is None:
+            return 0
+
+        with connection.cursor() as cursor:
+            for rollup, bucket in BUCKETS.items():
+                cursor.execute(
+                    ROLLUP_SQL.format(
+                        rollup=rollup._meta.db_table,
+                        events=ViewEvent._meta.db_table,
+                        bucket=bucket
+                    ),
+                    {'start': start, 'end': end, 'tz': settings.TIME_ZONE}
+                )
+        compacted = ViewEvent.objects.filter(id__gt=start, id__lte=end).count()
+        watermark.last_event_id = end
+        watermark.save(update_fields=['last_event_id', 'updated_at'])
+    return compacted
+
+
+def prune_view_events(now=None):
+    """Supprime les événements compactés plus vieux que la rétention"""
+    now = now or timezone.now()
+    watermark = AnalyticsWatermark.objects.filter(name=WATERMARK_NAME).first()
+    if watermark is None:
+        return 0
+    cutoff = now - timedelta(days=settings.ANALYTICS_RAW_RETENTION_DAYS)
+    deleted, _ = ViewEvent.objects.filter(
+        id__lte=watermark.last_event_id,
+        occurred_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def views_series(filters, granularity, since, until):
+    """
+    Série de vues lue dans les agrégats seulement.
+    filters : {'publication_id': ...} ou {'company_id': ...}
+    """
+    rollup, _ = GRANULARITIES[granularity]
+    rows = (
+        rollup.objects.filter(bucket__gte=since, bucket__lte=until, **filters)
+        .values('bucket')
+        .annotate(views=Sum('views'))
+        .order_by('bucket')
+    )
+    series = [{'bucket': row['bucket'], 'views': row['views']} for row in rows]
+    return {
+        'granularity': granularity,
+        'since': since,
+        'until': until,
+        'total': sum(row['views'] for row in series),
+        'series': series,
+    }
+
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class PublicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.publications'
-    verbose_name = 'Publications'
\ No newline at end of file
+    verbose_name = 'Publications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
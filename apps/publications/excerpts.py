@@ -0,0 +1,15 @@
+EXCERPT_LENGTH = 280
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """
+    Début du contenu, espaces normalisés, coupé sur un mot
+    et terminé par « … » s'il a été tronqué
+    """
+    text = ' '.join((content or '').split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:.') + '…'
@@ -0,0 +1,97 @@
+import csv
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Lignes lues par aller-retour du curseur serveur
+CHUNK_SIZE = 2000
+
+# Colonnes exportées : {nom: chemin ORM}
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'status': 'status',
+    'author_id': 'author_id',
+    'author_email': 'author__email',
+    'company_id': 'company_id',
+    'company_name': 'company__name',
+    'tags': 'normalized_tags',
+    'excerpt': 'excerpt',
+    'content': 'content',
+    'views_count': 'views_count',
+    'published_at': 'published_at',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+# Par défaut : tout sauf le contenu complet
+DEFAULT_COLUMNS = [name for name in EXPORT_COLUMNS if name != 'content']
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def parse_columns(value):
+    """« id,title » -> ['id', 'title'] (colonnes inconnues ignorées)"""
+    if not value:
+        return list(DEFAULT_COLUMNS)
+    columns = [name.strip() for name in value.split(',')]
+    return [name for name in columns if name in EXPORT_COLUMNS] or list(DEFAULT_COLUMNS)
+
+
+def export_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Tuples bruts lus par curseur serveur : mémoire constante quel que soit le volume"""
+    paths = [EXPORT_COLUMNS[name] for name in columns]
+    return queryset.values_list(*paths).iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(rows, columns):
+    """Un objet JSON par ligne"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+class _Echo:
+    """Pseudo-fichier : csv.writer retourne directement la ligne écrite"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ','.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows, columns):
+    """En-tête puis une ligne CSV par publication"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def export_lines(queryset, output, columns, chunk_size=CHUNK_SIZE):
+    """Générateur de lignes encodées au format demandé (ndjson ou csv)"""
+    rows = export_rows(queryset, columns, chunk_size)
+    encode = ndjson_lines if output == 'ndjson' else csv_lines
+    return encode(rows, columns)
+
+
+async def aexport_lines(queryset, output, columns, chunk_size=CHUNK_SIZE):
+    """
+    export_lines() en itérateur asynchrone, lu par tranches dans un thread :
+    sous ASGI, Django charge tout un flux synchrone en mémoire avant l'envoi
+    """
+    lines = export_lines(queryset, output, columns, chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(lines, chunk_size)))
+    while chunk := await next_chunk():
+        for line in chunk:
+            yield line
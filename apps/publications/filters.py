@@ -1,29 +1,42 @@
 import django_filters
+from django.db.models import Exists, OuterRef
+from rest_framework import filters
+from apps.accounts.models import User
+from apps.companies.models import Company
 from .models import Publication
+from .search import search_publications
+from .tags import normalize_tags
 
 
 class PublicationFilter(django_filters.FilterSet):
-    """Filtre pour les publications avec recherche avancée"""
+    """
+    Filtre pour les publications avec recherche avancée
+    
+    Les filtres « contient » utilisent le lookup trgm_icontains (ILIKE),
+    servi par les index GIN pg_trgm créés par les migrations. Les filtres
+    sur l'auteur et l'entreprise sont des EXISTS plutôt que des jointures.
+    """
     
     # Filtrage par titre (contient)
-    title = django_filters.CharFilter(lookup_expr='icontains')
+    title = django_filters.CharFilter(lookup_expr='trgm_icontains')
     
     # Filtrage par contenu (contient)
-    content = django_filters.CharFilter(lookup_expr='icontains')
+    content = django_filters.CharFilter(lookup_expr='trgm_icontains')
     
     # Filtrage par statut
     status = django_filters.ChoiceFilter(choices=Publication.Status.choices)
     
     # Filtrage par auteur
     author = django_filters.NumberFilter(field_name='author__id')
-    author_email = django_filters.CharFilter(field_name='author__email', lookup_expr='icontains')
+    author_email = django_filters.CharFilter(method='filter_author_email')
     
     # Filtrage par entreprise
     company = django_filters.NumberFilter(field_name='company__id')
-    company_name = django_filters.CharFilter(field_name='company__name', lookup_expr='icontains')
+    company_name = django_filters.CharFilter(method='filter_company_name')
     
-    # Filtrage par tags
-    tags = django_filters.CharFilter(lookup_expr='icontains')
+    # Filtrage par tags exacts : tous (tags=a,b) ou au moins un (tags_any=a,b)
+    tags = django_filters.CharFilter(method='filter_tags_all')
+    tags_any = django_filters.CharFilter(method='filter_tags_any')
     
     # Filtrage par date de création
     created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
@@ -41,8 +54,36 @@ class PublicationFilter(django_filters.FilterSet):
         model = Publication
         fields = [
             'title', 'content', 'status', 'author', 'author_email',
-            'company', 'company_name', 'tags',
+            'company', 'company_name', 'tags', 'tags_any',
             'created_after', 'created_before',
             'published_after', 'published_before',
             'min_views', 'max_views'
-        ]
\ No newline at end of file
+        ]
+    
+    def filter_tags_all(self, queryset, name, value):
+        """Publications portant tous les tags (normalized_tags @> ...)"""
+        return queryset.filter(normalized_tags__contains=normalize_tags(value))
+    
+    def filter_tags_any(self, queryset, name, value):
+        """Publications portant au moins un des tags (normalized_tags && ...)"""
+        return queryset.filter(normalized_tags__overlap=normalize_tags(value))
+    
+    def filter_author_email(self, queryset, name, value):
+        """Auteur dont l'email contient la valeur (sous-requête EXISTS)"""
+        authors = User.objects.filter(pk=OuterRef('author_id'), email__trgm_icontains=value)
+        return queryset.filter(Exists(authors))
+    
+    def filter_company_name(self, queryset, name, value):
+        """Entreprise dont le nom contient la valeur (sous-requête EXISTS)"""
+        companies = Company.objects.filter(pk=OuterRef('company_id'), name__trgm_icontains=value)
+        return queryset.filter(Exists(companies))
+
+
+class PublicationSearchFilter(filters.SearchFilter):
+    """Paramètre ?search= servi par l'index plein texte (search_vector)"""
+    
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search_publications(queryset, text)
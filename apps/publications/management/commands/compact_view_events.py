@@ -0,0 +1,56 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connection
+from core.cache import require_shared_cache
+from apps.publications.analytics import compact_view_events, prune_view_events
+
+
+class Command(BaseCommand):
+    help = 'Reporte les événements de vue dans les agrégats et purge les anciens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Tourne en continu au lieu de faire un seul passage'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Intervalle en secondes entre deux passages (avec --loop)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='Événements compactés par transaction'
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            # Processus séparé (Procfile) : comme le scheduler, exige un cache commun avec le web
+            require_shared_cache()
+            stop = threading.Event()
+            # Arrêt propre sur SIGTERM/SIGINT : le passage en cours se termine
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+            while not stop.is_set():
+                self.run_once(options['batch_size'])
+                connection.close()
+                stop.wait(options['interval'])
+            return
+
+        self.run_once(options['batch_size'])
+
+    def run_once(self, batch_size):
+        compacted = 0
+        while True:
+            count = compact_view_events(batch_size)
+            compacted += count
+            if not count:
+                break
+        pruned = prune_view_events()
+        if compacted or pruned:
+            self.stdout.write(f'{compacted} événement(s) compacté(s), {pruned} purgé(s)')
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.publications.exports import (
+    CHUNK_SIZE,
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    export_lines,
+    parse_columns
+)
+from apps.publications.filters import PublicationFilter
+from apps.publications.models import Publication
+
+
+class Command(BaseCommand):
+    help = 'Exporte en flux les publications filtrées (NDJSON ou CSV)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            choices=list(EXPORT_FORMATS),
+            default='ndjson',
+            help='Format de sortie'
+        )
+        parser.add_argument(
+            '--file',
+            help='Fichier de destination (sortie standard par défaut)'
+        )
+        parser.add_argument(
+            '--columns',
+            help=f"Colonnes séparées par des virgules parmi : {', '.join(EXPORT_COLUMNS)}"
+        )
+        parser.add_argument(
+            '--filter',
+            action='append',
+            default=[],
+            metavar='NOM=VALEUR',
+            help='Filtre de PublicationFilter (répétable), ex: --filter status=PUBLISHED'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Lignes lues par aller-retour du curseur serveur'
+        )
+
+    def handle(self, *args, **options):
+        data = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Filtre invalide : {item} (attendu NOM=VALEUR)')
+            data[name] = value
+
+        filterset = PublicationFilter(data=data, queryset=Publication.objects.order_by('id'))
+        if not filterset.is_valid():
+            raise CommandError(f'Filtres invalides : {filterset.errors.as_json()}')
+
+        lines = export_lines(
+            filterset.qs,
+            options['output'],
+            parse_columns(options['columns']),
+            options['chunk_size']
+        )
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8', newline='') as output:
+                count = self._write(lines, output.write)
+            self.stderr.write(self.style.SUCCESS(f"{count} ligne(s) écrite(s) dans {options['file']}"))
+        else:
+            self._write(lines, lambda line: self.stdout.write(line, ending=''))
+
+    def _write(self, lines, write):
+        count = 0
+        for line in lines:
+            write(line)
+            count += 1
+        return count
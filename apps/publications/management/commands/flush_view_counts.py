@@ -0,0 +1,37 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.publications.services import view_counter
+
+
+class Command(BaseCommand):
+    help = 'Applique en base les vues accumulées dans le tampon local'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Tourne en continu au lieu de vider le tampon une seule fois'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='Intervalle en secondes entre deux flush (avec --loop)'
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            stop = threading.Event()
+            # Arrêt propre sur SIGTERM/SIGINT : on vide le tampon avant de sortir
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+            while not stop.wait(options['interval']):
+                flushed = view_counter.flush()
+                if flushed:
+                    self.stdout.write(f'{flushed} vue(s) appliquée(s)')
+                connection.close()
+
+        flushed = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f'{flushed} vue(s) appliquée(s)'))
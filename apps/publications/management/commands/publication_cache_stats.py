@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.publications.services import response_cache
+
+
+class Command(BaseCommand):
+    help = 'Affiche les compteurs hits/misses du cache des réponses publiques'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Remet les compteurs à zéro après affichage'
+        )
+
+    def handle(self, *args, **options):
+        stats = response_cache.stats()
+        ratio = stats['hit_ratio']
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f"hit ratio: {'-' if ratio is None else f'{ratio:.2%}'}")
+
+        if options['reset']:
+            response_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Compteurs remis à zéro'))
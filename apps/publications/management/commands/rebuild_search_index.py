@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.publications.models import Publication
+from apps.publications.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte des publications par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Taille des tranches d'identifiants mises à jour par requête"
+        )
+
+    def handle(self, *args, **options):
+        updated = rebuild_search_vectors(Publication.objects.all(), options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{updated} publication(s) réindexée(s)'))
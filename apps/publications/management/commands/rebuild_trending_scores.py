@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from apps.publications.models import Publication
+from apps.publications.trending import rebuild_trending_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcule les scores de tendance depuis views_count par lots vectorisés '
+        '(après import ou changement de TRENDING_HALF_LIFE_HOURS)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Publications recalculées par UPDATE'
+        )
+
+    def handle(self, *args, **options):
+        updated = rebuild_trending_scores(Publication.objects.all(), options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{updated} score(s) recalculé(s)'))
@@ -0,0 +1,64 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connection
+from core.cache import require_shared_cache
+from apps.publications.scheduler import run_due_transitions, scheduler_lag
+
+
+class Command(BaseCommand):
+    help = 'Publie et archive les publications programmées arrivées à échéance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Tourne en continu au lieu de faire un seul passage'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=15,
+            help='Intervalle en secondes entre deux passages (avec --loop)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Lignes modifiées par UPDATE'
+        )
+        parser.add_argument(
+            '--status',
+            action='store_true',
+            help='Affiche le retard des files sans rien modifier'
+        )
+
+    def handle(self, *args, **options):
+        if options['status']:
+            for name, lag in scheduler_lag().items():
+                self.stdout.write(f'{name}: {lag}')
+            return
+
+        if options['loop']:
+            # Processus séparé (Procfile) : ses invalidations doivent atteindre le web
+            require_shared_cache()
+            stop = threading.Event()
+            # Arrêt propre sur SIGTERM/SIGINT : le passage en cours se termine
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+            while not stop.is_set():
+                self.run_once(options['batch_size'])
+                connection.close()
+                stop.wait(options['interval'])
+            return
+
+        self.run_once(options['batch_size'])
+
+    def run_once(self, batch_size):
+        stats = run_due_transitions(batch_size)
+        for name, result in stats.items():
+            if result['count']:
+                self.stdout.write(
+                    f"{result['count']} publication(s) {name} "
+                    f"(retard max {result['max_lag_seconds']:.1f} s)"
+                )
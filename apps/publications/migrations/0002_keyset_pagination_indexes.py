@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 19:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0001_initial"),
+        ("publications", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="publication",
+            name="publication_status_2897c2_idx",
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["created_at", "id"], name="publication_created_988e88_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["status", "published_at", "id"],
+                name="publication_status_c60547_idx",
+            ),
+        ),
+    ]
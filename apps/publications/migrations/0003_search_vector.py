@@ -0,0 +1,56 @@
+# Generated by Django 5.0 on 2026-10-17 19:31
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.operations import CreateExtensionIfAvailable, extension_installed
+
+
+def create_search_configuration(apps, schema_editor):
+    """Configuration french_unaccent : stemming français, sans accents si possible"""
+    connection = schema_editor.connection
+    schema_editor.execute(
+        "CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french)"
+    )
+    if extension_installed(connection, "unaccent"):
+        schema_editor.execute(
+            "ALTER TEXT SEARCH CONFIGURATION french_unaccent "
+            "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem"
+        )
+
+
+def drop_search_configuration(apps, schema_editor):
+    schema_editor.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent")
+
+
+def backfill_search_vectors(apps, schema_editor):
+    from apps.publications.search import rebuild_search_vectors
+
+    Publication = apps.get_model("publications", "Publication")
+    rebuild_search_vectors(Publication.objects.all())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("publications", "0002_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        CreateExtensionIfAvailable("unaccent"),
+        migrations.RunPython(create_search_configuration, drop_search_configuration),
+        migrations.AddField(
+            model_name="publication",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="publication_search_gin"
+            ),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-17 19:40
+
+from django.db import migrations
+
+from core.operations import AddTrigramIndex, CreateExtensionIfAvailable
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("publications", "0003_search_vector"),
+    ]
+
+    operations = [
+        CreateExtensionIfAvailable("pg_trgm"),
+        AddTrigramIndex("Publication", "title", "publication_title_trgm"),
+        AddTrigramIndex("Publication", "content", "publication_content_trgm"),
+        AddTrigramIndex("Publication", "tags", "publication_tags_trgm"),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0 on 2026-10-17 19:25
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_normalized_tags(apps, schema_editor):
+    """Remplit normalized_tags par tranches d'identifiants"""
+    from apps.publications.tags import normalize_tags
+
+    Publication = apps.get_model("publications", "Publication")
+    ids = Publication.objects.order_by("pk").values_list("pk", flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return
+
+    for start in range(first, last + 1, BATCH_SIZE):
+        batch = list(
+            Publication.objects.filter(
+                pk__gte=start, pk__lt=start + BATCH_SIZE
+            ).only("pk", "tags")
+        )
+        for publication in batch:
+            publication.normalized_tags = normalize_tags(publication.tags)
+        Publication.objects.bulk_update(batch, ["normalized_tags"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0002_company_name_trgm"),
+        ("publications", "0004_trigram_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="normalized_tags",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=50),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+                verbose_name="tags normalisés",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["normalized_tags"], name="publication_tags_gin"
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_tags, migrations.RunPython.noop),
+        # Le filtre tags n'utilise plus de recherche de sous-chaîne
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS publication_tags_trgm", migrations.RunSQL.noop
+        ),
+    ]
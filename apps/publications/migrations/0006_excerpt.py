@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-17 19:31
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_excerpts(apps, schema_editor):
+    """Calcule les extraits par tranches d'identifiants"""
+    from apps.publications.excerpts import make_excerpt
+
+    Publication = apps.get_model("publications", "Publication")
+    ids = Publication.objects.order_by("pk").values_list("pk", flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return
+
+    for start in range(first, last + 1, BATCH_SIZE):
+        batch = list(
+            Publication.objects.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).only(
+                "pk", "content"
+            )
+        )
+        for publication in batch:
+            publication.excerpt = make_excerpt(publication.content)
+        Publication.objects.bulk_update(batch, ["excerpt"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("publications", "0005_normalized_tags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="excerpt",
+            field=models.CharField(
+                blank=True, editable=False, max_length=280, verbose_name="extrait"
+            ),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
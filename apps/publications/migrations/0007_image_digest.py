@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-17 19:35
+
+from django.db import migrations, models
+
+
+def backfill_image_digests(apps, schema_editor):
+    """Empreinte des images existantes (les fichiers absents sont ignorés)"""
+    from django.core.files.storage import default_storage
+
+    from apps.publications.renditions import file_digest
+
+    Publication = apps.get_model("publications", "Publication")
+    publications = (
+        Publication.objects.exclude(image="").exclude(image__isnull=True).only("image")
+    )
+    for publication in publications.iterator(chunk_size=500):
+        if not default_storage.exists(publication.image.name):
+            continue
+        with publication.image.open("rb") as image:
+            digest = file_digest(image)
+        Publication.objects.filter(pk=publication.pk).update(image_digest=digest)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("publications", "0006_excerpt"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="image_digest",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                verbose_name="empreinte de l'image",
+            ),
+        ),
+        migrations.RunPython(backfill_image_digests, migrations.RunPython.noop),
+    ]
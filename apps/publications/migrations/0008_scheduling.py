@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-17 19:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0002_company_name_trgm"),
+        ("publications", "0007_image_digest"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="expire_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="expire le"),
+        ),
+        migrations.AddField(
+            model_name="publication",
+            name="publish_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="publication programmée le"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                condition=models.Q(("publish_at__isnull", False), ("status", "DRAFT")),
+                fields=["publish_at"],
+                name="publication_publish_due",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                condition=models.Q(
+                    ("expire_at__isnull", False), ("status", "PUBLISHED")
+                ),
+                fields=["expire_at"],
+                name="publication_expire_due",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0002_company_name_trgm"),
+        ("publications", "0008_scheduling"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="trending_score",
+            field=models.FloatField(
+                blank=True, editable=False, null=True, verbose_name="score de tendance"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                condition=models.Q(
+                    ("status", "PUBLISHED"), ("trending_score__isnull", False)
+                ),
+                fields=["-trending_score", "-id"],
+                name="publication_trending",
+            ),
+        ),
+    ]
@@ -0,0 +1,153 @@
+# Generated by Django 5.0 on 2026-10-17 19:42
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0002_company_name_trgm"),
+        ("publications", "0009_trending_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsWatermark",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("last_event_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ViewRollupHourly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("views", models.PositiveBigIntegerField(default=0)),
+                ("bucket", models.DateTimeField()),
+                (
+                    "company",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="companies.company",
+                    ),
+                ),
+                (
+                    "publication",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="publications.publication",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ViewEvent",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("occurred_at", models.DateTimeField()),
+                ("hits", models.PositiveIntegerField()),
+                (
+                    "company",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="companies.company",
+                    ),
+                ),
+                (
+                    "publication",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="publications.publication",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.BrinIndex(
+                        fields=["occurred_at"], name="view_event_occurred_brin"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ViewRollupDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("views", models.PositiveBigIntegerField(default=0)),
+                ("bucket", models.DateField()),
+                (
+                    "company",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="companies.company",
+                    ),
+                ),
+                (
+                    "publication",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="publications.publication",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["company", "bucket"], name="view_daily_company"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="viewrollupdaily",
+            constraint=models.UniqueConstraint(
+                fields=("publication", "bucket"), name="view_daily_unique"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="viewrolluphourly",
+            index=models.Index(
+                fields=["company", "bucket"], name="view_hourly_company"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="viewrolluphourly",
+            constraint=models.UniqueConstraint(
+                fields=("publication", "bucket"), name="view_hourly_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+
+def backfill_renditions_ready(apps, schema_editor):
+    """Déclinaisons déjà présentes dans le stockage, une fois par image"""
+    from django.core.files.storage import default_storage
+
+    from apps.publications.renditions import (
+        RENDITION_FORMATS,
+        RENDITION_WIDTHS,
+        rendition_bit,
+        rendition_path,
+    )
+
+    Publication = apps.get_model("publications", "Publication")
+    digests = (
+        Publication.objects.exclude(image_digest="")
+        .values_list("image_digest", flat=True)
+        .distinct()
+    )
+    for digest in digests.iterator(chunk_size=500):
+        mask = 0
+        for size in RENDITION_WIDTHS:
+            for fmt in RENDITION_FORMATS:
+                if default_storage.exists(rendition_path(digest, size, fmt)):
+                    mask |= rendition_bit(size, fmt)
+        if mask:
+            Publication.objects.filter(image_digest=digest).update(renditions_ready=mask)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("publications", "0010_view_analytics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="renditions_ready",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, verbose_name="déclinaisons prêtes"
+            ),
+        ),
+        migrations.RunPython(backfill_renditions_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 5.0 on 2026-10-17 20:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0003_publication_counters"),
+        ("publications", "0011_renditions_ready"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="analyticswatermark",
+            options={
+                "verbose_name": "curseur de compactage",
+                "verbose_name_plural": "curseurs de compactage",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="viewevent",
+            options={
+                "verbose_name": "événement de vue",
+                "verbose_name_plural": "événements de vue",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="viewrollupdaily",
+            options={
+                "verbose_name": "vues par jour",
+                "verbose_name_plural": "vues par jour",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="viewrolluphourly",
+            options={
+                "verbose_name": "vues par heure",
+                "verbose_name_plural": "vues par heure",
+            },
+        ),
+        migrations.AlterField(
+            model_name="analyticswatermark",
+            name="last_event_id",
+            field=models.BigIntegerField(
+                default=0, verbose_name="dernier événement compacté"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="analyticswatermark",
+            name="name",
+            field=models.CharField(
+                max_length=50,
+                primary_key=True,
+                serialize=False,
+                verbose_name="compacteur",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="analyticswatermark",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="modifié le"),
+        ),
+        migrations.AlterField(
+            model_name="viewevent",
+            name="company",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="companies.company",
+                verbose_name="entreprise",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="viewevent",
+            name="hits",
+            field=models.PositiveIntegerField(verbose_name="vues"),
+        ),
+        migrations.AlterField(
+            model_name="viewevent",
+            name="occurred_at",
+            field=models.DateTimeField(verbose_name="date des vues"),
+        ),
+        migrations.AlterField(
+            model_name="viewevent",
+            name="publication",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="publications.publication",
+                verbose_name="publication",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="viewrollupdaily",
+            name="bucket",
+            field=models.DateField(verbose_name="jour"),
+        ),
+        migrations.AlterField(
+            model_name="viewrollupdaily",
+            name="company",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="companies.company",
+                verbose_name="entreprise",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="viewrollupdaily",
+            name="publication",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="publications.publication",
+                verbose_name="publication",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="viewrollupdaily",
+            name="views",
+            field=models.PositiveBigIntegerField(default=0, verbose_name="vues"),
+        ),
+        migrations.AlterField(
+            model_name="viewrolluphourly",
+            name="bucket",
+            field=models.DateTimeField(verbose_name="heure"),
+        ),
+        migrations.AlterField(
+            model_name="viewrolluphourly",
+            name="company",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="companies.company",
+                verbose_name="entreprise",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="viewrolluphourly",
+            name="publication",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="publications.publication",
+                verbose_name="publication",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="viewrolluphourly",
+            name="views",
+            field=models.PositiveBigIntegerField(default=0, verbose_name="vues"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("publications", "0012_view_analytics_verbose_names"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SchedulerRun",
+            fields=[
+                (
+                    "name",
+                    models.CharField(
+                        max_length=50,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="scheduler",
+                    ),
+                ),
+                ("ran_at", models.DateTimeField(verbose_name="passage le")),
+                ("stats", models.JSONField(default=dict, verbose_name="résultats")),
+            ],
+            options={
+                "verbose_name": "passage du scheduler",
+                "verbose_name_plural": "passages du scheduler",
+            },
+        ),
+    ]
@@ -1,7 +1,60 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.translation import gettext_lazy as _
+from apps.companies.services import apply_publication_transitions
 from core.models import TimeStampedModel
+from .excerpts import EXCERPT_LENGTH, make_excerpt
+from .renditions import file_digest, rendition_pool
+from .search import SEARCH_FIELDS, search_vector
+from .tags import MAX_TAG_LENGTH, normalize_tags
+
+
+class PublicationQuerySet(models.QuerySet):
+    """
+    Règles de visibilité des publications.
+    
+    Un utilisateur voit les publications publiées et toutes les siennes.
+    Plutôt qu'un OR + DISTINCT (qui empêche l'usage des index), la liste
+    est découpée en branches disjointes, chacune servie par son index :
+    (status, published_at, id) et (author, status).
+    """
+    
+    def published(self):
+        return self.filter(status=Publication.Status.PUBLISHED)
+    
+    def visibility_branches(self, user):
+        """Branches disjointes à combiner en UNION ALL"""
+        if not user or not user.is_authenticated:
+            return [self.published()]
+        return [
+            self.published(),
+            self.filter(author_id=user.pk).exclude(status=Publication.Status.PUBLISHED),
+        ]
+    
+    def for_list(self, full_content=False):
+        """
+        Colonnes des listes seulement : ni content (TOAST) ni image,
+        sauf si le contenu complet est demandé
+        """
+        fields = [
+            'title', 'status', 'slug', 'views_count', 'excerpt', 'image_digest', 'renditions_ready',
+            'published_at', 'created_at', 'updated_at', 'author', 'company',
+            'author__first_name', 'author__last_name', 'company__name',
+        ]
+        if full_content:
+            fields.append('content')
+        return self.select_related('author', 'company').only(*fields)
+    
+    def visible_to(self, user):
+        """Requête unique, pour les accès par clé (détail, actions)"""
+        if not user or not user.is_authenticated:
+            return self.published()
+        return self.filter(
+            models.Q(status=Publication.Status.PUBLISHED) | models.Q(author_id=user.pk)
+        )
 
 
 class Publication(TimeStampedModel):
@@ -33,6 +86,14 @@ class Publication(TimeStampedModel):
     
     content = models.TextField(_('contenu'))
     
+    # Extrait pour les listes, maintenu par save() (évite de lire content)
+    excerpt = models.CharField(
+        _('extrait'),
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False
+    )
+    
     status = models.CharField(
         _('statut'),
         max_length=20,
@@ -54,17 +115,54 @@ class Publication(TimeStampedModel):
         null=True
     )
     
+    # Empreinte SHA-256 de l'image : clé du cache de déclinaisons
+    image_digest = models.CharField(
+        _('empreinte de l\'image'),
+        max_length=64,
+        blank=True,
+        editable=False
+    )
+    
+    # Déclinaisons présentes dans le stockage, un bit par (taille, format) :
+    # les listes donnent leur URL sans interroger le stockage
+    renditions_ready = models.PositiveSmallIntegerField(
+        _('déclinaisons prêtes'),
+        default=0,
+        editable=False
+    )
+    
     views_count = models.PositiveIntegerField(
         _('nombre de vues'),
         default=0
     )
     
+    # Popularité avec décroissance temporelle (log), maintenue au flush des vues
+    trending_score = models.FloatField(
+        _('score de tendance'),
+        null=True,
+        blank=True,
+        editable=False
+    )
+    
     published_at = models.DateTimeField(
         _('date de publication'),
         null=True,
         blank=True
     )
     
+    # Programmation : publication (brouillon) et expiration (publiée) par le scheduler
+    publish_at = models.DateTimeField(
+        _('publication programmée le'),
+        null=True,
+        blank=True
+    )
+    
+    expire_at = models.DateTimeField(
+        _('expire le'),
+        null=True,
+        blank=True
+    )
+    
     tags = models.CharField(
         _('tags'),
         max_length=255,
@@ -72,6 +170,20 @@ class Publication(TimeStampedModel):
         help_text=_('Tags séparés par des virgules')
     )
     
+    # Forme normalisée de tags, maintenue par save() et indexée (GIN)
+    normalized_tags = ArrayField(
+        models.CharField(max_length=MAX_TAG_LENGTH),
+        verbose_name=_('tags normalisés'),
+        default=list,
+        blank=True,
+        editable=False
+    )
+    
+    # Index plein texte maintenu par save() (titre > tags > contenu)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = PublicationQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('publication')
         verbose_name_plural = _('publications')
@@ -79,25 +191,136 @@ class Publication(TimeStampedModel):
         indexes = [
             models.Index(fields=['author', 'status']),
             models.Index(fields=['company']),
-            models.Index(fields=['status', '-published_at']),
+            # Clés des curseurs de pagination (champ de tri, id)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status', 'published_at', 'id']),
             models.Index(fields=['slug']),
+            GinIndex(fields=['search_vector'], name='publication_search_gin'),
+            GinIndex(fields=['normalized_tags'], name='publication_tags_gin'),
+            # Classement /trending/ : lu directement dans l'ordre de l'index
+            models.Index(
+                fields=['-trending_score', '-id'],
+                name='publication_trending',
+                condition=models.Q(status='PUBLISHED', trending_score__isnull=False)
+            ),
+            # Files d'attente du scheduler : seules les lignes en attente sont indexées
+            models.Index(
+                fields=['publish_at'],
+                name='publication_publish_due',
+                condition=models.Q(status='DRAFT', publish_at__isnull=False)
+            ),
+            models.Index(
+                fields=['expire_at'],
+                name='publication_expire_due',
+                condition=models.Q(status='PUBLISHED', expire_at__isnull=False)
+            ),
         ]
     
     def __str__(self):
         return self.title
     
     def save(self, *args, **kwargs):
-        """Génère automatiquement le slug si non fourni"""
+        """Génère le slug si non fourni, normalise tags et extrait, calcule l'empreinte de l'image"""
         if not self.slug:
-            from django.utils.text import slugify
-            import uuid
-            self.slug = f"{slugify(self.title)}-{uuid.uuid4().hex[:8]}"
-        super().save(*args, **kwargs)
+            self.slug = self.build_slug()
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'tags' in update_fields:
+            self.normalized_tags = normalize_tags(self.tags)
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'normalized_tags'}
+        new_image = False
+        if update_fields is None or 'image' in update_fields:
+            new_image = bool(self.image) and not self.image._committed
+            if new_image:
+                self.image_digest = file_digest(self.image)
+                self.renditions_ready = 0
+            elif not self.image:
+                self.image_digest = ''
+                self.renditions_ready = 0
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'image_digest', 'renditions_ready'}
+        if update_fields is None or 'content' in update_fields:
+            self.excerpt = make_excerpt(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'excerpt'}
+        
+        counted = update_fields is None or bool({'status', 'company'} & set(update_fields))
+        using = kwargs.get('using') or router.db_for_write(Publication, instance=self)
+        with transaction.atomic(using=using):
+            # Sans update_fields, le texte relu dit s'il faut réindexer
+            previous = self.locked_previous_state(
+                using, SEARCH_FIELDS if update_fields is None else ()
+            ) if counted else None
+            if update_fields is None and previous:
+                # search_vector n'est écrit que par la réindexation ci-dessous :
+                # la valeur en mémoire (None après create()) écraserait l'index
+                kwargs['update_fields'] = self.loaded_field_names(exclude={'search_vector'})
+            super().save(*args, **kwargs)
+            if counted:
+                apply_publication_transitions([
+                    (previous.get('company_id'), previous.get('status'), self.company_id, self.status)
+                ])
+        
+        # Déclinaisons préparées en arrière-plan une fois l'image enregistrée
+        if new_image:
+            transaction.on_commit(lambda: rendition_pool.schedule(self))
+        
+        # Mise à jour incrémentale de l'index plein texte, seulement si le texte change
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            reindex = not previous or any(
+                previous[field] != getattr(self, field) for field in SEARCH_FIELDS if field not in deferred
+            )
+        else:
+            reindex = bool(set(SEARCH_FIELDS) & set(update_fields))
+        if reindex:
+            Publication.objects.filter(pk=self.pk).update(search_vector=search_vector())
     
-    def increment_views(self):
-        """Incrémente le compteur de vues"""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+    def locked_previous_state(self, using, fields=()):
+        """
+        Entreprise, statut (et fields) en base avant écriture, pour les
+        compteurs des entreprises. Relu sous verrou (SELECT ... FOR UPDATE)
+        dans la transaction de save() : deux écritures concurrentes de la
+        même ligne appliquent leurs transitions l'une après l'autre, la
+        seconde depuis l'état écrit par la première. {} pour une création.
+        """
+        if self._state.adding:
+            return {}
+        state = (
+            Publication.objects.using(using).select_for_update()
+            .filter(pk=self.pk).values('company_id', 'status', *fields).first()
+        )
+        return state or {}
+    
+    def loaded_field_names(self, exclude=()):
+        """Colonnes chargées (non différées) écrites par un save() complet"""
+        deferred = self.get_deferred_fields()
+        return [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname not in deferred and field.name not in exclude
+        ]
+    
+    def build_slug(self):
+        """Slug unique dérivé du titre"""
+        from django.utils.text import slugify
+        import uuid
+        return f"{slugify(self.title)}-{uuid.uuid4().hex[:8]}"
+    
+    def refresh_derived_fields(self):
+        """
+        Recalcule slug (si absent), tags normalisés et extrait en mémoire,
+        pour les écritures en masse qui ne passent pas par save()
+        """
+        if not self.slug:
+            self.slug = self.build_slug()
+        self.normalized_tags = normalize_tags(self.tags)
+        self.excerpt = make_excerpt(self.content)
+    
+    def increment_views(self, count=1):
+        """Incrémente le compteur de vues (UPDATE atomique, sans read-modify-write)"""
+        Publication.objects.filter(pk=self.pk).update(views_count=models.F('views_count') + count)
+        self.views_count += count
     
     @property
     def is_published(self):
@@ -105,5 +328,120 @@ class Publication(TimeStampedModel):
         return self.status == self.Status.PUBLISHED
     
     def get_tags_list(self):
-        """Retourne la liste des tags"""
-        return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
\ No newline at end of file
+        """Retourne la liste des tags (normalisés)"""
+        return list(self.normalized_tags)
+
+
+class ViewEvent(models.Model):
+    """
+    Journal brut des vues, en ajout seul : une ligne par publication et
+    par flush du compteur de vues. Compacté en agrégats horaires et
+    journaliers puis purgé.
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    # Pas d'index B-tree : la table est lue par plages d'id et purgée par date
+    publication = models.ForeignKey(
+        Publication,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('publication'),
+        db_index=False
+    )
+    company = models.ForeignKey(
+        'companies.Company',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name=_('entreprise'),
+        null=True,
+        db_index=False
+    )
+    occurred_at = models.DateTimeField(_('date des vues'))
+    hits = models.PositiveIntegerField(_('vues'))
+    
+    class Meta:
+        verbose_name = _('événement de vue')
+        verbose_name_plural = _('événements de vue')
+        indexes = [
+            BrinIndex(fields=['occurred_at'], name='view_event_occurred_brin'),
+        ]
+
+
+class ViewRollup(models.Model):
+    """Agrégat de vues par publication et par période (base des rollups)"""
+    
+    publication = models.ForeignKey(
+        Publication,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('publication')
+    )
+    # Entreprise au moment des vues (les séries d'entreprise ne joignent rien)
+    company = models.ForeignKey(
+        'companies.Company',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name=_('entreprise'),
+        null=True,
+        db_index=False
+    )
+    views = models.PositiveBigIntegerField(_('vues'), default=0)
+    
+    class Meta:
+        abstract = True
+
+
+class ViewRollupHourly(ViewRollup):
+    """Vues par heure"""
+    
+    bucket = models.DateTimeField(_('heure'))
+    
+    class Meta:
+        verbose_name = _('vues par heure')
+        verbose_name_plural = _('vues par heure')
+        constraints = [
+            models.UniqueConstraint(fields=['publication', 'bucket'], name='view_hourly_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['company', 'bucket'], name='view_hourly_company'),
+        ]
+
+
+class ViewRollupDaily(ViewRollup):
+    """Vues par jour"""
+    
+    bucket = models.DateField(_('jour'))
+    
+    class Meta:
+        verbose_name = _('vues par jour')
+        verbose_name_plural = _('vues par jour')
+        constraints = [
+            models.UniqueConstraint(fields=['publication', 'bucket'], name='view_daily_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['company', 'bucket'], name='view_daily_company'),
+        ]
+
+
+class AnalyticsWatermark(models.Model):
+    """Dernier événement compacté (une ligne par compacteur, verrouillée pendant un passage)"""
+    
+    name = models.CharField(_('compacteur'), max_length=50, primary_key=True)
+    last_event_id = models.BigIntegerField(_('dernier événement compacté'), default=0)
+    updated_at = models.DateTimeField(_('modifié le'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('curseur de compactage')
+        verbose_name_plural = _('curseurs de compactage')
+
+
+class SchedulerRun(models.Model):
+    """Dernier passage d'un scheduler (une ligne par scheduler), lu par la supervision"""
+    
+    name = models.CharField(_('scheduler'), max_length=50, primary_key=True)
+    ran_at = models.DateTimeField(_('passage le'))
+    stats = models.JSONField(_('résultats'), default=dict)
+    
+    class Meta:
+        verbose_name = _('passage du scheduler')
+        verbose_name_plural = _('passages du scheduler')
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from apps.companies.permissions import IsCompanyOwner
 
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
@@ -19,4 +20,17 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         # L'édition/suppression uniquement pour l'auteur
-        return obj.author == request.user
\ No newline at end of file
+        return obj.author_id == request.user.pk
+
+
+class IsAuthorOrCompanyOwner(permissions.BasePermission):
+    """
+    Accès réservé, y compris en lecture, à l'auteur de la publication
+    et au propriétaire de son entreprise
+    """
+    message = 'Statistiques réservées à l\'auteur et à l\'entreprise'
+    
+    def has_object_permission(self, request, view, obj):
+        if obj.author_id == request.user.pk:
+            return True
+        return obj.company is not None and IsCompanyOwner().has_object_permission(request, view, obj.company)
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models import F
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Largeurs maximales des déclinaisons (jamais d'agrandissement)
+RENDITION_WIDTHS = {
+    'thumb': 320,
+    'card': 800,
+    'full': 1600,
+}
+
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def file_digest(file):
+    """Empreinte SHA-256 du contenu d'un fichier (lu par morceaux)"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def rendition_path(digest, size, fmt):
+    """Chemin adressé par le contenu : deux images identiques partagent leurs déclinaisons"""
+    return f'renditions/{digest[:2]}/{digest}/{size}.{fmt}'
+
+
+def rendition_bit(size, fmt):
+    """Bit de la déclinaison dans Publication.renditions_ready"""
+    index = list(RENDITION_WIDTHS).index(size) * len(RENDITION_FORMATS) + list(RENDITION_FORMATS).index(fmt)
+    return 1 << index
+
+
+def mark_renditions_ready(digest, pairs):
+    """Note les déclinaisons (taille, format) présentes sur les publications de cette image"""
+    from .models import Publication
+
+    mask = 0
+    for size, fmt in pairs:
+        mask |= rendition_bit(size, fmt)
+    Publication.objects.filter(image_digest=digest).update(renditions_ready=F('renditions_ready').bitor(mask))
+
+
+def render(source, width, fmt):
+    """Redimensionne une image ouverte et retourne les octets encodés"""
+    image = ImageOps.exif_transpose(source)
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    pil_format, options = RENDITION_FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        transparent = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if transparent else 'RGB')
+
+    output = BytesIO()
+    image.save(output, pil_format, **options)
+    return output.getvalue()
+
+
+class RenditionPool:
+    """
+    Génération des déclinaisons d'images hors du thread de la requête.
+
+    Un pool de threads par processus (recréé après un fork) ; les
+    demandes identiques en cours sont regroupées sur le même futur.
+    Les fichiers sont écrits dans le stockage média sous un chemin dérivé
+    de l'empreinte de l'original : une déclinaison existante est servie
+    telle quelle, sans régénération. Les déclinaisons prêtes sont notées
+    sur les publications (renditions_ready), pour que les listes donnent
+    leur URL sans interroger le stockage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = {}
+
+    @property
+    def executor(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.RENDITION_WORKERS,
+                        thread_name_prefix='renditions'
+                    )
+                    self._pending = {}
+                    self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, image_name, digest, sizes=None, formats=None):
+        """Planifie les déclinaisons manquantes, retourne le futur"""
+        sizes = tuple(sizes or RENDITION_WIDTHS)
+        formats = tuple(formats or RENDITION_FORMATS)
+        key = (digest, sizes, formats)
+        executor = self.executor
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = executor.submit(self._generate, image_name, digest, sizes, formats)
+                self._pending[key] = future
+                future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return future
+
+    def schedule(self, publication):
+        """Prépare toutes les déclinaisons d'une publication (après upload)"""
+        if publication.image and publication.image_digest:
+            return self.submit(publication.image.name, publication.image_digest)
+        return None
+
+    def ensure(self, publication, size, fmt, timeout=None):
+        """Chemin de la déclinaison, générée à la demande si absente"""
+        path = rendition_path(publication.image_digest, size, fmt)
+        if not default_storage.exists(path):
+            timeout = timeout or settings.RENDITION_TIMEOUT
+            self.submit(publication.image.name, publication.image_digest, [size], [fmt]).result(timeout)
+        if not publication.renditions_ready & rendition_bit(size, fmt):
+            # Aussi noté par le pool ; ici pour une image déjà déclinée ailleurs
+            mark_renditions_ready(publication.image_digest, [(size, fmt)])
+        return path
+
+    def _generate(self, image_name, digest, sizes, formats):
+        try:
+            missing = [
+                (size, fmt) for size in sizes for fmt in formats
+                if not default_storage.exists(rendition_path(digest, size, fmt))
+            ]
+            if missing:
+                self._render_missing(image_name, digest, missing)
+            mark_renditions_ready(digest, [(size, fmt) for size in sizes for fmt in formats])
+        finally:
+            # Connexion de ce thread rendue entre deux tâches
+            connections.close_all()
+
+    def _render_missing(self, image_name, digest, missing):
+        try:
+            with default_storage.open(image_name, 'rb') as file, Image.open(file) as source:
+                source.load()
+                for size, fmt in missing:
+                    data = render(source, RENDITION_WIDTHS[size], fmt)
+                    path = rendition_path(digest, size, fmt)
+                    if not default_storage.exists(path):
+                        default_storage.save(path, ContentFile(data))
+        except Exception:
+            logger.exception('Échec de la génération des déclinaisons de %s', image_name)
+            raise
+
+
+def rendition_urls(publication, request=None):
+    """
+    Carte {taille: {format: url}} : URL média si la déclinaison est notée
+    prête sur la publication, sinon URL de génération à la demande (qui
+    redirige vers le fichier). Aucun accès au stockage.
+    """
+    digest = publication.image_digest
+    if not digest:
+        return None
+
+    renditions = {}
+    for size in RENDITION_WIDTHS:
+        renditions[size] = {}
+        for fmt in RENDITION_FORMATS:
+            if publication.renditions_ready & rendition_bit(size, fmt):
+                url = default_storage.url(rendition_path(digest, size, fmt))
+            else:
+                url = reverse(
+                    'publications:publication-rendition',
+                    kwargs={'pk': publication.pk, 'size': size, 'fmt': fmt}
+                )
+            renditions[size][fmt] = request.build_absolute_uri(url) if request else url
+    return renditions
+
+
+rendition_pool = RenditionPool()
@@ -0,0 +1,110 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.companies.services import apply_publication_transitions
+from .models import Publication, SchedulerRun
+from .services import invalidate_publications
+
+# Ligne SchedulerRun du dernier passage, lue par le point d'accès de supervision
+# (en base : le scheduler tourne dans son propre processus)
+SCHEDULER_NAME = 'transitions'
+
+# Transitions programmées : (nom, statut source, colonne d'échéance, statut cible)
+TRANSITIONS = (
+    ('published', Publication.Status.DRAFT, 'publish_at', Publication.Status.PUBLISHED),
+    ('archived', Publication.Status.PUBLISHED, 'expire_at', Publication.Status.ARCHIVED),
+)
+
+# Le WHERE reprend exactement la condition des index partiels
+# publication_publish_due / publication_expire_due.
+# SKIP LOCKED : plusieurs schedulers se partagent les lignes échues sans
+# s'attendre ni traiter deux fois la même ligne.
+TRANSITION_SQL = """
+    WITH due AS (
+        SELECT id FROM {table}
+        WHERE status = %(source)s AND {due_column} IS NOT NULL AND {due_column} <= %(now)s
+        ORDER BY {due_column}
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE {table} AS p
+    SET status = %(target)s, updated_at = %(now)s{extra}
+    FROM due
+    WHERE p.id = due.id
+    RETURNING p.id, p.{due_column}, p.company_id
+"""
+
+LAG_SQL = """
+    SELECT COUNT(*), MIN({due_column})
+    FROM {table}
+    WHERE status = %(source)s AND {due_column} IS NOT NULL AND {due_column} <= %(now)s
+"""
+
+
+def _format(sql, due_column, extra=''):
+    return sql.format(table=Publication._meta.db_table, due_column=due_column, extra=extra)
+
+
+def apply_transition(source, due_column, target, now, limit):
+    """
+    Fait passer un lot de lignes échues de source à target en un UPDATE.
+    Retourne [(id, échéance), ...] des lignes modifiées ; les compteurs
+    des entreprises sont mis à jour dans la même transaction.
+    """
+    # La date de publication affichée est l'échéance prévue, pas l'heure du passage
+    extra = ', published_at = p.publish_at' if target == Publication.Status.PUBLISHED else ''
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_format(TRANSITION_SQL, due_column, extra), {
+            'source': source,
+            'target': target,
+            'now': now,
+            'limit': limit,
+        })
+        rows = cursor.fetchall()
+        apply_publication_transitions([
+            (company_id, source, company_id, target) for _, _, company_id in rows
+        ])
+    return [(pk, due) for pk, due, _ in rows]
+
+
+def run_due_transitions(batch_size=500, now=None):
+    """
+    Applique toutes les transitions échues par lots de batch_size.
+
+    Retourne, par transition, le nombre de lignes traitées et le retard
+    maximal (secondes entre l'échéance et le passage effectif).
+    """
+    now = now or timezone.now()
+    stats = {}
+    for name, source, due_column, target in TRANSITIONS:
+        count, max_lag = 0, 0.0
+        while True:
+            rows = apply_transition(source, due_column, target, now, batch_size)
+            if rows:
+                invalidate_publications(*(pk for pk, _ in rows))
+                count += len(rows)
+                max_lag = max(max_lag, *((now - due).total_seconds() for _, due in rows))
+            if len(rows) < batch_size:
+                break
+        stats[name] = {'count': count, 'max_lag_seconds': max_lag}
+    SchedulerRun.objects.update_or_create(name=SCHEDULER_NAME, defaults={'ran_at': now, 'stats': stats})
+    return stats
+
+
+def scheduler_lag(now=None):
+    """
+    Retard courant des files d'attente : lignes échues non encore traitées
+    et âge de la plus ancienne (servi par les index partiels)
+    """
+    now = now or timezone.now()
+    lag = {}
+    with connection.cursor() as cursor:
+        for name, source, due_column, target in TRANSITIONS:
+            cursor.execute(_format(LAG_SQL, due_column), {'source': source, 'now': now})
+            backlog, oldest = cursor.fetchone()
+            lag[name] = {
+                'backlog': backlog,
+                'lag_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+            }
+    last_run = SchedulerRun.objects.filter(name=SCHEDULER_NAME).first()
+    lag['last_run'] = last_run and {'ran_at': last_run.ran_at, **last_run.stats}
+    return lag
@@ -0,0 +1,50 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+# Configuration texte créée par la migration 0003 : stemming français
+# + suppression des accents (si l'extension unaccent est disponible)
+SEARCH_CONFIG = 'french_unaccent'
+
+# Colonnes lues par search_vector() : les modifier impose de recalculer le vecteur
+SEARCH_FIELDS = ('title', 'tags', 'content')
+
+
+def search_vector():
+    """Vecteur pondéré : titre (A) > tags (B) > contenu (C)"""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('tags', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def search_publications(queryset, text):
+    """
+    Filtre un queryset par recherche plein texte et annote search_rank.
+
+    Le rang est converti en double precision pour pouvoir servir de clé
+    de pagination sans perte de précision.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+    )
+
+
+def rebuild_search_vectors(queryset, batch_size=1000):
+    """
+    Recalcule search_vector par tranches d'identifiants.
+    Retourne le nombre de lignes mises à jour.
+    """
+    bounds = queryset.order_by('pk').values_list('pk', flat=True)
+    first, last = bounds.first(), bounds.last()
+    if first is None:
+        return 0
+
+    updated = 0
+    for start in range(first, last + 1, batch_size):
+        updated += queryset.filter(
+            pk__gte=start, pk__lt=start + batch_size
+        ).update(search_vector=search_vector())
+    return updated
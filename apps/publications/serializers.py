@@ -1,24 +1,42 @@
+from datetime import timedelta
 from rest_framework import serializers
 from django.utils import timezone
+from .analytics import GRANULARITIES
 from .models import Publication
+from .renditions import rendition_urls
 from apps.accounts.serializers import UserSerializer
 from apps.companies.serializers import CompanyListSerializer
 
 
+def validate_schedule(attrs, instance=None):
+    """L'expiration programmée doit suivre la publication programmée"""
+    publish_at = attrs.get('publish_at', getattr(instance, 'publish_at', None))
+    expire_at = attrs.get('expire_at', getattr(instance, 'expire_at', None))
+    if publish_at and expire_at and expire_at <= publish_at:
+        raise serializers.ValidationError({
+            'expire_at': 'La date d\'expiration doit suivre la date de publication programmée'
+        })
+
+
 class PublicationSerializer(serializers.ModelSerializer):
     """Serializer complet pour les publications"""
     
     author = UserSerializer(read_only=True)
     company = CompanyListSerializer(read_only=True)
-    tags_list = serializers.SerializerMethodField()
+    tags_list = serializers.ListField(
+        child=serializers.CharField(),
+        source='normalized_tags',
+        read_only=True
+    )
+    renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = Publication
         fields = [
             'id', 'author', 'company',
             'title', 'content', 'status', 'slug',
-            'image', 'views_count', 'published_at',
-            'tags', 'tags_list',
+            'image', 'renditions', 'views_count', 'published_at',
+            'publish_at', 'expire_at', 'tags', 'tags_list',
             'created_at', 'updated_at'
         ]
         read_only_fields = [
@@ -30,9 +48,9 @@ class PublicationSerializer(serializers.ModelSerializer):
         super().__init__(*args, **kwargs)
         # Pas besoin de définir company_id ici car on ne l'utilise plus
     
-    def get_tags_list(self, obj):
-        """Retourne la liste des tags"""
-        return obj.get_tags_list()
+    def get_renditions(self, obj):
+        """Déclinaisons de l'image {taille: {format: url}}"""
+        return rendition_urls(obj, self.context.get('request'))
     
     def validate(self, attrs):
         """Validation des données"""
@@ -44,6 +62,7 @@ class PublicationSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     'company': 'Cette entreprise ne vous appartient pas'
                 })
+        validate_schedule(attrs, self.instance)
         return attrs
     
     def create(self, validated_data):
@@ -68,22 +87,35 @@ class PublicationSerializer(serializers.ModelSerializer):
 
 
 class PublicationListSerializer(serializers.ModelSerializer):
-    """Serializer simplifié pour la liste des publications"""
+    """
+    Serializer simplifié pour la liste des publications
+    (extrait seulement, contenu complet si context['full_content'])
+    """
     
     author_name = serializers.SerializerMethodField()  # ✅ Utiliser une méthode
     company_name = serializers.CharField(source='company.name', read_only=True, allow_null=True)
+    renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = Publication
         fields = [
             'id', 'title', 'author_name', 'company_name',
-            'status', 'slug', 'views_count','content',
-            'published_at', 'created_at'
+            'status', 'slug', 'views_count', 'excerpt', 'content',
+            'renditions', 'published_at', 'created_at'
         ]
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('full_content'):
+            self.fields.pop('content')
+    
     def get_author_name(self, obj):
         """Retourne le nom complet de l'auteur avec fallback"""
         return obj.author.full_name or obj.author.username or 'Utilisateur'
+    
+    def get_renditions(self, obj):
+        """Déclinaisons de l'image {taille: {format: url}}"""
+        return rendition_urls(obj, self.context.get('request'))
 
 
 class PublicationCreateSerializer(serializers.ModelSerializer):
@@ -93,7 +125,8 @@ class PublicationCreateSerializer(serializers.ModelSerializer):
         model = Publication
         fields = [
             'title', 'content', 'company',
-            'status', 'image', 'tags'
+            'status', 'image', 'tags',
+            'publish_at', 'expire_at'
         ]
     
     def validate(self, attrs):
@@ -106,6 +139,7 @@ class PublicationCreateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     'company': 'Cette entreprise ne vous appartient pas'
                 })
+        validate_schedule(attrs, self.instance)
         return attrs
     
     def create(self, validated_data):
@@ -128,7 +162,8 @@ class PublicationUpdateSerializer(serializers.ModelSerializer):
         model = Publication
         fields = [
             'title', 'content', 'company',
-            'status', 'image', 'tags'
+            'status', 'image', 'tags',
+            'publish_at', 'expire_at'
         ]
     
     def validate(self, attrs):
@@ -141,6 +176,7 @@ class PublicationUpdateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     'company': 'Cette entreprise ne vous appartient pas'
                 })
+        validate_schedule(attrs, self.instance)
         return attrs
     
     def update(self, instance, validated_data):
@@ -151,4 +187,59 @@ class PublicationUpdateSerializer(serializers.ModelSerializer):
             from django.utils import timezone
             validated_data['published_at'] = timezone.now()
         
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class PublicationBulkItemSerializer(serializers.Serializer):
+    """
+    Élément d'une écriture en masse (JSON, sans image).
+    L'appartenance des entreprises est vérifiée pour tout le lot en une requête.
+    """
+    
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=255)
+    content = serializers.CharField()
+    company = serializers.IntegerField(required=False, allow_null=True)
+    status = serializers.ChoiceField(
+        choices=Publication.Status.choices,
+        default=Publication.Status.DRAFT
+    )
+    tags = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    publish_at = serializers.DateTimeField(required=False, allow_null=True)
+    expire_at = serializers.DateTimeField(required=False, allow_null=True)
+    
+    def validate(self, attrs):
+        validate_schedule(attrs)
+        return attrs
+
+
+class ViewAnalyticsQuerySerializer(serializers.Serializer):
+    """
+    Paramètres des statistiques de vues : granularity (hour|day), since, until.
+    Par défaut : 48 dernières heures ou 30 derniers jours.
+    """
+    
+    granularity = serializers.ChoiceField(choices=list(GRANULARITIES), default='day')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    
+    def validate(self, attrs):
+        now = timezone.now()
+        granularity = attrs['granularity']
+        if granularity == 'hour':
+            until = attrs.get('until', now)
+            since = attrs.get('since', until - timedelta(hours=47))
+            since = since.replace(minute=0, second=0, microsecond=0)
+        else:
+            until = timezone.localdate(attrs.get('until', now))
+            since = timezone.localdate(attrs['since']) if 'since' in attrs else until - timedelta(days=29)
+        
+        _, max_range = GRANULARITIES[granularity]
+        if since > until:
+            raise serializers.ValidationError({'since': 'since doit précéder until'})
+        if until - since > max_range:
+            raise serializers.ValidationError({
+                'since': f'Période limitée à {max_range.days} jours pour granularity={granularity}'
+            })
+        attrs.update(since=since, until=until)
+        return attrs
@@ -0,0 +1,305 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.companies.models import Company
+from apps.companies.services import apply_publication_transitions
+from core.cache import VersionedResponseCache
+from core.localstore import SharedLocalStore
+from .models import Publication
+from .search import search_vector
+from .serializers import PublicationBulkItemSerializer
+from .analytics import record_view_events
+from .trending import apply_trending_increments
+
+logger = logging.getLogger(__name__)
+
+# Réponses publiques (anonymes) de list et retrieve
+response_cache = VersionedResponseCache(
+    'publications', timeout=settings.PUBLICATION_CACHE_TIMEOUT
+)
+
+
+def invalidate_publications(*publication_ids):
+    """Invalide la liste et le détail des publications données"""
+    response_cache.bump('list', *(f'pub:{pk}' for pk in publication_ids))
+
+
+def apply_view_increments(pending):
+    """
+    Applique un lot d'incréments {publication_id: vues} en base
+    avec un UPDATE ... SET views_count = views_count + n par valeur de n,
+    puis met à jour les scores de tendance du lot et journalise les vues
+    """
+    by_increment = defaultdict(list)
+    for publication_id, hits in pending.items():
+        by_increment[hits].append(publication_id)
+
+    with transaction.atomic():
+        for hits, ids in by_increment.items():
+            Publication.objects.filter(pk__in=ids).update(
+                views_count=F('views_count') + hits
+            )
+        now = timezone.now()
+        apply_trending_increments(pending, now)
+        record_view_events(pending, now)
+
+
+class BulkResult:
+    """Résultats par élément d'une écriture en masse"""
+    
+    def __init__(self, size):
+        self.items = [None] * size
+    
+    def set(self, index, status, **extra):
+        self.items[index] = {'index': index, 'status': status, **extra}
+    
+    def data(self):
+        summary = defaultdict(int)
+        for item in self.items:
+            summary[item['status']] += 1
+        return {'results': self.items, 'summary': dict(summary)}
+
+
+def _validate_bulk_items(user, items, result, partial=False):
+    """
+    Valide chaque élément, puis l'appartenance de toutes les entreprises
+    citées en une seule requête. Retourne {index: données validées}.
+    """
+    valid = {}
+    for index, item in enumerate(items):
+        serializer = PublicationBulkItemSerializer(data=item, partial=partial)
+        if not serializer.is_valid():
+            result.set(index, 'error', errors=serializer.errors)
+        elif partial and 'id' not in serializer.validated_data:
+            result.set(index, 'error', errors={'id': ['Ce champ est obligatoire.']})
+        else:
+            valid[index] = serializer.validated_data
+    
+    company_ids = {data['company'] for data in valid.values() if data.get('company')}
+    owned = set(
+        Company.objects.filter(pk__in=company_ids, user=user).values_list('pk', flat=True)
+    ) if company_ids else set()
+    for index, data in list(valid.items()):
+        if data.get('company') and data['company'] not in owned:
+            result.set(index, 'error', errors={'company': ['Cette entreprise ne vous appartient pas']})
+            del valid[index]
+    return valid
+
+
+def _refresh_search_vectors(ids):
+    """Index plein texte du lot en un seul UPDATE"""
+    if ids:
+        Publication.objects.filter(pk__in=ids).update(search_vector=search_vector())
+
+
+def bulk_create_publications(user, items):
+    """Crée un lot de publications (bulk_create) dans une transaction"""
+    result = BulkResult(len(items))
+    valid = _validate_bulk_items(user, items, result)
+    now = timezone.now()
+    
+    publications = {}
+    for index, data in valid.items():
+        data.pop('id', None)
+        publication = Publication(
+            author=user,
+            company_id=data.pop('company', None),
+            created_at=now,
+            updated_at=now,
+            **data
+        )
+        if publication.status == Publication.Status.PUBLISHED:
+            publication.published_at = now
+        publication.refresh_derived_fields()
+        publications[index] = publication
+    
+    with transaction.atomic():
+        Publication.objects.bulk_create(publications.values())
+        ids = [publication.pk for publication in publications.values()]
+        _refresh_search_vectors(ids)
+        apply_publication_transitions([
+            (None, None, publication.company_id, publication.status)
+            for publication in publications.values()
+        ])
+    
+    for index, publication in publications.items():
+        result.set(index, 'created', id=publication.pk, slug=publication.slug)
+    if ids:
+        invalidate_publications(*ids)
+    return result.data()
+
+
+def bulk_update_publications(user, items):
+    """Met à jour un lot de publications de l'utilisateur (bulk_update) dans une transaction"""
+    result = BulkResult(len(items))
+    valid = _validate_bulk_items(user, items, result, partial=True)
+    now = timezone.now()
+    
+    with transaction.atomic():
+        ids = {data['id'] for data in valid.values()}
+        targets = Publication.objects.select_for_update().filter(pk__in=ids, author=user).in_bulk()
+        previous = {pk: (target.company_id, target.status) for pk, target in targets.items()}
+        changed_fields = {'updated_at', 'normalized_tags', 'excerpt'}
+        updated = {}
+        for index, data in valid.items():
+            publication = updated.get(data['id']) or targets.get(data['id'])
+            if publication is None:
+                result.set(index, 'error', errors={'id': ['Publication introuvable']})
+                continue
+            
+            data = dict(data)
+            data.pop('id')
+            if 'company' in data:
+                data['company_id'] = data.pop('company')
+            if (data.get('status') == Publication.Status.PUBLISHED and
+                    publication.status != Publication.Status.PUBLISHED):
+                data['published_at'] = now
+            for field, value in data.items():
+                setattr(publication, field, value)
+            publication.updated_at = now
+            publication.refresh_derived_fields()
+            changed_fields.update('company' if field == 'company_id' else field for field in data)
+            updated[publication.pk] = publication
+            result.set(index, 'updated', id=publication.pk)
+        
+        if updated:
+            Publication.objects.bulk_update(updated.values(), sorted(changed_fields))
+            _refresh_search_vectors(list(updated))
+            apply_publication_transitions([
+                (*previous[pk], publication.company_id, publication.status)
+                for pk, publication in updated.items()
+            ])
+    
+    if updated:
+        invalidate_publications(*updated)
+    return result.data()
+
+
+def bulk_set_status(user, ids, status):
+    """
+    Publie ou archive un lot de publications de l'utilisateur
+    en un seul UPDATE ... WHERE id IN (...)
+    """
+    result = BulkResult(len(ids))
+    now = timezone.now()
+    
+    with transaction.atomic():
+        current = {
+            pk: (company_id, current_status)
+            for pk, company_id, current_status in Publication.objects.select_for_update()
+            .filter(pk__in=ids, author=user)
+            .values_list('pk', 'company_id', 'status')
+        }
+        to_change = set()
+        for index, pk in enumerate(ids):
+            if pk not in current:
+                result.set(index, 'error', id=pk, errors={'id': ['Publication introuvable']})
+            elif current[pk][1] == status:
+                result.set(index, 'unchanged', id=pk)
+            else:
+                to_change.add(pk)
+                result.set(index, 'updated', id=pk)
+        
+        changes = {'status': status, 'updated_at': now}
+        if status == Publication.Status.PUBLISHED:
+            changes['published_at'] = now
+        if to_change:
+            Publication.objects.filter(pk__in=to_change).update(**changes)
+            apply_publication_transitions([
+                (*current[pk], current[pk][0], status) for pk in to_change
+            ])
+    
+    if to_change:
+        invalidate_publications(*to_change)
+    return result.data()
+
+
+class ViewCounterBuffer:
+    """
+    Compteur de vues en écriture différée.
+
+    Les vues sont accumulées dans un fichier SQLite partagé par les workers,
+    puis appliquées en base par lots (flusher périodique ou commande
+    flush_view_counts).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pending_views (
+            publication_id INTEGER PRIMARY KEY,
+            hits INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self):
+        self.store = SharedLocalStore('view_counter', self.SCHEMA)
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def record(self, publication_id, hits=1):
+        """Ajoute des vues au tampon local"""
+        self.store.execute(
+            'INSERT INTO pending_views (publication_id, hits) VALUES (?, ?) '
+            'ON CONFLICT (publication_id) DO UPDATE SET hits = hits + excluded.hits',
+            (publication_id, hits)
+        )
+        self.start_flusher()
+
+    def pending(self):
+        """Retourne les vues en attente sans vider le tampon"""
+        return dict(self.store.execute('SELECT publication_id, hits FROM pending_views'))
+
+    def drain(self):
+        """Vide le tampon de manière atomique et retourne son contenu"""
+        with self.store.transaction() as conn:
+            pending = dict(conn.execute('SELECT publication_id, hits FROM pending_views'))
+            conn.execute('DELETE FROM pending_views')
+        return pending
+
+    def flush(self):
+        """Applique les vues en attente en base, retourne le nombre de vues écrites"""
+        pending = self.drain()
+        if not pending:
+            return 0
+        try:
+            apply_view_increments(pending)
+        except Exception:
+            # Remettre les vues dans le tampon pour le prochain passage
+            for publication_id, hits in pending.items():
+                self.record(publication_id, hits)
+            raise
+        return sum(pending.values())
+
+    def start_flusher(self):
+        """Démarre le flusher périodique du processus courant si configuré"""
+        interval = settings.VIEW_COUNTER_FLUSH_INTERVAL
+        if not interval or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            thread = threading.Thread(
+                target=self._run_flusher,
+                args=(interval,),
+                name='view-counter-flusher',
+                daemon=True
+            )
+            thread.start()
+
+    def _run_flusher(self, interval):
+        stop = threading.Event()
+        while not stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Échec du flush des compteurs de vues')
+            finally:
+                connection.close()
+
+
+view_counter = ViewCounterBuffer()
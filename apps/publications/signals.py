@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from apps.companies.models import Company
+from apps.companies.services import apply_publication_transitions
+from .models import Publication
+from .services import invalidate_publications, response_cache
+
+
+@receiver(post_save, sender=Publication)
+@receiver(post_delete, sender=Publication)
+def invalidate_publication(sender, instance, **kwargs):
+    """Toute écriture via save()/delete() (API, admin) invalide le cache"""
+    invalidate_publications(instance.pk)
+
+
+@receiver(pre_delete, sender=Publication)
+def count_deleted_publication(sender, instance, **kwargs):
+    """Suppressions unitaires, en masse (admin) ou en cascade, dans leur transaction"""
+    apply_publication_transitions([(instance.company_id, instance.status, None, None)])
+
+
+# Colonnes affichées dans les listes (author_name, company_name)
+LISTED_FIELDS = {
+    Company: {'name'},
+    get_user_model(): {'first_name', 'last_name'},
+}
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=get_user_model())
+def invalidate_publication_list(sender, instance, created, update_fields, **kwargs):
+    """
+    Les listes affichent le nom de l'auteur et de l'entreprise. Une création
+    (encore sans publication) ou une écriture partielle d'autres colonnes
+    (mot de passe, last_login) ne les invalide pas.
+    """
+    if created or (update_fields is not None and not LISTED_FIELDS[sender] & set(update_fields)):
+        return
+    response_cache.bump('list')
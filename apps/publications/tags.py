@@ -0,0 +1,14 @@
+MAX_TAG_LENGTH = 50
+
+
+def normalize_tags(value):
+    """
+    Transforme la saisie « tech, Django , api » en liste normalisée
+    (minuscules, sans doublons, ordre conservé) : ['tech', 'django', 'api']
+    """
+    tags = []
+    for tag in (value or '').split(','):
+        tag = tag.strip().lower()[:MAX_TAG_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
@@ -1,6 +1,49 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from asgiref.sync import iscoroutinefunction
+from django.contrib.postgres.search import SearchQuery
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase, force_authenticate
 from apps.accounts.models import User
-from apps.publications.models import Publication
+from apps.companies.models import Company
+from apps.companies.services import reconcile_publication_counts
+from apps.publications.models import Publication, ViewEvent, ViewRollupDaily, ViewRollupHourly
+from apps.publications.analytics import COMPACTION_GRACE, compact_view_events, prune_view_events
+from apps.publications.excerpts import make_excerpt
+from apps.publications.scheduler import run_due_transitions, scheduler_lag
+from apps.publications.renditions import mark_renditions_ready, rendition_path, rendition_pool
+from apps.publications.search import SEARCH_CONFIG
+from apps.publications.trending import decayed_views, rebuild_trending_scores
+from apps.publications.services import response_cache, view_counter
+from apps.publications.views import PublicationViewSet
+
+
+def create_user(first_name, last_name='Test', email=None):
+    return User.objects.create_user(
+        email=email or f'{first_name.lower()}@example.com',
+        password='testpass123',
+        first_name=first_name,
+        last_name=last_name
+    )
+
+
+def create_publication(author, title='Publication', content='Contenu',
+                       status=Publication.Status.PUBLISHED, **kwargs):
+    """Publication publiée par défaut"""
+    return Publication.objects.create(author=author, title=title, content=content, status=status, **kwargs)
 
 
 class PublicationModelTest(TestCase):
@@ -24,4 +67,901 @@ class PublicationModelTest(TestCase):
         self.assertFalse(self.publication.is_published)
     
     def test_slug_generation(self):
-        self.assertTrue(self.publication.slug.startswith('test-publication'))
\ No newline at end of file
+        self.assertTrue(self.publication.slug.startswith('test-publication'))
+
+
+@override_settings(LOCAL_STORE_DIR=tempfile.mkdtemp(), VIEW_COUNTER_FLUSH_INTERVAL=0)
+class ViewCounterBufferTest(APITestCase):
+    def setUp(self):
+        self.author = create_user('Writer')
+        self.reader = create_user('Reader')
+        self.publication = create_publication(self.author, title='Buffered', content='Test content')
+        view_counter.drain()
+    
+    def test_retrieve_buffers_views(self):
+        url = reverse('publications:publication-detail', args=[self.publication.pk])
+        self.client.force_authenticate(self.reader)
+        self.client.get(url)
+        self.client.get(url)
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.views_count, 0)
+        self.assertEqual(view_counter.pending(), {self.publication.pk: 2})
+    
+    def test_flush_applies_batched_increments(self):
+        view_counter.record(self.publication.pk)
+        view_counter.record(self.publication.pk, 4)
+        self.assertEqual(view_counter.flush(), 5)
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.views_count, 5)
+        self.assertEqual(view_counter.pending(), {})
+
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = create_user('Feed')
+        self.publications = [
+            create_publication(self.user, title=f'Publication {i}', views_count=i % 2)
+            for i in range(5)
+        ]
+        self.client.force_authenticate(self.user)
+    
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        return ids, response.data['previous']
+    
+    def test_walks_every_row_once(self):
+        url = reverse('publications:publication-list') + '?page_size=2'
+        ids, _ = self.walk(url)
+        expected = [p.pk for p in reversed(self.publications)]
+        self.assertEqual(ids, expected)
+    
+    def test_ties_broken_by_id(self):
+        url = reverse('publications:publication-list') + '?page_size=2&ordering=views_count'
+        ids, _ = self.walk(url)
+        expected = [p.pk for p in sorted(self.publications, key=lambda p: (p.views_count, p.pk))]
+        self.assertEqual(ids, expected)
+    
+    def test_previous_link(self):
+        url = reverse('publications:publication-list') + '?page_size=2'
+        first = self.client.get(url).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(
+            [item['id'] for item in back['results']],
+            [item['id'] for item in first['results']]
+        )
+
+
+class FullTextSearchTest(APITestCase):
+    def setUp(self):
+        self.user = create_user('Search')
+        self.in_content = create_publication(
+            self.user, title='Nouvelles du mois', content='Nous avons lancé plusieurs applications mobiles.'
+        )
+        self.in_title = create_publication(self.user, title='Application mobile Flutter', content='Retour d\'expérience.')
+        create_publication(self.user, title='Recrutement', content='Nous cherchons un comptable.')
+        self.client.force_authenticate(self.user)
+    
+    def test_vector_updated_on_save(self):
+        self.in_title.title = 'Backend Django'
+        self.in_title.save()
+        found = Publication.objects.filter(search_vector=SearchQuery('django', config=SEARCH_CONFIG))
+        self.assertEqual(list(found), [self.in_title])
+    
+    def test_vector_kept_when_text_unchanged(self):
+        self.in_title.status = Publication.Status.ARCHIVED
+        with CaptureQueriesContext(connection) as queries:
+            self.in_title.save()
+        self.assertFalse(any('search_vector' in query['sql'] for query in queries))
+        found = Publication.objects.filter(search_vector=SearchQuery('flutter', config=SEARCH_CONFIG))
+        self.assertEqual(list(found), [self.in_title])
+    
+    def test_search_ranks_title_first(self):
+        url = reverse('publications:publication-search')
+        response = self.client.get(url, {'q': 'application'})
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(ids, [self.in_title.pk, self.in_content.pk])
+    
+    def test_ranked_results_paginate(self):
+        url = reverse('publications:publication-search')
+        first = self.client.get(url, {'q': 'application', 'page_size': 1}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual(second['results'][0]['id'], self.in_content.pk)
+        self.assertIsNone(second['next'])
+
+
+class TrigramFilterTest(APITestCase):
+    def setUp(self):
+        self.user = create_user('Alice', 'Martin', email='alice.martin@example.com')
+        other = create_user('Bob')
+        self.company = Company.objects.create(
+            user=self.user,
+            name='Boulangerie 100% Bio',
+            cfe_number='CFE-TRGM',
+            address='1 rue du Pain'
+        )
+        self.match = create_publication(self.user, company=self.company, title='Ouverture')
+        create_publication(other, title='Autre')
+        self.client.force_authenticate(other)
+    
+    def get_ids(self, **params):
+        response = self.client.get(reverse('publications:publication-list'), params)
+        return [item['id'] for item in response.data['results']]
+    
+    def test_joined_filters(self):
+        self.assertEqual(self.get_ids(author_email='MARTIN@'), [self.match.pk])
+        self.assertEqual(self.get_ids(company_name='100%'), [self.match.pk])
+        self.assertEqual(self.get_ids(company_name='100_'), [])
+    
+    def test_lookup_uses_ilike(self):
+        sql = str(Publication.objects.filter(title__trgm_icontains='ouv').query)
+        self.assertIn('ILIKE', sql)
+        self.assertEqual(self.get_ids(title='OUVERT'), [self.match.pk])
+
+
+class NormalizedTagsTest(APITestCase):
+    def setUp(self):
+        self.user = create_user('Tags')
+        self.java = create_publication(self.user, title='Java', tags='Java, Spring ,java')
+        self.js = create_publication(self.user, title='JS', tags='javascript, web')
+        self.client.force_authenticate(self.user)
+    
+    def get_ids(self, **params):
+        response = self.client.get(reverse('publications:publication-list'), params)
+        return sorted(item['id'] for item in response.data['results'])
+    
+    def test_tags_normalized_on_save(self):
+        self.assertEqual(self.java.normalized_tags, ['java', 'spring'])
+        self.js.tags = 'Web'
+        self.js.save(update_fields=['tags'])
+        self.js.refresh_from_db()
+        self.assertEqual(self.js.normalized_tags, ['web'])
+    
+    def test_exact_all_and_any_filters(self):
+        self.assertEqual(self.get_ids(tags='java'), [self.java.pk])
+        self.assertEqual(self.get_ids(tags='java,web'), [])
+        self.assertEqual(self.get_ids(tags_any='Spring, web'), [self.java.pk, self.js.pk])
+    
+    def test_tags_list_serialized(self):
+        url = reverse('publications:publication-detail', args=[self.java.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.data['tags_list'], ['java', 'spring'])
+
+
+class VisibilityTest(APITestCase):
+    def setUp(self):
+        self.user = create_user('Owner')
+        other = create_user('Other')
+        self.published = create_publication(other, title='Publiée')
+        self.own_draft = create_publication(self.user, title='Mon brouillon', status=Publication.Status.DRAFT)
+        create_publication(other, title='Brouillon', status=Publication.Status.DRAFT)
+        self.url = reverse('publications:publication-list')
+    
+    def test_anonymous_sees_published_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.published.pk])
+        # Sonde des validateurs HTTP puis la page elle-même
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('UNION', queries[-1]['sql'])
+    
+    def test_authenticated_union_without_distinct(self):
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.own_draft.pk, self.published.pk]
+        )
+        self.assertEqual(response.data['results'][0]['author_name'], 'Owner Test')
+        sql = queries[-1]['sql']
+        self.assertIn('UNION ALL', sql)
+        self.assertNotIn('DISTINCT', sql)
+    
+    def test_anonymous_retrieve_hides_drafts(self):
+        url = reverse('publications:publication-detail', args=[self.own_draft.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(LOCAL_STORE_DIR=tempfile.mkdtemp(), VIEW_COUNTER_FLUSH_INTERVAL=0)
+class ResponseCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('Cached')
+        self.publication = create_publication(self.author, title='En cache')
+        self.list_url = reverse('publications:publication-list')
+        self.detail_url = reverse('publications:publication-detail', args=[self.publication.pk])
+        view_counter.drain()
+    
+    def test_anonymous_list_served_from_cache(self):
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['id'], self.publication.pk)
+        self.assertEqual(response_cache.stats()['hits'], 1)
+        self.assertEqual(response_cache.stats()['misses'], 1)
+    
+    def test_query_params_are_normalized(self):
+        self.client.get(self.list_url, {'ordering': 'title', 'page_size': 5})
+        response = self.client.get(f'{self.list_url}?page_size=5&search=&ordering=title')
+        self.assertEqual(response['X-Cache'], 'HIT')
+    
+    def test_save_bumps_list_and_detail_versions(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self.publication.title = 'Modifiée'
+        self.publication.save()
+        
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['title'], 'Modifiée')
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'MISS')
+    
+    def test_only_listed_author_fields_bump_list(self):
+        self.client.get(self.list_url)
+        self.author.set_password('autrepass123')
+        self.author.save(update_fields=['password'])
+        create_user('Nouveau')
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'HIT')
+        
+        self.author.last_name = 'Renommé'
+        self.author.save()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['author_name'], 'Cached Renommé')
+    
+    def test_cached_retrieve_still_counts_views(self):
+        self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(view_counter.pending(), {self.publication.pk: 2})
+    
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.get(self.list_url)
+        self.assertNotIn('X-Cache', response)
+        call_command('publication_cache_stats', '--reset', stdout=StringIO())
+        self.assertEqual(response_cache.stats(), {'hits': 0, 'misses': 0, 'hit_ratio': None})
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Etag')
+        self.company = Company.objects.create(
+            user=self.user,
+            name='Validateurs SARL',
+            cfe_number='CFE-ETAG',
+            address='1 rue du Cache'
+        )
+        self.publication = create_publication(self.user, company=self.company, title='Validée')
+        self.client.force_authenticate(self.user)
+    
+    def test_if_none_match_returns_304_without_serializing(self):
+        url = reverse('publications:publication-detail', args=[self.publication.pk])
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_list_etag_changes_with_content(self):
+        url = reverse('publications:publication-list')
+        etag = self.client.get(url)['ETag']
+        Publication.objects.filter(pk=self.publication.pk).update(views_count=5)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_list_probe_reads_page_rows_only(self):
+        older = [create_publication(self.user, title=f'Ancienne {n}') for n in range(2)]
+        url = reverse('publications:publication-list') + '?page_size=1'
+        with CaptureQueriesContext(connection) as queries:
+            etag = self.client.get(url)['ETag']
+        probe = queries[0]['sql']
+        self.assertIn('LIMIT 2', probe)
+        self.assertNotIn('SUM(', probe)
+        
+        # Hors de la fenêtre page_size + 1 : toujours à jour
+        Publication.objects.filter(pk=self.publication.pk).update(views_count=5)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Publication.objects.filter(pk=older[-1].pk).update(views_count=5)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_nested_author_and_owner_change_validators(self):
+        urls = [
+            reverse('publications:publication-list'),
+            reverse('publications:publication-detail', args=[self.publication.pk]),
+            reverse('companies:company-detail', args=[self.company.pk]),
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.user.first_name = 'Renommé'
+        self.user.save()
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+    
+    def test_company_validators(self):
+        url = reverse('companies:company-detail', args=[self.company.pk])
+        response = self.client.get(url)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        
+        # publications_count change : le validateur aussi
+        self.publication.status = Publication.Status.ARCHIVED
+        self.publication.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['publications_count'], 0)
+
+
+class ExcerptTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Excerpt')
+        self.publication = create_publication(self.user, title='Longue', content='mot ' * 200)
+        self.url = reverse('publications:publication-list')
+    
+    def test_excerpt_maintained_on_save(self):
+        self.assertTrue(self.publication.excerpt.endswith('…'))
+        self.assertLessEqual(len(self.publication.excerpt), 280)
+        self.publication.content = 'Court'
+        self.publication.save(update_fields=['content'])
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.excerpt, 'Court')
+        self.assertEqual(make_excerpt('  un\n deux  '), 'un deux')
+    
+    def test_list_does_not_read_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        item = response.data['results'][0]
+        self.assertEqual(item['excerpt'], self.publication.excerpt)
+        self.assertNotIn('content', item)
+        self.assertNotIn('"content"', queries[-1]['sql'])
+        self.assertNotIn('"image"', queries[-1]['sql'])
+    
+    def test_full_content_on_request(self):
+        response = self.client.get(self.url, {'full_content': 'true'})
+        self.assertEqual(response.data['results'][0]['content'], self.publication.content)
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Sparse')
+        self.company = Company.objects.create(
+            user=self.user,
+            name='Partielle SA',
+            cfe_number='CFE-SPARSE',
+            address='1 rue des Champs'
+        )
+        self.publication = create_publication(self.user, company=self.company, title='Partielle')
+        self.client.force_authenticate(self.user)
+    
+    def test_detail_fields_skip_joins(self):
+        url = reverse('publications:publication-detail', args=[self.publication.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,title,company', 'expand': ''})
+        self.assertEqual(response.data, {
+            'id': self.publication.pk,
+            'title': 'Partielle',
+            'company': self.company.pk,
+        })
+        sql = queries[-1]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"content"', sql)
+    
+    def test_expand_nested_company(self):
+        url = reverse('publications:publication-detail', args=[self.publication.pk])
+        response = self.client.get(url, {'fields': 'id,company,author', 'expand': 'company'})
+        self.assertEqual(response.data['company']['name'], 'Partielle SA')
+        self.assertEqual(response.data['author'], self.user.pk)
+        self.assertEqual(response.data['company']['publications_count'], 1)
+    
+    def test_list_fields(self):
+        url = reverse('publications:publication-list')
+        response = self.client.get(url, {'fields': 'id,author_name'})
+        self.assertEqual(response.data['results'], [{'id': self.publication.pk, 'author_name': 'Sparse Test'}])
+    
+    def test_list_fields_stay_within_list_columns(self):
+        url = reverse('publications:publication-list')
+        for params, loads_content in (({}, False), ({'full_content': 'true'}, True)):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {'fields': 'id,content', **params})
+            self.assertEqual('content' in response.data['results'][0], loads_content)
+            self.assertEqual('."content"' in queries[-1]['sql'], loads_content)
+    
+    def test_company_counts_read_from_counter_columns(self):
+        url = reverse('companies:company-list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['publications_count'], 1)
+        self.assertEqual(len(queries), 3)  # sonde ETag, COUNT, page
+        self.assertNotIn('publications', queries[-1]['sql'])
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,name'})
+        self.assertEqual(response.data['results'], [{'id': self.company.pk, 'name': 'Partielle SA'}])
+        self.assertNotIn('publications', queries[-1]['sql'])
+    
+    def test_profile_fields(self):
+        response = self.client.get(reverse('accounts:profile'), {'fields': 'email'})
+        self.assertEqual(response.data, {'email': 'sparse@example.com'})
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RenditionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Images')
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 600), 'teal').save(buffer, 'PNG')
+        self.publication = create_publication(
+            self.user,
+            title='Illustrée',
+            image=SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        )
+    
+    def test_digest_and_lazy_rendition(self):
+        self.assertEqual(len(self.publication.image_digest), 64)
+        detail = reverse('publications:publication-detail', args=[self.publication.pk])
+        lazy_url = self.client.get(detail).data['renditions']['thumb']['webp']
+        self.assertIn('/renditions/thumb/webp/', lazy_url)
+        
+        response = self.client.get(lazy_url)
+        self.assertEqual(response.status_code, 302)
+        path = rendition_path(self.publication.image_digest, 'thumb', 'webp')
+        with default_storage.open(path) as file, Image.open(file) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 160)))
+        
+        cache.clear()
+        renditions = self.client.get(detail).data['renditions']
+        self.assertTrue(renditions['thumb']['webp'].endswith(path))
+    
+    def test_pool_generates_all_sizes_without_upscaling(self):
+        rendition_pool.schedule(self.publication).result(timeout=30)
+        for size in ('thumb', 'card', 'full'):
+            for fmt in ('webp', 'jpeg'):
+                self.assertTrue(default_storage.exists(rendition_path(self.publication.image_digest, size, fmt)))
+        path = rendition_path(self.publication.image_digest, 'full', 'jpeg')
+        with default_storage.open(path) as file, Image.open(file) as image:
+            self.assertEqual(image.size, (1200, 600))
+    
+    def test_list_reads_ready_renditions_from_row(self):
+        mark_renditions_ready(self.publication.image_digest, [('thumb', 'webp')])
+        with mock.patch.object(default_storage, 'exists', side_effect=AssertionError('stockage interrogé')):
+            response = self.client.get(reverse('publications:publication-list'))
+        renditions = response.data['results'][0]['renditions']
+        self.assertEqual(set(renditions), {'thumb', 'card', 'full'})
+        self.assertTrue(renditions['thumb']['webp'].endswith(
+            rendition_path(self.publication.image_digest, 'thumb', 'webp')
+        ))
+        self.assertIn('/renditions/card/jpeg/', renditions['card']['jpeg'])
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.user = create_user('Export')
+        for index in range(5):
+            create_publication(
+                self.user,
+                title=f'Export {index}',
+                tags='Data, CSV',
+                status=Publication.Status.PUBLISHED if index % 2 == 0 else Publication.Status.DRAFT
+            )
+        self.url = reverse('publications:publication-export')
+        self.client.force_authenticate(self.user)
+    
+    def test_ndjson_stream_uses_filters(self):
+        response = self.client.get(self.url, {'status': 'PUBLISHED', 'columns': 'id,title,tags'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(set(rows[0]), {'id', 'title', 'tags'})
+        self.assertEqual(rows[0]['tags'], ['data', 'csv'])
+    
+    def test_csv_stream(self):
+        response = self.client.get(self.url, {'output': 'csv', 'columns': 'title,tags'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'title,tags')
+        self.assertEqual(len(lines), 6)
+        self.assertIn('"data,csv"', lines[1])
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+    
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_publications', '--filter', 'status=DRAFT', '--columns', 'title', stdout=out)
+        self.assertEqual(
+            [json.loads(line)['title'] for line in out.getvalue().splitlines()],
+            ['Export 1', 'Export 3']
+        )
+
+
+class BulkWriteTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Bulk')
+        other = create_user('Other')
+        self.company = Company.objects.create(
+            user=self.user, name='Lots SARL', cfe_number='CFE-BULK', address='1 rue des Lots'
+        )
+        self.foreign_company = Company.objects.create(
+            user=other, name='Ailleurs SA', cfe_number='CFE-OTHER', address='2 rue des Lots'
+        )
+        self.client.force_authenticate(self.user)
+    
+    def test_bulk_create_reports_per_item(self):
+        items = [
+            {'title': 'Lot un', 'content': 'Premier contenu', 'tags': 'Lot, Import', 'company': self.company.pk},
+            {'title': 'Lot deux', 'content': 'Second', 'status': 'PUBLISHED'},
+            {'title': 'Invalide'},
+            {'title': 'Intrus', 'content': 'x', 'company': self.foreign_company.pk},
+        ]
+        with self.assertNumQueries(6):  # + compteurs des entreprises
+            response = self.client.post(
+                reverse('publications:publication-bulk-create'), {'items': items}, format='json'
+            )
+        self.assertEqual(response.data['summary'], {'created': 2, 'error': 2})
+        self.assertIn('content', response.data['results'][2]['errors'])
+        self.assertIn('company', response.data['results'][3]['errors'])
+        
+        created = Publication.objects.get(pk=response.data['results'][0]['id'])
+        self.assertEqual(created.normalized_tags, ['lot', 'import'])
+        self.assertEqual(created.excerpt, 'Premier contenu')
+        self.assertTrue(created.slug.startswith('lot-un-'))
+        self.assertTrue(Publication.objects.filter(search_vector=SearchQuery('premier', config=SEARCH_CONFIG)).exists())
+        self.assertIsNotNone(Publication.objects.get(pk=response.data['results'][1]['id']).published_at)
+    
+    def test_bulk_update_and_status(self):
+        first = Publication.objects.create(author=self.user, title='A', content='a')
+        second = Publication.objects.create(author=self.user, title='B', content='b')
+        foreign = Publication.objects.create(author=self.foreign_company.user, title='C', content='c')
+        
+        response = self.client.post(reverse('publications:publication-bulk-update'), {'items': [
+            {'id': first.pk, 'tags': 'Neuf'},
+            {'id': foreign.pk, 'title': 'Volé'},
+        ]}, format='json')
+        self.assertEqual(response.data['summary'], {'updated': 1, 'error': 1})
+        first.refresh_from_db()
+        self.assertEqual((first.title, first.normalized_tags), ('A', ['neuf']))
+        
+        response = self.client.post(
+            reverse('publications:publication-bulk-publish'), {'ids': [first.pk, second.pk]}, format='json'
+        )
+        self.assertEqual(response.data['summary'], {'updated': 2})
+        response = self.client.post(
+            reverse('publications:publication-bulk-publish'), {'ids': [first.pk]}, format='json'
+        )
+        self.assertEqual(response.data['summary'], {'unchanged': 1})
+        second.refresh_from_db()
+        self.assertIsNotNone(second.published_at)
+    
+    @override_settings(PUBLICATION_BULK_MAX_ITEMS=2)
+    def test_batch_size_is_bounded(self):
+        response = self.client.post(
+            reverse('publications:publication-bulk-archive'), {'ids': [1, 2, 3]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SchedulerTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Planning')
+        self.now = timezone.now()
+    
+    def create(self, **kwargs):
+        return Publication.objects.create(author=self.user, title='Programmée', content='Contenu', **kwargs)
+    
+    def test_due_rows_move_through_lifecycle(self):
+        due = self.create(publish_at=self.now - timedelta(minutes=5))
+        later = self.create(publish_at=self.now + timedelta(hours=1))
+        expiring = self.create(
+            status=Publication.Status.PUBLISHED,
+            expire_at=self.now - timedelta(minutes=1)
+        )
+        both = self.create(
+            publish_at=self.now - timedelta(hours=2),
+            expire_at=self.now - timedelta(hours=1)
+        )
+        self.assertEqual(scheduler_lag(self.now)['published']['backlog'], 2)
+        
+        stats = run_due_transitions(batch_size=1, now=self.now)
+        self.assertEqual(stats['published']['count'], 2)
+        self.assertEqual(stats['archived']['count'], 2)
+        self.assertAlmostEqual(stats['published']['max_lag_seconds'], 7200)
+        
+        due.refresh_from_db()
+        self.assertEqual(due.status, Publication.Status.PUBLISHED)
+        self.assertEqual(due.published_at, due.publish_at)
+        later.refresh_from_db()
+        self.assertEqual(later.status, Publication.Status.DRAFT)
+        for publication in (expiring, both):
+            publication.refresh_from_db()
+            self.assertEqual(publication.status, Publication.Status.ARCHIVED)
+        self.assertEqual(scheduler_lag(self.now)['published']['backlog'], 0)
+        # Dernier passage en base : visible des workers web
+        cache.clear()
+        self.assertEqual(scheduler_lag(self.now)['last_run']['archived']['count'], 2)
+    
+    def test_loops_require_shared_cache(self):
+        for command in ('run_scheduler', 'compact_view_events'):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'LocMemCache'):
+                call_command(command, '--loop', stdout=StringIO())
+    
+    def test_expire_must_follow_publish(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('publications:publication-list'), {
+            'title': 'Datée',
+            'content': 'Contenu',
+            'publish_at': self.now.isoformat(),
+            'expire_at': (self.now - timedelta(days=1)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse('publications:publication-scheduler')).status_code, 403)
+
+
+@override_settings(LOCAL_STORE_DIR=tempfile.mkdtemp(), VIEW_COUNTER_FLUSH_INTERVAL=0, TRENDING_HALF_LIFE_HOURS=24)
+class TrendingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        view_counter.drain()
+        self.user = create_user('Trending')
+        self.old, self.new, self.draft = [
+            create_publication(self.user, title=title, status=status)
+            for title, status in [
+                ('Ancienne', Publication.Status.PUBLISHED),
+                ('Récente', Publication.Status.PUBLISHED),
+                ('Brouillon', Publication.Status.DRAFT),
+            ]
+        ]
+    
+    def test_flush_updates_scores_incrementally(self):
+        view_counter.record(self.new.pk, 3)
+        view_counter.flush()
+        view_counter.record(self.new.pk, 1)
+        view_counter.flush()
+        self.new.refresh_from_db()
+        self.assertAlmostEqual(decayed_views(self.new.trending_score, timezone.now()), 4, places=2)
+    
+    def test_recent_views_outrank_old_totals(self):
+        Publication.objects.filter(pk=self.old.pk).update(
+            views_count=100, published_at=timezone.now() - timedelta(days=10)
+        )
+        Publication.objects.filter(pk=self.draft.pk).update(views_count=1000)
+        self.assertEqual(rebuild_trending_scores(Publication.objects.all()), 2)
+        view_counter.record(self.new.pk, 5)
+        view_counter.flush()
+        
+        response = self.client.get(reverse('publications:publication-trending'))
+        self.assertEqual([item['id'] for item in response.data['results']], [self.new.pk, self.old.pk])
+
+
+class ViewAnalyticsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        view_counter.drain()
+        self.owner = create_user('Analytics')
+        self.other = create_user('Curieux')
+        self.company = Company.objects.create(
+            user=self.owner,
+            name='Audience SARL',
+            cfe_number='CFE-VIEWS',
+            address='1 rue des Vues'
+        )
+        self.publication = create_publication(self.owner, company=self.company, title='Mesurée')
+    
+    def record_and_compact(self, hits):
+        view_counter.record(self.publication.pk, hits)
+        view_counter.flush()
+        return compact_view_events(now=timezone.now() + COMPACTION_GRACE + timedelta(seconds=1))
+    
+    def test_compaction_is_incremental(self):
+        self.assertEqual(self.record_and_compact(3), 1)
+        self.assertEqual(self.record_and_compact(2), 1)
+        self.assertEqual(compact_view_events(now=timezone.now() + timedelta(minutes=5)), 0)
+        
+        hourly = ViewRollupHourly.objects.get(publication=self.publication)
+        daily = ViewRollupDaily.objects.get(publication=self.publication)
+        self.assertEqual((hourly.views, hourly.company_id), (5, self.company.pk))
+        self.assertEqual(daily.views, 5)
+    
+    def test_recent_events_wait_for_grace_period(self):
+        view_counter.record(self.publication.pk, 1)
+        view_counter.flush()
+        self.assertEqual(compact_view_events(), 0)
+        self.assertFalse(ViewRollupHourly.objects.exists())
+    
+    def test_prune_keeps_rollups(self):
+        self.record_and_compact(4)
+        self.assertEqual(prune_view_events(now=timezone.now() + timedelta(days=30)), 1)
+        self.assertFalse(ViewEvent.objects.exists())
+        self.assertEqual(ViewRollupDaily.objects.get().views, 4)
+    
+    def test_endpoints_read_rollups(self):
+        self.record_and_compact(6)
+        self.client.force_authenticate(user=self.owner)
+        url = reverse('publications:publication-analytics', kwargs={'pk': self.publication.pk})
+        response = self.client.get(url, {'granularity': 'hour'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 6)
+        self.assertEqual(len(response.data['series']), 1)
+        
+        url = reverse('companies:company-analytics', kwargs={'pk': self.company.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.data['total'], 6)
+        self.assertEqual(response.data['granularity'], 'day')
+        
+        self.assertEqual(self.client.get(url, {'granularity': 'week'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'since': '2020-01-01'}).status_code, 400)
+    
+    def test_endpoints_are_restricted_to_owners(self):
+        self.client.force_authenticate(user=self.other)
+        url = reverse('publications:publication-analytics', kwargs={'pk': self.publication.pk})
+        self.assertEqual(self.client.get(url).status_code, 403)
+        url = reverse('companies:company-analytics', kwargs={'pk': self.company.pk})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class CompanyCounterTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('Compteurs')
+        self.company, self.other = [
+            Company.objects.create(user=self.user, name=name, cfe_number=cfe, address='1 rue du Compte')
+            for name, cfe in [('Compteurs SA', 'CFE-COUNT'), ('Autre SA', 'CFE-OTHER')]
+        ]
+        self.publication = create_publication(
+            self.user, company=self.company, title='Comptée', status=Publication.Status.DRAFT
+        )
+        self.client.force_authenticate(self.user)
+    
+    def assertCounts(self, company, published, draft, archived):
+        company.refresh_from_db()
+        self.assertEqual(
+            (company.published_count, company.draft_count, company.archived_count),
+            (published, draft, archived)
+        )
+    
+    def test_save_and_delete_transitions(self):
+        self.assertCounts(self.company, 0, 1, 0)
+        self.client.post(reverse('publications:publication-publish', args=[self.publication.pk]))
+        self.assertCounts(self.company, 1, 0, 0)
+        
+        publication = Publication.objects.get(pk=self.publication.pk)
+        publication.company = self.other
+        publication.status = Publication.Status.ARCHIVED
+        publication.save()
+        self.assertCounts(self.company, 0, 0, 0)
+        self.assertCounts(self.other, 0, 0, 1)
+        
+        publication.delete()
+        self.assertCounts(self.other, 0, 0, 0)
+    
+    def test_stale_instances_apply_transitions_from_current_row(self):
+        # Deux écritures (API, scheduler...) parties du même brouillon
+        published = Publication.objects.get(pk=self.publication.pk)
+        archived = Publication.objects.get(pk=self.publication.pk)
+        published.status = Publication.Status.PUBLISHED
+        published.save()
+        archived.status = Publication.Status.ARCHIVED
+        archived.save()
+        self.assertCounts(self.company, 0, 0, 1)
+        with CaptureQueriesContext(connection) as queries:
+            archived.save(update_fields=['status'])
+        self.assertTrue(any('FOR UPDATE' in query['sql'] for query in queries))
+    
+    def test_bulk_and_scheduled_transitions(self):
+        self.client.post(reverse('publications:publication-bulk-create'), {'items': [
+            {'title': f'Lot {n}', 'content': 'Contenu', 'company': self.company.pk, 'status': 'PUBLISHED'}
+            for n in range(3)
+        ]}, format='json')
+        self.assertCounts(self.company, 3, 1, 0)
+        
+        ids = list(self.company.publications.filter(status='PUBLISHED').values_list('pk', flat=True))
+        self.client.post(reverse('publications:publication-bulk-archive'), {'ids': ids[:2]}, format='json')
+        self.assertCounts(self.company, 1, 1, 2)
+        
+        self.client.post(reverse('publications:publication-bulk-update'), {'items': [
+            {'id': ids[2], 'title': 'Déplacée', 'content': 'Contenu', 'company': self.other.pk, 'status': 'PUBLISHED'}
+        ]}, format='json')
+        self.assertCounts(self.company, 0, 1, 2)
+        self.assertCounts(self.other, 1, 0, 0)
+        
+        Publication.objects.filter(pk=self.publication.pk).update(publish_at=timezone.now())
+        run_due_transitions()
+        self.assertCounts(self.company, 1, 0, 2)
+    
+    def test_reconcile_repairs_drift(self):
+        Company.objects.filter(pk=self.company.pk).update(draft_count=7, published_count=-1)
+        self.assertEqual(reconcile_publication_counts(batch_size=1), [self.company.pk])
+        self.assertCounts(self.company, 0, 1, 0)
+        self.assertEqual(reconcile_publication_counts(), [])
+
+
+@override_settings(ASYNC_READS=True, LOCAL_STORE_DIR=tempfile.mkdtemp(), VIEW_COUNTER_FLUSH_INTERVAL=0)
+class AsyncReadTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('Async')
+        other = create_user('Other')
+        self.published = create_publication(other, title='Application mobile')
+        self.draft = create_publication(
+            self.author, title='Brouillon asynchrone', status=Publication.Status.DRAFT
+        )
+        self.factory = AsyncRequestFactory()
+        view_counter.drain()
+    
+    def test_only_read_routes_are_async(self):
+        self.assertTrue(iscoroutinefunction(PublicationViewSet.as_view({'get': 'list', 'post': 'create'})))
+        self.assertFalse(iscoroutinefunction(PublicationViewSet.as_view({'get': 'export'})))
+        with self.settings(ASYNC_READS=False):
+            self.assertFalse(iscoroutinefunction(PublicationViewSet.as_view({'get': 'list'})))
+    
+    async def test_anonymous_list_cached(self):
+        view = PublicationViewSet.as_view({'get': 'list'})
+        response = await view(self.factory.get('/'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.published.pk])
+        response = await view(self.factory.get('/'))
+        self.assertEqual(response['X-Cache'], 'HIT')
+    
+    async def test_authenticated_list_validators(self):
+        view = PublicationViewSet.as_view({'get': 'list'})
+        request = self.factory.get('/')
+        force_authenticate(request, self.author)
+        response = await view(request)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.draft.pk, self.published.pk]
+        )
+        request = self.factory.get('/', headers={'If-None-Match': response['ETag']})
+        force_authenticate(request, self.author)
+        self.assertEqual((await view(request)).status_code, 304)
+    
+    async def test_retrieve_visibility_and_views(self):
+        view = PublicationViewSet.as_view({'get': 'retrieve'})
+        response = await view(self.factory.get('/'), pk=self.draft.pk)
+        self.assertEqual(response.status_code, 404)
+        response = await view(self.factory.get('/'), pk=str(self.published.pk))
+        self.assertEqual(response.data['title'], 'Application mobile')
+        self.assertEqual(view_counter.pending(), {self.published.pk: 1})
+        
+        request = self.factory.get('/')
+        force_authenticate(request, self.author)
+        response = await view(request, pk=self.draft.pk)
+        self.assertEqual(response.status_code, 200)
+    
+    async def test_search_and_my_publications(self):
+        request = self.factory.get('/', {'q': 'application'})
+        force_authenticate(request, self.author)
+        response = await PublicationViewSet.as_view({'get': 'search'})(request)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.published.pk])
+        
+        request = self.factory.get('/')
+        force_authenticate(request, self.author)
+        response = await PublicationViewSet.as_view({'get': 'my_publications'})(request)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.draft.pk])
+        
+        # Authentification requise : erreur DRF ordinaire
+        response = await PublicationViewSet.as_view({'get': 'my_publications'})(self.factory.get('/'))
+        self.assertEqual(response.status_code, 401)
+    
+    async def test_writes_keep_sync_view(self):
+        view = PublicationViewSet.as_view({'get': 'list', 'post': 'create'})
+        request = self.factory.post(
+            '/', {'title': 'Créée', 'content': 'Contenu'}, content_type='application/json'
+        )
+        force_authenticate(request, self.author)
+        response = await view(request)
+        self.assertEqual(response.status_code, 201)
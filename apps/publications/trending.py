@@ -0,0 +1,96 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from .models import Publication
+
+# Origine fixe des scores : seul l'écart à cette date compte
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def log_weight(moment):
+    """
+    Poids (en log) d'une vue à un instant donné.
+
+    Une vue perd la moitié de son poids à chaque demi-vie. Plutôt que de
+    faire décroître tous les scores, on fait croître le poids des vues
+    récentes : l'ordre est le même et seul le score des publications vues
+    change. Le score stocké est log(Σ vues × 2^((t - origine) / demi-vie)).
+    """
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return (moment - TRENDING_EPOCH).total_seconds() * math.log(2) / half_life
+
+
+def decayed_views(score, now):
+    """Vues pondérées équivalentes à l'instant now (pour affichage)"""
+    if score is None:
+        return 0.0
+    return math.exp(score - log_weight(now))
+
+
+UPDATE_SCORES_SQL = """
+    UPDATE {table} AS p
+    SET trending_score = v.score
+    FROM (VALUES {values}) AS v(id, score)
+    WHERE p.id = v.id
+"""
+
+
+def _write_scores(ids, scores):
+    """Écrit un lot de scores en un seul UPDATE ... FROM (VALUES ...)"""
+    if not len(ids):
+        return
+    values = ', '.join(['(%s, %s::double precision)'] * len(ids))
+    params = [value for pair in zip(ids.tolist(), scores.tolist()) for value in pair]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPDATE_SCORES_SQL.format(table=Publication._meta.db_table, values=values),
+            params
+        )
+
+
+def apply_trending_increments(pending, now):
+    """
+    Ajoute un lot de vues {publication_id: vues} aux scores :
+    score = logaddexp(score, log(vues) + poids(now)), calculé en NumPy
+    """
+    if not pending:
+        return
+    with transaction.atomic():
+        current = dict(
+            Publication.objects.select_for_update()
+            .filter(pk__in=list(pending))
+            .values_list('pk', 'trending_score')
+        )
+        ids = np.fromiter(current, dtype=np.int64, count=len(current))
+        hits = np.array([pending[pk] for pk in current], dtype=np.float64)
+        old = np.array(
+            [-np.inf if score is None else score for score in current.values()],
+            dtype=np.float64
+        )
+        _write_scores(ids, np.logaddexp(old, np.log(hits) + log_weight(now)))
+
+
+def rebuild_trending_scores(queryset, batch_size=5000):
+    """
+    Recalcule les scores par lots vectorisés à partir de views_count,
+    les vues historiques étant placées à la date de publication.
+    Retourne le nombre de publications mises à jour.
+    """
+    updated = 0
+    rows = queryset.filter(views_count__gt=0).order_by('pk').values_list(
+        'pk', 'views_count', 'published_at', 'created_at'
+    )
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return updated
+        ids = np.array([row[0] for row in batch], dtype=np.int64)
+        views = np.array([row[1] for row in batch], dtype=np.float64)
+        weights = np.array([log_weight(row[2] or row[3]) for row in batch], dtype=np.float64)
+        with transaction.atomic():
+            _write_scores(ids, np.log(views) + weights)
+        updated += len(batch)
+        last_pk = batch[-1][0]
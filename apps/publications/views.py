@@ -1,21 +1,47 @@
-from rest_framework import viewsets, status, filters
+from asgiref.sync import sync_to_async
+from rest_framework import viewsets, status, filters, serializers
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.fields import empty
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from PIL import UnidentifiedImageError
 from .models import Publication
 from .serializers import (
     PublicationSerializer,
     PublicationListSerializer,
     PublicationCreateSerializer,
-    PublicationUpdateSerializer
+    PublicationUpdateSerializer,
+    ViewAnalyticsQuerySerializer
 )
-from .permissions import IsAuthorOrReadOnly
-from .filters import PublicationFilter
+from .analytics import views_series
+from .permissions import IsAuthorOrCompanyOwner, IsAuthorOrReadOnly
+from .exports import EXPORT_FORMATS, aexport_lines, export_lines, parse_columns
+from .filters import PublicationFilter, PublicationSearchFilter
+from .renditions import rendition_pool
+from .scheduler import scheduler_lag
+from .search import search_publications
+from .tags import normalize_tags
+from .services import (
+    bulk_create_publications,
+    bulk_set_status,
+    bulk_update_publications,
+    response_cache,
+    view_counter
+)
+from apps.accounts.authentication import ClaimsJWTAuthentication
+from core.mixins import AsyncReadMixin, ConditionalGetMixin, SparseFieldsetMixin
+from core.throttling import AnonymousThrottle, UserOrIPThrottle
+from core.pagination import KeysetPagination
 
 
-class PublicationViewSet(viewsets.ModelViewSet):
+class PublicationViewSet(AsyncReadMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des publications
     
@@ -26,34 +52,90 @@ class PublicationViewSet(viewsets.ModelViewSet):
     partial_update: Met à jour partiellement une publication
     destroy: Supprime une publication
     search: Recherche de publications
+    trending: Publications populaires en ce moment (vues avec décroissance temporelle)
+    export: Export NDJSON/CSV en flux des publications filtrées
+    bulk_create, bulk_update, bulk_publish, bulk_archive: écritures en masse
+    scheduler: Retard des publications/expirations programmées (admin)
+    analytics: Vues par heure ou par jour (auteur ou propriétaire de l'entreprise)
+    
+    Lectures : ?fields= et ?expand= (author, company) pour des réponses partielles.
+    En mode ASGI (ASYNC_READS), list, retrieve, search et my_publications
+    sont servies par leurs variantes asynchrones (alist, aretrieve...).
     """
     permission_classes = [IsAuthenticated, IsAuthorOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, PublicationSearchFilter, filters.OrderingFilter]
     filterset_class = PublicationFilter
-    search_fields = ['title', 'content', 'tags']
     ordering_fields = ['created_at', 'published_at', 'views_count', 'title']
     ordering = ['-created_at']
+    expandable_fields = {'author': 'author', 'company': 'company'}
+    field_sources = {
+        'author_name': ['author__first_name', 'author__last_name'],
+        'company_name': ['company__name'],
+        'tags_list': ['normalized_tags'],
+        'renditions': ['image_digest', 'renditions_ready'],
+    }
+    # Auteur (permissions), statut et clés de tri de la pagination
+    required_fields = ('author', 'status', 'created_at', 'published_at', 'views_count', 'title')
+    # Lectures qui n'utilisent que l'identifiant de l'utilisateur
+    claims_user_actions = {'list', 'retrieve', 'search', 'trending', 'my_publications'}
+    async_read_actions = {'list', 'retrieve', 'search', 'my_publications'}
+    # Validateurs : auteur et entreprise sont imbriqués dans les réponses
+    validator_timestamp_fields = ('updated_at', 'author__updated_at', 'company__updated_at')
+    # Validateurs des listes : les vues sont mises à jour sans toucher updated_at
+    validator_page_fields = ('views_count',)
     
     def get_queryset(self):
         """
         Retourne les publications selon l'utilisateur et l'action
-        - Pour list: publications publiées OU publications de l'utilisateur
         - Pour mes-publications: toutes les publications de l'utilisateur
+        - Sinon: publications publiées OU publications de l'utilisateur
+          (requête unique, utilisée pour les accès par clé)
         """
         user = self.request.user
+        queryset = Publication.objects.select_related('author', 'company')
         
         if self.action == 'my_publications':
             # Toutes les publications de l'utilisateur
-            return Publication.objects.filter(author=user).select_related('author', 'company')
+            return Publication.objects.for_list(self.wants_full_content()).filter(author_id=user.pk)
         
-        # Publications publiées + publications de l'utilisateur (tous statuts)
-        return Publication.objects.filter(
-            Q(status=Publication.Status.PUBLISHED) | Q(author=user)
-        ).select_related('author', 'company').distinct()
+        return queryset.visible_to(user)
+    
+    def get_branch_querysets(self):
+        """
+        Branches de visibilité pour les listes (list, search) :
+        publiées seules pour un anonyme, publiées + non publiées de
+        l'utilisateur sinon, combinées en UNION ALL par le paginateur
+        """
+        queryset = Publication.objects.for_list(self.wants_full_content())
+        return queryset.visibility_branches(self.request.user)
+    
+    def wants_full_content(self):
+        """Les listes renvoient un extrait, sauf avec ?full_content=true"""
+        value = self.request.query_params.get('full_content', '')
+        return value.lower() in ('1', 'true', 'yes')
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['full_content'] = self.wants_full_content()
+        return context
+    
+    def get_validator_aggregates(self):
+        """Les vues et le compteur de l'entreprise changent sans toucher updated_at"""
+        aggregates = super().get_validator_aggregates()
+        aggregates['views'] = Sum('views_count')
+        aggregates['company_published'] = Sum('company__published_count')
+        return aggregates
+    
+    def get_validator_queryset(self):
+        """Liste : mêmes branches de visibilité que la page, sondées sur la page seule"""
+        if self.action == 'list':
+            return self.get_list_branches()
+        return super().get_validator_queryset()
     
     def get_serializer_class(self):
         """Retourne le serializer approprié selon l'action"""
-        if self.action == 'list':
+        if self.action in ['list', 'search', 'my_publications', 'trending']:
             return PublicationListSerializer
         elif self.action == 'create':
             return PublicationCreateSerializer
@@ -61,23 +143,106 @@ class PublicationViewSet(viewsets.ModelViewSet):
             return PublicationUpdateSerializer
         return PublicationSerializer
     
+    def get_authenticators(self):
+        """Utilisateur construit depuis le token, sans charger le compte, pour les lectures"""
+        request = getattr(self, 'request', None)
+        action = getattr(self, 'action_map', {}).get(request.method.lower()) if request else None
+        if action in self.claims_user_actions:
+            return [ClaimsJWTAuthentication()]
+        return super().get_authenticators()
+    
+    def get_throttles(self):
+        """Recherche limitée par utilisateur ou IP, liste anonyme par IP"""
+        if self.action == 'search':
+            return [UserOrIPThrottle('search')]
+        if self.action == 'list':
+            return [AnonymousThrottle('list')]
+        return super().get_throttles()
+    
     def get_permissions(self):
         """Permissions personnalisées selon l'action"""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'trending']:
             return [AllowAny()]
         return super().get_permissions()
     
+    def list(self, request, *args, **kwargs):
+        """
+        Liste paginée des publications visibles (une requête par branche).
+        Les réponses anonymes sont identiques pour tous : mises en cache.
+        """
+        if not request.user.is_authenticated:
+            return response_cache.respond(request, ['list'], self.build_list_response)
+        return self.build_list_response()
+    
+    async def alist(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return await response_cache.arespond(request, ['list'], self.abuild_list_response)
+        return await self.abuild_list_response()
+    
+    def build_list_response(self):
+        return self.conditional_response(self.request, self.serialize_list)
+    
+    async def abuild_list_response(self):
+        return await self.aconditional_response(self.request, self.aserialize_list)
+    
+    def get_list_branches(self):
+        return [self.filter_queryset(queryset) for queryset in self.get_branch_querysets()]
+    
+    def serialize_list(self):
+        page = self.paginate_queryset(self.get_list_branches())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    async def aserialize_list(self):
+        page = await self.apaginate_queryset(self.get_list_branches())
+        return await self.aget_paginated_response(page)
+    
     def retrieve(self, request, *args, **kwargs):
         """Récupère une publication et incrémente les vues"""
+        pk = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if not request.user.is_authenticated and pk.isdigit():
+            pk = int(pk)
+            response = response_cache.respond(request, [f'pub:{pk}'], self.build_retrieve_response)
+            if response['X-Cache'] == 'HIT' and response.status_code == 200:
+                # Seules les publications visibles sont en cache : la vue compte
+                view_counter.record(pk)
+            return response
+        return self.build_retrieve_response()
+    
+    async def aretrieve(self, request, *args, **kwargs):
+        pk = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if not request.user.is_authenticated and pk.isdigit():
+            pk = int(pk)
+            response = await response_cache.arespond(request, [f'pub:{pk}'], self.abuild_retrieve_response)
+            if response['X-Cache'] == 'HIT' and response.status_code == 200:
+                # Compteur SQLite local : écriture hors de la boucle d'événements
+                await sync_to_async(view_counter.record)(pk)
+            return response
+        return await self.abuild_retrieve_response()
+    
+    def build_retrieve_response(self):
+        return self.conditional_response(self.request, self.serialize_instance)
+    
+    async def abuild_retrieve_response(self):
+        return await self.aconditional_response(self.request, self.aserialize_instance)
+    
+    def serialize_instance(self):
         instance = self.get_object()
+        request = self.request
         
-        # Incrémenter les vues seulement si ce n'est pas l'auteur
-        if request.user != instance.author:
-            instance.increment_views()
+        # Compter la vue (écriture différée) seulement si ce n'est pas l'auteur
+        if instance.author_id != request.user.pk:
+            view_counter.record(instance.pk)
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
+    async def aserialize_instance(self):
+        instance = await self.aget_object()
+        if instance.author_id != self.request.user.pk:
+            await sync_to_async(view_counter.record)(instance.pk)
+        return Response(await self.aserialize(instance))
+    
     def create(self, request, *args, **kwargs):
         """Crée une nouvelle publication"""
         serializer = self.get_serializer(data=request.data)
@@ -118,55 +283,167 @@ class PublicationViewSet(viewsets.ModelViewSet):
         page = self.paginate_queryset(queryset)
         
         if page is not None:
-            serializer = PublicationListSerializer(page, many=True)
+            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         
-        serializer = PublicationListSerializer(queryset, many=True)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
+    async def amy_publications(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        
+        if page is not None:
+            return await self.aget_paginated_response(page)
+        
+        return Response(await self.aserialize([publication async for publication in queryset], many=True))
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Export en flux des publications visibles, mêmes filtres que la liste
+        Paramètres: output (ndjson|csv), columns (ex: id,title,tags)
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response({
+                'error': f"Format inconnu, choix possibles : {', '.join(EXPORT_FORMATS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        columns = parse_columns(request.query_params.get('columns'))
+        # Flux asynchrone en mode ASGI (sinon mis en mémoire par Django)
+        lines = aexport_lines if settings.ASYNC_READS else export_lines
+        response = StreamingHttpResponse(
+            lines(queryset, output, columns),
+            content_type=EXPORT_FORMATS[output]
+        )
+        response['Content-Disposition'] = f'attachment; filename="publications.{output}"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """
+        Publications publiées classées par score de tendance, lues dans
+        l'ordre de l'index partiel publication_trending
+        """
+        if not request.user.is_authenticated:
+            return response_cache.respond(request, ['list'], self.build_trending_response)
+        return self.build_trending_response()
+    
+    def build_trending_response(self):
+        queryset = (
+            Publication.objects.for_list(self.wants_full_content())
+            .published()
+            .filter(trending_score__isnull=False)
+        )
+        # Tri fixe (pas de ?ordering=) : celui de l'index
+        paginator = self.paginator
+        paginator.ordering = '-trending_score'
+        page = paginator.paginate_queryset(self.sparse_queryset(queryset), self.request)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
         Recherche avancée de publications
         Paramètres: q (query), status, author, company, tags
         """
-        queryset = self.get_queryset()
+        page = self.paginate_queryset(self.get_search_branches())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    async def asearch(self, request):
+        page = await self.apaginate_queryset(self.get_search_branches())
+        return await self.aget_paginated_response(page)
+    
+    def get_search_branches(self):
+        if self.request.query_params.get('q'):
+            # Résultats classés par pertinence sauf tri explicite
+            self.ordering = ['-search_rank']
+        return [
+            self.sparse_queryset(self.apply_search_params(queryset))
+            for queryset in self.get_branch_querysets()
+        ]
+    
+    def apply_search_params(self, queryset):
+        """Applique les paramètres de recherche à une branche"""
+        params = self.request.query_params
         
-        # Recherche par texte
-        query = request.query_params.get('q', None)
+        # Recherche plein texte
+        query = params.get('q', None)
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(tags__icontains=query)
-            )
+            queryset = search_publications(queryset, query)
         
         # Filtrage par statut
-        status_filter = request.query_params.get('status', None)
+        status_filter = params.get('status', None)
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         
         # Filtrage par entreprise
-        company_id = request.query_params.get('company', None)
+        company_id = params.get('company', None)
         if company_id:
             queryset = queryset.filter(company_id=company_id)
         
-        # Filtrage par tags
-        tags = request.query_params.get('tags', None)
+        # Filtrage par tags (tous les tags demandés)
+        tags = params.get('tags', None)
         if tags:
-            queryset = queryset.filter(tags__icontains=tags)
+            queryset = queryset.filter(normalized_tags__contains=normalize_tags(tags))
         
-        # Pagination
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = PublicationListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = PublicationListSerializer(queryset, many=True)
-        return Response({
-            'count': queryset.count(),
-            'results': serializer.data
-        })
+        return queryset
+    
+    def get_bulk_payload(self, key, child):
+        """Liste `key` du corps de la requête, bornée à PUBLICATION_BULK_MAX_ITEMS"""
+        field = serializers.ListField(
+            child=child,
+            min_length=1,
+            max_length=settings.PUBLICATION_BULK_MAX_ITEMS
+        )
+        try:
+            return field.run_validation(self.request.data.get(key, empty))
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({key: exc.detail})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Crée plusieurs publications : {"items": [{title, content, ...}, ...]}"""
+        items = self.get_bulk_payload('items', serializers.DictField())
+        return Response(bulk_create_publications(request.user, items))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """Met à jour plusieurs publications : {"items": [{id, champs...}, ...]}"""
+        items = self.get_bulk_payload('items', serializers.DictField())
+        return Response(bulk_update_publications(request.user, items))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_publish(self, request):
+        """Publie plusieurs publications : {"ids": [1, 2, ...]}"""
+        ids = self.get_bulk_payload('ids', serializers.IntegerField())
+        return Response(bulk_set_status(request.user, ids, Publication.Status.PUBLISHED))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_archive(self, request):
+        """Archive plusieurs publications : {"ids": [1, 2, ...]}"""
+        ids = self.get_bulk_payload('ids', serializers.IntegerField())
+        return Response(bulk_set_status(request.user, ids, Publication.Status.ARCHIVED))
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def scheduler(self, request):
+        """Files du scheduler : lignes échues en attente, retard, dernier passage"""
+        return Response(scheduler_lag())
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, IsAuthorOrCompanyOwner])
+    def analytics(self, request, pk=None):
+        """
+        Vues de la publication par heure ou par jour, lues dans les agrégats :
+        ?granularity=hour|day&since=...&until=...
+        """
+        publication = self.get_object()
+        params = ViewAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(views_series({'publication_id': publication.pk}, **params.validated_data))
     
     @action(detail=True, methods=['post'])
     def publish(self, request, pk=None):
@@ -198,4 +475,28 @@ class PublicationViewSet(viewsets.ModelViewSet):
         return Response({
             'publication': PublicationSerializer(publication, context={'request': request}).data,
             'message': 'Publication archivée avec succès'
-        })
\ No newline at end of file
+        })
+    
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[AllowAny],
+        url_path=r'renditions/(?P<size>thumb|card|full)/(?P<fmt>webp|jpeg)',
+        url_name='rendition'
+    )
+    def rendition(self, request, pk=None, size=None, fmt=None):
+        """Déclinaison de l'image, générée au premier accès puis servie depuis le cache disque"""
+        publication = self.get_object()
+        if not publication.image_digest:
+            raise NotFound('Cette publication n\'a pas d\'image')
+        
+        try:
+            path = rendition_pool.ensure(publication, size, fmt)
+        except (FileNotFoundError, UnidentifiedImageError):
+            raise NotFound('Image originale introuvable ou illisible')
+        except TimeoutError:
+            return Response({
+                'error': 'Déclinaison en cours de génération'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '2'})
+        
+        return redirect(default_storage.url(path))
@@ -11,5 +11,16 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Servi en ASGI : lectures asynchrones, sauf ASYNC_READS=False explicite
+os.environ.setdefault('ASYNC_READS', 'True')
 
-application = get_asgi_application()
\ No newline at end of file
+application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+# WhiteNoise retiré de la chaîne en mode async : fichiers statiques
+# (admin, documentation de l'API) servis ici
+if 'whitenoise.middleware.WhiteNoiseMiddleware' not in settings.MIDDLEWARE and not settings.DEBUG:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+    application = ASGIStaticFilesHandler(application)
@@ -1,3 +1,4 @@
+import dj_database_url
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
@@ -8,6 +9,9 @@ SECRET_KEY = config('SECRET_KEY')
 DEBUG = config('DEBUG', default=False, cast=bool)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='').split(',')
 
+# Lectures asynchrones (list, retrieve, search...) : activé par config/asgi.py
+ASYNC_READS = config('ASYNC_READS', default=False, cast=bool)
+
 # Applications
 DJANGO_APPS = [
     'django.contrib.admin',
@@ -16,12 +20,12 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
-    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'drf_spectacular',
@@ -46,6 +50,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -69,15 +74,42 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+# Pool de connexions par processus (core.db.backends.postgresql), DB_POOL=False pour s'en passer.
+# Connexions ouvertes au plus : workers x DB_POOL_MAX_SIZE (voir /api/internal/db-pool/)
+DATABASE_POOL = {
+    'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+    'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+    'check_after': config('DB_POOL_CHECK_AFTER', default=30, cast=float),
+} if config('DB_POOL', default=True, cast=bool) else None
+
+# Réplicas en lecture : DATABASE_REPLICA_URLS=postgres://...,postgres://... (alias replica1, replica2...)
+def _replica(url):
+    replica = dj_database_url.parse(url, engine='core.db.backends.postgresql')
+    replica['OPTIONS'] = {**replica.get('OPTIONS', {}), 'pool': DATABASE_POOL}
+    # Tests : les réplicas lisent la base de test du primaire
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
+
+
+DATABASE_REPLICAS = {
+    f'replica{index}': _replica(url)
+    for index, url in enumerate(filter(None, config('DATABASE_REPLICA_URLS', default='').split(',')), start=1)
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql',
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
-    }
+        'OPTIONS': {'pool': DATABASE_POOL},
+    },
+    **DATABASE_REPLICAS,
 }
 
 # Password validation
@@ -111,7 +143,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -125,6 +157,18 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
+    # Proxys de confiance devant l'application : l'IP des limitations est lue
+    # dans X-Forwarded-For à ce rang (0 : REMOTE_ADDR, en-tête ignoré)
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Seaux à jetons (core.throttling) : « scope.identité » -> capacité/période
+    'DEFAULT_THROTTLE_RATES': {
+        'login.ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login.email': config('THROTTLE_LOGIN_EMAIL', default='10/min'),
+        'register.ip': config('THROTTLE_REGISTER_IP', default='10/min'),
+        'search.user': config('THROTTLE_SEARCH_USER', default='120/min'),
+        'search.ip': config('THROTTLE_SEARCH_IP', default='60/min'),
+        'list.ip': config('THROTTLE_LIST_IP', default='300/min'),
+    },
 }
 
 # JWT Settings
@@ -134,8 +178,54 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Révocations dans accounts.RevokedToken (filtre de Bloom + clé primaire)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.TokenRefreshSerializer',
+}
+
+# Stockage local partagé entre workers (tampons, compteurs)
+LOCAL_STORE_DIR = config('LOCAL_STORE_DIR', default=str(BASE_DIR / 'var'))
+
+# Compteur de vues en écriture différée (0 = pas de flusher dans les workers)
+VIEW_COUNTER_FLUSH_INTERVAL = config('VIEW_COUNTER_FLUSH_INTERVAL', default=10, cast=float)
+
+# Cache (locmem en dev/test, fichiers partagés par les workers en prod)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='publications-api'),
+    }
 }
 
+# Durée de vie des réponses publiques mises en cache (secondes)
+PUBLICATION_CACHE_TIMEOUT = config('PUBLICATION_CACHE_TIMEOUT', default=60, cast=int)
+
+# Déclinaisons d'images (pool de génération par processus)
+RENDITION_WORKERS = config('RENDITION_WORKERS', default=2, cast=int)
+RENDITION_TIMEOUT = config('RENDITION_TIMEOUT', default=10, cast=float)
+
+# Taille maximale des lots des écritures en masse
+PUBLICATION_BULK_MAX_ITEMS = config('PUBLICATION_BULK_MAX_ITEMS', default=100, cast=int)
+
+# Tendances : demi-vie du poids d'une vue (heures)
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+
+# Rétention des événements de vue bruts (les agrégats sont conservés)
+ANALYTICS_RAW_RETENTION_DAYS = config('ANALYTICS_RAW_RETENTION_DAYS', default=7, cast=int)
+
+# Comptes authentifiés en cache (secondes), invalidés par User.save()
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
+# Hachage des mots de passe : pool par processus et limite pour la machine (503 au-delà)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=2, cast=int)
+PASSWORD_HASH_MAX_IN_FLIGHT = config('PASSWORD_HASH_MAX_IN_FLIGHT', default=4, cast=int)
+PASSWORD_HASH_TIMEOUT = config('PASSWORD_HASH_TIMEOUT', default=10, cast=float)
+
+# Lectures des requêtes GET sur les réplicas ; primaire pendant REPLICA_STICKY_SECONDS après une écriture
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=float)
+# Réplica injoignable écarté pendant ce délai (secondes)
+REPLICA_RETRY_AFTER = config('REPLICA_RETRY_AFTER', default=30, cast=float)
+
 # CORS
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='').split(',')
 CORS_ALLOW_CREDENTIALS = True
@@ -5,13 +5,15 @@ DEBUG = True
 # Database locale pour développement
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql',
         'NAME': config('DB_NAME', default='publications_db'),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
-    }
+        'OPTIONS': {'pool': DATABASE_POOL},
+    },
+    **DATABASE_REPLICAS,
 }
 
 # CORS permissif en dev
@@ -10,6 +10,9 @@ SECRET_KEY = config('SECRET_KEY')
 DEBUG = False
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='').split(',')
 
+# Lectures asynchrones (list, retrieve, search...) : activé par config/asgi.py
+ASYNC_READS = config('ASYNC_READS', default=False, cast=bool)
+
 # Applications
 DJANGO_APPS = [
     'django.contrib.admin',
@@ -18,6 +21,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -48,8 +52,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db.middleware.ReplicaRoutingMiddleware',
 ]
 
+if ASYNC_READS:
+    # WhiteNoise n'a pas de mode async : il ferait repasser toute la
+    # chaîne en synchrone. Les fichiers statiques sont servis par config/asgi.py
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -71,13 +81,42 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database - Utiliser DATABASE_URL directement
+# Pool de connexions par processus (core.db.backends.postgresql), DB_POOL=False pour s'en passer.
+# Connexions ouvertes au plus : workers x DB_POOL_MAX_SIZE (voir /api/internal/db-pool/)
+DATABASE_POOL = {
+    'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+    'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+    'check_after': config('DB_POOL_CHECK_AFTER', default=30, cast=float),
+} if config('DB_POOL', default=True, cast=bool) else None
+
+# Réplicas en lecture : DATABASE_REPLICA_URLS=postgres://...,postgres://... (alias replica1, replica2...)
+def _replica(url):
+    replica = dj_database_url.parse(url, engine='core.db.backends.postgresql')
+    replica['OPTIONS'] = {**replica.get('OPTIONS', {}), 'pool': DATABASE_POOL}
+    # Tests : les réplicas lisent la base de test du primaire
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
+
+
+DATABASE_REPLICAS = {
+    f'replica{index}': _replica(url)
+    for index, url in enumerate(filter(None, config('DATABASE_REPLICA_URLS', default='').split(',')), start=1)
+}
+
 DATABASES = {
     'default': dj_database_url.config(
         default=config('DATABASE_URL'),
-        conn_max_age=600,
-        conn_health_checks=True,
+        engine='core.db.backends.postgresql',
+        # Sans pool : connexions persistantes, inutilisables sous ASGI (un thread par requête)
+        conn_max_age=0 if DATABASE_POOL or ASYNC_READS else 600,
+        conn_health_checks=not DATABASE_POOL,
     )
 }
+DATABASES['default'].setdefault('OPTIONS', {})['pool'] = DATABASE_POOL
+DATABASES.update(DATABASE_REPLICAS)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -111,7 +150,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -125,6 +164,18 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
+    # Proxys de confiance devant l'application (1 derrière le proxy de Render) :
+    # l'IP des limitations est l'entrée de X-Forwarded-For ajoutée par ce proxy
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
+    # Seaux à jetons (core.throttling) : « scope.identité » -> capacité/période
+    'DEFAULT_THROTTLE_RATES': {
+        'login.ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login.email': config('THROTTLE_LOGIN_EMAIL', default='10/min'),
+        'register.ip': config('THROTTLE_REGISTER_IP', default='10/min'),
+        'search.user': config('THROTTLE_SEARCH_USER', default='120/min'),
+        'search.ip': config('THROTTLE_SEARCH_IP', default='60/min'),
+        'list.ip': config('THROTTLE_LIST_IP', default='300/min'),
+    },
 }
 
 # JWT Settings
@@ -134,8 +185,54 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Révocations dans accounts.RevokedToken (filtre de Bloom + clé primaire)
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.TokenRefreshSerializer',
+}
+
+# Stockage local partagé entre workers (tampons, compteurs)
+LOCAL_STORE_DIR = config('LOCAL_STORE_DIR', default=str(BASE_DIR / 'var'))
+
+# Compteur de vues en écriture différée (0 = pas de flusher dans les workers)
+VIEW_COUNTER_FLUSH_INTERVAL = config('VIEW_COUNTER_FLUSH_INTERVAL', default=10, cast=float)
+
+# Cache (locmem en dev/test, fichiers partagés par les workers en prod)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'var' / 'cache')),
+    }
 }
 
+# Durée de vie des réponses publiques mises en cache (secondes)
+PUBLICATION_CACHE_TIMEOUT = config('PUBLICATION_CACHE_TIMEOUT', default=60, cast=int)
+
+# Déclinaisons d'images (pool de génération par processus)
+RENDITION_WORKERS = config('RENDITION_WORKERS', default=2, cast=int)
+RENDITION_TIMEOUT = config('RENDITION_TIMEOUT', default=10, cast=float)
+
+# Taille maximale des lots des écritures en masse
+PUBLICATION_BULK_MAX_ITEMS = config('PUBLICATION_BULK_MAX_ITEMS', default=100, cast=int)
+
+# Tendances : demi-vie du poids d'une vue (heures)
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+
+# Rétention des événements de vue bruts (les agrégats sont conservés)
+ANALYTICS_RAW_RETENTION_DAYS = config('ANALYTICS_RAW_RETENTION_DAYS', default=7, cast=int)
+
+# Comptes authentifiés en cache (secondes), invalidés par User.save()
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
+# Hachage des mots de passe : pool par processus et limite pour la machine (503 au-delà)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=2, cast=int)
+PASSWORD_HASH_MAX_IN_FLIGHT = config('PASSWORD_HASH_MAX_IN_FLIGHT', default=4, cast=int)
+PASSWORD_HASH_TIMEOUT = config('PASSWORD_HASH_TIMEOUT', default=10, cast=float)
+
+# Lectures des requêtes GET sur les réplicas ; primaire pendant REPLICA_STICKY_SECONDS après une écriture
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=float)
+# Réplica injoignable écarté pendant ce délai (secondes)
+REPLICA_RETRY_AFTER = config('REPLICA_RETRY_AFTER', default=30, cast=float)
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='').split(',')
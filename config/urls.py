@@ -21,6 +21,9 @@ urlpatterns = [
     path('api/auth/', include('apps.accounts.urls')),
     path('api/companies/', include('apps.companies.urls')),
     path('api/publications/', include('apps.publications.urls')),
+    
+    # Endpoints internes (admin)
+    path('api/internal/', include('core.urls')),
 ]
 
 # Servir les fichiers media en développement
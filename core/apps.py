@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Core'
+    
+    def ready(self):
+        # Enregistrement des lookups personnalisés
+        from . import lookups  # noqa: F401
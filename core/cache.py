@@ -0,0 +1,174 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+from .db.routers import primary_reads
+
+# Caches propres à un processus (mémoire) ou à une machine (fichiers)
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+
+def require_shared_cache(alias='default'):
+    """
+    Pour les processus lancés à part des workers web (scheduler, compactage) :
+    leurs invalidations n'atteignent le web que par un cache partagé
+    """
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in LOCAL_CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f"Le cache '{alias}' ({backend.rsplit('.', 1)[-1]}) n'est pas partagé avec les "
+            "workers web : configurez CACHE_BACKEND (Redis, Memcached, base de données)."
+        )
+
+
+class VersionedResponseCache:
+    """
+    Cache de réponses DRF invalidé par numéros de version.
+
+    Chaque entrée est indexée par la requête normalisée (hôte, chemin,
+    paramètres triés) et par la version courante des portées dont elle
+    dépend (ex. 'list', 'pub:42'). Invalider revient à changer la version
+    d'une portée : les anciennes entrées ne sont plus jamais lues et
+    expirent d'elles-mêmes, sans parcours ni suppression.
+
+    Fonctionne avec n'importe quel backend Django (locmem, fichiers, Redis).
+    Les versions sont des horodatages en nanosecondes plutôt que des
+    compteurs, pour rester correctes sans incr atomique.
+    """
+
+    def __init__(self, namespace, timeout=60, alias='default'):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _version_key(self, scope):
+        return f'{self.namespace}:v:{scope}'
+
+    def _stats_key(self, name):
+        return f'{self.namespace}:stats:{name}'
+
+    def versions(self, scopes):
+        """Retourne la version courante de chaque portée (créée si absente)"""
+        keys = {self._version_key(scope): scope for scope in scopes}
+        found = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            version = time.time_ns()
+            for key in missing:
+                # add() : ne pas écraser une version créée entre-temps
+                if not self.cache.add(key, version, None):
+                    version = self.cache.get(key, version)
+                found[key] = version
+        return [found[self._version_key(scope)] for scope in scopes]
+
+    def bump(self, *scopes):
+        """Invalide toutes les entrées dépendant de ces portées"""
+        version = time.time_ns()
+        self.cache.set_many({self._version_key(scope): version for scope in scopes}, None)
+
+    def make_key(self, request, scopes):
+        """Clé de cache : requête normalisée + versions des portées"""
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values if value != ''
+        )
+        raw = '|'.join([
+            request.get_host(),
+            request.path,
+            urlencode(params),
+            *(f'{scope}={version}' for scope, version in zip(scopes, self.versions(scopes))),
+        ])
+        return f'{self.namespace}:r:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+    # En-têtes conservés avec les données (validateurs HTTP)
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def respond(self, request, scopes, build):
+        """
+        Retourne la réponse en cache, ou la construit avec build() et la
+        met en cache si elle est en 200. L'en-tête X-Cache indique HIT/MISS.
+        Sur un HIT, les validateurs en cache permettent de répondre 304.
+        """
+        key, cached = self.lookup(request, scopes)
+        if cached is not None:
+            return self.cached_response(request, cached)
+        # Réponse servie à tous jusqu'à la prochaine invalidation : lue sur le primaire
+        with primary_reads():
+            response = build()
+        return self.store(key, response)
+
+    async def arespond(self, request, scopes, abuild):
+        """respond() pour les vues asynchrones : abuild() est une coroutine"""
+        key, cached = await sync_to_async(self.lookup)(request, scopes)
+        if cached is not None:
+            return self.cached_response(request, cached)
+        with primary_reads():
+            response = await abuild()
+        return await sync_to_async(self.store)(key, response)
+
+    def lookup(self, request, scopes):
+        """Retourne (clé, entrée en cache ou None) et compte le hit/miss"""
+        key = self.make_key(request, scopes)
+        cached = self.cache.get(key)
+        self._count('misses' if cached is None else 'hits')
+        return key, cached
+
+    def cached_response(self, request, cached):
+        data, headers = cached
+        response = get_conditional_response(
+            request,
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(headers.get('Last-Modified', ''))
+        )
+        if response is None:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def store(self, key, response):
+        """Met en cache une réponse construite (200 seulement)"""
+        if response.status_code == 200:
+            headers = {name: response[name] for name in self.cached_headers if name in response}
+            self.cache.set(key, (response.data, headers), self.timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def _count(self, name):
+        key = self._stats_key(name)
+        self.cache.add(key, 0, None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Clé expirée ou évincée entre add() et incr()
+            self.cache.set(key, 1, None)
+
+    def stats(self):
+        """Compteurs de hits/misses depuis la dernière remise à zéro"""
+        values = self.cache.get_many([self._stats_key('hits'), self._stats_key('misses')])
+        hits = values.get(self._stats_key('hits'), 0)
+        misses = values.get(self._stats_key('misses'), 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([self._stats_key('hits'), self._stats_key('misses')])
@@ -0,0 +1,71 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from core.db.pool import get_pool
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Backend PostgreSQL avec pool de connexions par processus.
+
+    Activé par OPTIONS['pool'] (True, ou les paramètres de ConnectionPool :
+    min_size, max_size, timeout, max_idle, max_lifetime, check_after),
+    comme le pool natif de Django 5.1. close() rend la connexion au pool :
+    avec CONN_MAX_AGE = 0, chaque requête (ou thread, sous ASGI) emprunte
+    une connexion ouverte au lieu d'en établir une.
+    """
+    creation_class = DatabaseCreation
+    # Pool de la connexion ouverte (rendue à close())
+    connection_pool = None
+
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options or self.alias == NO_DB_ALIAS:
+            # Connexions d'administration (création des bases de test) : hors pool
+            return None
+        return get_pool(self.alias, self.settings_dict['NAME'], {} if options is True else options)
+
+    def check_settings(self):
+        super().check_settings()
+        if self.settings_dict['OPTIONS'].get('pool') and self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('Le pool de connexions impose CONN_MAX_AGE = 0.')
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def new_pool_connection(self):
+        return super().get_new_connection(self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection = pool.getconn(self.new_pool_connection)
+        # Fixé par get_new_connection() à la création : à refaire pour une connexion reprise
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        # Le pool d'origine, même si NAME change entre-temps (bases de test)
+        self.connection_pool = pool
+        return connection
+
+    def fill_pool(self):
+        """Ouvre les min_size connexions du pool"""
+        pool = self.pool
+        if pool is not None:
+            pool.fill(self.new_pool_connection)
+
+    def _close(self):
+        pool = self.connection_pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        # Connexion rendue : d'autres threads peuvent la prendre
+        self.connection = None
+        self.connection_pool = None
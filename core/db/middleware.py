@@ -0,0 +1,94 @@
+import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+from .routers import RoutingState, routing_state
+
+# Posé après une écriture pour les clients sans token (admin, inscription)
+PIN_COOKIE = 'db_primary'
+
+
+def client_key(request):
+    """
+    Compte à l'origine de la requête, lu dans le token JWT sans vérifier
+    la signature : il ne sert qu'à choisir la base (l'authentification
+    reste faite par la vue)
+    """
+    parts = request.headers.get('Authorization', '').split()
+    if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        claims = jwt.decode(parts[1], options={'verify_signature': False})
+    except jwt.PyJWTError:
+        return None
+    user_id = claims.get(api_settings.USER_ID_CLAIM)
+    return None if user_id is None else f'db:primary:user:{user_id}'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lectures sur les réplicas pour les requêtes sûres, avec lecture de
+    ses propres écritures : un client qui vient d'écrire lit sur le
+    primaire pendant REPLICA_STICKY_SECONDS (clé en cache par compte,
+    cookie pour les clients sans token). Synchrone et asynchrone.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def may_use_replicas(self, request):
+        return (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+        )
+
+    def should_pin(self, request, response, state):
+        return state.wrote or (request.method not in SAFE_METHODS and response.status_code < 400)
+
+    def set_pin_cookie(self, response):
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=int(settings.REPLICA_STICKY_SECONDS), httponly=True, samesite='Lax'
+        )
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        key = client_key(request)
+        replica_reads = self.may_use_replicas(request) and not (key and cache.get(key))
+        state = RoutingState(replica_reads)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if self.should_pin(request, response, state):
+            if key:
+                cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+            self.set_pin_cookie(response)
+        return response
+
+    async def __acall__(self, request):
+        key = client_key(request)
+        replica_reads = self.may_use_replicas(request) and not (key and await cache.aget(key))
+        state = RoutingState(replica_reads)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if self.should_pin(request, response, state):
+            if key:
+                await cache.aset(key, True, settings.REPLICA_STICKY_SECONDS)
+            self.set_pin_cookie(response)
+        return response
@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+from collections import deque
+from django.db import OperationalError
+
+# États de transaction de la libpq (psycopg2 et psycopg 3)
+TRANSACTION_IDLE = 0
+TRANSACTION_UNKNOWN = 4
+
+
+class PoolTimeout(OperationalError):
+    """Aucune connexion libérée dans le délai du pool"""
+
+
+class ConnectionPool:
+    """
+    Pool de connexions d'un processus, partagé par ses threads.
+
+    Les connexions sont créées à la demande jusqu'à max_size ; au-delà,
+    on attend qu'une connexion soit rendue, au plus timeout secondes.
+    Une connexion rendue voit sa transaction annulée ; elle est fermée
+    si elle est cassée, plus vieille que max_lifetime, ou inactive depuis
+    max_idle (sans descendre sous min_size). Une connexion inactive depuis
+    check_after secondes est vérifiée (SELECT 1) avant d'être prêtée.
+    """
+
+    def __init__(self, name, min_size=0, max_size=10, timeout=10.0, max_idle=300.0,
+                 max_lifetime=3600.0, check_after=30.0):
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._cond = threading.Condition()
+        # (connexion, rendue à) : les plus récentes à droite
+        self._idle = deque()
+        self._created_at = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self.counters = dict.fromkeys(
+            ('checkouts', 'created', 'closed', 'waits', 'timeouts', 'failed_checks'), 0
+        )
+        self.wait_time = 0.0
+
+    def getconn(self, connect):
+        """Prête une connexion, créée par connect() si le pool n'est pas plein"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        expired = []
+        try:
+            with self._cond:
+                self.counters['checkouts'] += 1
+                while True:
+                    expired += self._expire_idle()
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'Pool {self.name} : aucune connexion libre après {self.timeout} s '
+                            f'({self.max_size} connexions en cours)'
+                        )
+                    if not waited:
+                        waited = True
+                        self.counters['waits'] += 1
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if waited:
+                    self.wait_time += time.monotonic() - started
+        finally:
+            for stale in expired:
+                self._close_quietly(stale)
+
+        if conn is None:
+            return self._connect(connect)
+        if self.check_after is not None and time.monotonic() - returned_at >= self.check_after:
+            if not self._is_alive(conn):
+                with self._cond:
+                    self.counters['failed_checks'] += 1
+                self._discard(conn)
+                return self.getconn(connect)
+        return conn
+
+    def putconn(self, conn):
+        """Rend une connexion prêtée par getconn()"""
+        try:
+            if conn.closed or conn.info.transaction_status == TRANSACTION_UNKNOWN:
+                raise OperationalError('connexion cassée')
+            if conn.info.transaction_status != TRANSACTION_IDLE:
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        with self._cond:
+            created_at = self._created_at.get(conn)
+            if not self._closed and created_at is not None and now - created_at < self.max_lifetime:
+                self._idle.append((conn, now))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    def fill(self, connect):
+        """Ouvre des connexions jusqu'à min_size (démarrage du worker)"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            self.putconn(self._connect(connect))
+
+    def close(self):
+        """Ferme les connexions inactives ; celles en cours le seront à leur retour"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'waiting': self._waiting,
+                **self.counters,
+                'wait_time_ms': round(self.wait_time * 1000, 1),
+            }
+
+    def _connect(self, connect):
+        # Place déjà réservée dans _size
+        try:
+            conn = connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[conn] = time.monotonic()
+            self.counters['created'] += 1
+        return conn
+
+    def _expire_idle(self):
+        """Retire (sous le verrou) les connexions inactives depuis max_idle"""
+        expired = []
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.popleft()
+            self._forget(conn)
+            expired.append(conn)
+        return expired
+
+    def _forget(self, conn):
+        self._created_at.pop(conn, None)
+        self._size -= 1
+        self.counters['closed'] += 1
+        self._cond.notify()
+
+    def _discard(self, conn):
+        with self._cond:
+            self._forget(conn)
+        self._close_quietly(conn)
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, conn):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if conn.info.transaction_status != TRANSACTION_IDLE:
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+
+_pools = {}
+_pools_pid = None
+# Pools hérités du processus parent : leurs sockets sont partagés avec lui,
+# les fermer (même par le ramasse-miettes) couperait ses connexions
+_inherited = []
+_registry_lock = threading.Lock()
+
+
+def get_pool(alias, database, options):
+    """Pool du processus courant pour (alias, base), créé au premier appel"""
+    global _pools, _pools_pid
+    with _registry_lock:
+        if _pools_pid != os.getpid():
+            _inherited.append(_pools)
+            _pools = {}
+            _pools_pid = os.getpid()
+        pool = _pools.get((alias, database))
+        if pool is None:
+            pool = _pools[(alias, database)] = ConnectionPool(f'{alias}/{database}', **options)
+        return pool
+
+
+def close_pools(alias=None):
+    """Ferme les pools du processus (d'un alias, ou tous)"""
+    with _registry_lock:
+        if _pools_pid != os.getpid():
+            return
+        keys = [key for key in _pools if alias is None or key[0] == alias]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """Statistiques des pools du processus {alias/base: stats}"""
+    with _registry_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    return {pool.name: pool.stats() for pool in pools}
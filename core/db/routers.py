@@ -0,0 +1,130 @@
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingState:
+    """
+    Requête en cours : lectures permises sur les réplicas, réplica retenu,
+    lectures forcées sur le primaire, écritures faites
+    """
+
+    def __init__(self, replica_reads):
+        self.replica_reads = replica_reads
+        self.primary_reads = False
+        self.wrote = False
+        self._replica = None
+
+    def replica(self):
+        """
+        Réplica de la requête, tiré à sa première lecture puis conservé :
+        une seule vérification de santé, des lectures cohérentes entre elles
+        """
+        if self._replica is None:
+            candidates = random.sample(settings.DATABASE_REPLICAS, len(settings.DATABASE_REPLICAS))
+            self._replica = next(
+                (alias for alias in candidates if replica_health.available(alias)), DEFAULT_DB_ALIAS
+            )
+        return self._replica
+
+
+# Posé par ReplicaRoutingMiddleware ; hors requête (commandes, tâches), tout va au primaire
+routing_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Lectures du bloc sur le primaire, pour les réponses qui seront servies
+    à d'autres clients (cache partagé) : un réplica en retard y figerait des
+    données antérieures à la dernière invalidation. L'état est modifié en
+    place, ce qui vaut aussi pour les requêtes faites via sync_to_async.
+    """
+    state = routing_state.get()
+    if state is None:
+        yield
+        return
+    previous = state.primary_reads
+    state.primary_reads = True
+    try:
+        yield
+    finally:
+        state.primary_reads = previous
+
+
+class ReplicaHealth:
+    """
+    Réplicas injoignables, par processus : un réplica dont la connexion
+    échoue est écarté pendant REPLICA_RETRY_AFTER secondes.
+    """
+
+    def __init__(self):
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def available(self, alias):
+        with self._lock:
+            if time.monotonic() < self._down_until.get(alias, 0):
+                return False
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            logger.warning('Réplica %s injoignable, lectures sur le primaire', alias, exc_info=True)
+            with self._lock:
+                self._down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_AFTER
+            return False
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._down_until.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class PrimaryReplicaRouter:
+    """
+    Écritures sur le primaire, lectures des requêtes sûres (GET, HEAD,
+    OPTIONS) sur un réplica de settings.DATABASE_REPLICAS.
+
+    Restent sur le primaire : les lectures hors requête, celles qui suivent
+    une écriture dans la même requête ou dans une transaction, celles des
+    réponses mises en cache partagé (primary_reads()) et celles des
+    modèles qui doivent être à jour (comptes, révocations, sessions).
+    """
+
+    primary_models = {'accounts.user', 'accounts.revokedtoken', 'sessions.session'}
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or not state.replica_reads or state.primary_reads or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if model._meta.label_lower in self.primary_models:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica()
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mêmes données sur le primaire et ses réplicas
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Réplicas en lecture seule, alimentés par la réplication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,57 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+
+
+class SharedLocalStore:
+    """
+    Petit magasin SQLite partagé par tous les workers d'une même machine.
+
+    Sert aux états qui doivent être communs aux processus gunicorn sans
+    dépendre de Redis (compteurs tamponnés, seaux de jetons...).
+    Chaque processus et chaque thread ouvre sa propre connexion.
+    """
+
+    def __init__(self, name, schema):
+        self.name = name
+        self.schema = schema
+        self._local = threading.local()
+
+    @property
+    def path(self):
+        """Chemin du fichier SQLite (dans LOCAL_STORE_DIR)"""
+        return Path(settings.LOCAL_STORE_DIR) / f'{self.name}.sqlite3'
+
+    def connection(self):
+        """Retourne la connexion du thread courant (rouverte après un fork)"""
+        path = self.path
+        key = (os.getpid(), str(path))
+        if getattr(self._local, 'key', None) != key:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(self.schema)
+            self._local.conn = conn
+            self._local.key = key
+        return self._local.conn
+
+    def execute(self, sql, params=()):
+        """Exécute une requête en autocommit"""
+        return self.connection().execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        """Transaction exclusive en écriture (BEGIN IMMEDIATE)"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
@@ -0,0 +1,19 @@
+from django.db.models import CharField, TextField
+from django.db.models.lookups import IContains
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class TrigramIContains(IContains):
+    """
+    icontains écrit en « col ILIKE '%valeur%' ».
+
+    Contrairement à icontains (UPPER(col::text) LIKE ...), cette forme est
+    servie directement par un index GIN gin_trgm_ops posé sur la colonne.
+    """
+    lookup_name = 'trgm_icontains'
+
+    def as_postgresql(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs_sql} ILIKE {rhs_sql}', (*lhs_params, *rhs_params)
@@ -0,0 +1,405 @@
+import hashlib
+import json
+from functools import update_wrapper
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class ConditionalGetMixin:
+    """
+    Validateurs HTTP (ETag / Last-Modified) pour list et retrieve.
+
+    Les validateurs sont calculés par une requête d'agrégat sur le même
+    queryset que la réponse (MAX(updated_at), COUNT...) : un client à jour
+    reçoit un 304 sans que la liste ne soit chargée ni sérialisée.
+
+    Pour une liste paginée par clé (KeysetPagination), validator_page_fields
+    remplace l'agrégat : la sonde lit ces colonnes sur les seules lignes de
+    la page demandée, par la même requête bornée que la page.
+
+    validator_timestamp_fields couvre aussi les relations imbriquées dans
+    la réponse (auteur, entreprise) : les modifier change les validateurs.
+    """
+    # Colonnes des lignes de la page qui changent avec la réponse
+    validator_page_fields = None
+    # Horodatages des lignes servies, y compris des relations imbriquées dans la réponse
+    validator_timestamp_fields = ('updated_at',)
+
+    def get_validator_aggregates(self):
+        """Agrégats qui changent dès que le contenu de la réponse change"""
+        return {'last_modified': self.get_last_modified_aggregate(), 'count': Count('pk')}
+
+    def get_last_modified_aggregate(self):
+        maxima = [Max(field) for field in self.validator_timestamp_fields]
+        # GREATEST ignore les NULL (relation absente) sous PostgreSQL
+        return maxima[0] if len(maxima) == 1 else Greatest(*maxima)
+
+    def get_validator_queryset(self):
+        queryset = self.get_queryset()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        # Filtres seulement : ni jointures ni annotations d'affichage
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def get_validator_page_query(self, queryset):
+        """Colonnes validator_page_fields de la page demandée, ou None (agrégat)"""
+        if not self.validator_page_fields or self.action == 'retrieve':
+            return None
+        fields = (*self.validator_timestamp_fields, *self.validator_page_fields)
+        return self.paginator.get_page_query(queryset, self.request, view=self, fields=fields)
+
+    def page_probe(self, rows):
+        timestamps = [
+            row[field] for row in rows for field in self.validator_timestamp_fields
+            if row[field] is not None
+        ]
+        return {
+            'count': len(rows),
+            'last_modified': max(timestamps, default=None),
+            'rows': rows,
+        }
+
+    def get_validators(self):
+        """Retourne (etag, last_modified), ou (None, None) si rien à valider"""
+        try:
+            queryset = self.get_validator_queryset()
+            query = self.get_validator_page_query(queryset)
+            if query is not None:
+                probe = self.page_probe(list(query))
+            else:
+                probe = queryset.aggregate(**self.get_validator_aggregates())
+        except (TypeError, ValueError, ValidationError):
+            # Clé invalide : le handler répondra 404
+            return None, None
+        return self.make_validators(probe)
+
+    async def aget_validators(self):
+        """get_validators() avec la sonde lue par l'ORM asynchrone"""
+        try:
+            queryset = self.get_validator_queryset()
+            query = self.get_validator_page_query(queryset)
+            if query is not None:
+                probe = self.page_probe([row async for row in query])
+            else:
+                probe = await queryset.aaggregate(**self.get_validator_aggregates())
+        except (TypeError, ValueError, ValidationError):
+            return None, None
+        return self.make_validators(probe)
+
+    def make_validators(self, probe):
+        if not probe['count']:
+            return None, None
+
+        request = self.request
+        raw = json.dumps([
+            request.get_full_path(),
+            request.user.pk,
+            request.accepted_renderer.format,
+            sorted(probe.items()),
+        ], cls=DjangoJSONEncoder)
+        etag = f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+        last_modified = probe['last_modified']
+        return etag, last_modified and int(last_modified.timestamp())
+
+    def conditional_response(self, request, build):
+        """
+        Retourne un 304 si les validateurs envoyés par le client sont à jour,
+        sinon la réponse de build() accompagnée de ETag / Last-Modified
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return build()
+
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return build()
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = build()
+        return self.add_validators(response, etag, last_modified)
+
+    async def aconditional_response(self, request, abuild):
+        """conditional_response() pour les vues asynchrones"""
+        if request.method not in ('GET', 'HEAD'):
+            return await abuild()
+
+        etag, last_modified = await self.aget_validators()
+        if etag is None:
+            return await abuild()
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await abuild()
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+class SparseFieldsetMixin:
+    """
+    Champs à la demande : ?fields=id,title&expand=author
+
+    - fields : champs renvoyés (les noms inconnus sont ignorés) ;
+    - expand : relations imbriquées à développer, les autres relations
+      développables sont renvoyées sous forme d'identifiant.
+    Sans ces paramètres, la réponse garde sa forme complète.
+
+    La requête suit les champs renvoyés : seules leurs jointures
+    (select_related), colonnes (only) et annotations sont chargées.
+    """
+    # Relations imbriquées développables : {champ: relation du modèle}
+    expandable_fields = {}
+    # Colonnes lues par les champs calculés : {champ: [chemins pour only()]}
+    field_sources = {}
+    # Annotations calculées seulement si le champ est demandé
+    field_annotations = {}
+    # Colonnes toujours chargées (permissions, clés de tri)
+    required_fields = ()
+
+    def _get_list_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    def get_requested_fields(self):
+        """Champs demandés via ?fields=, ou None pour tous"""
+        return self._get_list_param('fields')
+
+    def get_requested_expand(self):
+        """Relations demandées via ?expand=, ou None pour la forme par défaut"""
+        return self._get_list_param('expand')
+
+    def is_sparse_request(self):
+        return self.request.method in SAFE_METHODS and (
+            self.get_requested_fields() is not None or self.get_requested_expand() is not None
+        )
+
+    def is_field_requested(self, name):
+        fields = self.get_requested_fields()
+        return fields is None or name in fields
+
+    def is_expanded(self, name):
+        expand = self.get_requested_expand()
+        return self.is_field_requested(name) and (expand is None or name in expand)
+
+    def get_serialized_field_names(self):
+        """Champs du serializer courant qui seront effectivement renvoyés"""
+        names = set(self.get_serializer_class().Meta.fields)
+        fields = self.get_requested_fields()
+        return names if fields is None else names & fields
+
+    def sparse_queryset(self, queryset):
+        """Adapte jointures, colonnes et annotations aux champs demandés"""
+        names = self.get_serialized_field_names()
+        annotations = {
+            name: expression
+            for name, expression in self.field_annotations.items()
+            if name in names
+        }
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        if not self.is_sparse_request():
+            return queryset
+
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        expanded = {
+            relation for name, relation in self.expandable_fields.items()
+            if name in names and self.is_expanded(name)
+        }
+        related = set(expanded)
+        columns = {'pk', *self.required_fields}
+        for name in names:
+            if name in self.expandable_fields:
+                # Relation réduite à son identifiant : la clé étrangère suffit
+                columns.add(self.expandable_fields[name])
+            elif name in self.field_sources:
+                for path in self.field_sources[name]:
+                    relation = path.split('__')[0]
+                    if relation not in expanded:
+                        columns.add(path)
+                    if '__' in path:
+                        related.add(relation)
+            elif name in model_fields:
+                columns.add(name)
+
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if self.get_requested_fields() is None:
+            # Seulement ?expand= : colonnes inchangées, jointures ajustées
+            return queryset
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred:
+            # only() déjà posé (ex. for_list()) : le restreindre sans l'élargir
+            columns = {column for column in columns if column == 'pk' or column in loaded}
+        return queryset.only(*columns)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = self.sparse_queryset(queryset)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.is_sparse_request():
+            self.sparse_serializer(getattr(serializer, 'child', serializer))
+        return serializer
+
+    def sparse_serializer(self, serializer):
+        """Retire les champs non demandés et réduit les relations non développées"""
+        fields = self.get_requested_fields()
+        for name in list(serializer.fields):
+            if fields is not None and name not in fields:
+                serializer.fields.pop(name)
+            elif name in self.expandable_fields and not self.is_expanded(name):
+                serializer.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class AsyncDispatchMixin:
+    """Base commune des vues servies par des handlers asynchrones"""
+
+    async def adispatch(self, request, handler, *args, **kwargs):
+        """dispatch() de DRF autour d'un handler asynchrone"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncHandlerMixin(AsyncDispatchMixin):
+    """
+    Handlers asynchrones d'une APIView (mode ASGI).
+
+    Avec settings.ASYNC_READS, une méthode HTTP pour laquelle la vue
+    définit a<méthode>() (apost()...) est servie par ce handler ; les
+    autres méthodes gardent la vue synchrone, exécutée dans un thread.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        handlers = {method for method in cls.http_method_names if hasattr(cls, f'a{method}')}
+        if not settings.ASYNC_READS or not handlers:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            method = request.method.lower()
+            if method not in handlers:
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.request = request
+            return await self.adispatch(request, getattr(self, f'a{method}'), *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        return csrf_exempt(async_view)
+
+
+class AsyncReadMixin(AsyncDispatchMixin):
+    """
+    Lectures servies par des handlers asynchrones (mode ASGI).
+
+    Avec settings.ASYNC_READS, les routes d'un ViewSet dont une action
+    figure dans async_read_actions deviennent des vues asynchrones :
+    l'action est servie par a<action>(), qui lit la base par l'ORM
+    asynchrone. Authentification, permissions et limitation (initial())
+    ainsi que la sérialisation restent synchrones et passent dans un
+    thread ; les autres méthodes de la route gardent la vue synchrone.
+    """
+    async_read_actions = ()
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        action_map = dict(view.actions)
+        if 'get' in action_map and 'head' not in action_map:
+            action_map['head'] = action_map['get']
+        reads = {
+            method: action for method, action in action_map.items()
+            if action in cls.async_read_actions
+        }
+        if not settings.ASYNC_READS or not reads:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            action = reads.get(request.method.lower())
+            if action is None:
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = action_map
+            for method, name in action_map.items():
+                setattr(self, method, getattr(self, name))
+            self.request = request
+            return await self.adispatch(request, getattr(self, f'a{action}'), *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        return csrf_exempt(async_view)
+
+    async def aget_object(self):
+        """get_object() par l'ORM asynchrone"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def aserialize(self, instance, many=False):
+        """
+        serializer.data dans un thread : les champs calculés peuvent lire
+        une colonne différée ou le stockage des fichiers
+        """
+        return await sync_to_async(lambda: self.get_serializer(instance, many=many).data)()
+
+    async def aget_paginated_response(self, page):
+        return self.get_paginated_response(await self.aserialize(page, many=True))
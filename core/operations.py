@@ -0,0 +1,88 @@
+from django.contrib.postgres.operations import CreateExtension
+from django.db import router
+from django.db.migrations.operations.base import Operation
+
+
+def extension_available(connection, name):
+    """Indique si le serveur PostgreSQL fournit l'extension"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_available_extensions WHERE name = %s', [name])
+        return bool(cursor.fetchone())
+
+
+def extension_installed(connection, name):
+    """Indique si l'extension est installée dans la base courante"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_extension WHERE extname = %s', [name])
+        return bool(cursor.fetchone())
+
+
+class CreateExtensionIfAvailable(CreateExtension):
+    """
+    Crée l'extension si le serveur la fournit, sinon ne fait rien.
+
+    Les fonctionnalités qui en dépendent (unaccent, pg_trgm...) doivent
+    vérifier extension_installed() et se replier sur un comportement simple.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if (schema_editor.connection.vendor != 'postgresql' or
+                not extension_available(schema_editor.connection, self.name)):
+            return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return 'Creates extension %s if available' % self.name
+
+
+class AddTrigramIndex(Operation):
+    """
+    Index GIN gin_trgm_ops sur une colonne texte, créé seulement si pg_trgm
+    est installé (voir CreateExtensionIfAvailable).
+
+    L'index n'existe qu'en base : il sert les lookups trgm_icontains sans
+    apparaître dans Meta.indexes. Avec concurrently=True, la migration doit
+    être déclarée atomic = False.
+    """
+    reversible = True
+
+    def __init__(self, model_name, field_name, name, concurrently=True):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+        self.concurrently = concurrently
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        connection = schema_editor.connection
+        if connection.vendor != 'postgresql' or not extension_installed(connection, 'pg_trgm'):
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not router.allow_migrate_model(connection.alias, model):
+            return
+        column = model._meta.get_field(self.field_name).column
+        schema_editor.execute(
+            'CREATE INDEX %s IF NOT EXISTS %s ON %s USING gin (%s gin_trgm_ops)' % (
+                'CONCURRENTLY' if self.concurrently else '',
+                schema_editor.quote_name(self.name),
+                schema_editor.quote_name(model._meta.db_table),
+                schema_editor.quote_name(column),
+            )
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute('DROP INDEX %s IF EXISTS %s' % (
+            'CONCURRENTLY' if self.concurrently else '',
+            schema_editor.quote_name(self.name),
+        ))
+
+    def describe(self):
+        return 'Create trigram index %s on %s.%s' % (self.name, self.model_name, self.field_name)
+
+    @property
+    def migration_name_fragment(self):
+        return '%s_%s_trgm' % (self.model_name.lower(), self.field_name)
@@ -0,0 +1,203 @@
+import datetime
+import json
+from base64 import b64decode, b64encode
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """Conserve les microsecondes des dates (DjangoJSONEncoder les tronque)"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Pagination par curseur sur une clé composite (champ de tri, id).
+
+    Le champ de tri est celui demandé via ?ordering= (parmi les ordering_fields
+    de la vue), l'id sert de départage. Chaque page est une simple condition
+    de seuil sur l'index : pas d'OFFSET ni de COUNT(*), la page N coûte
+    autant que la page 1.
+
+    Les NULL sont traités comme les plus grandes valeurs, comme le fait
+    PostgreSQL par défaut (ASC NULLS LAST / DESC NULLS FIRST).
+    
+    paginate_queryset accepte aussi une liste de querysets disjoints : chaque
+    branche est limitée à la page demandée sur son propre index, puis les
+    branches sont fusionnées en UNION ALL triée.
+    """
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        query = self.get_page_query(queryset, request, view)
+        if query is None:
+            return None
+        return self.set_page(list(query))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() avec la page lue par l'ORM asynchrone"""
+        query = self.get_page_query(queryset, request, view)
+        if query is None:
+            return None
+        return self.set_page([row async for row in query])
+
+    def get_page_query(self, queryset, request, view=None, fields=None):
+        """
+        Requête (non évaluée) de la page demandée, None sans pagination.
+        fields : lignes lues en dictionnaires réduits à ces colonnes
+        (plus l'id et la clé de tri)
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        branches = list(queryset) if isinstance(queryset, (list, tuple)) else [queryset]
+        self.base_url = request.build_absolute_uri()
+        self.key_field, self.descending = self.get_keyset(request, branches[0], view)
+        self.nullable = self._is_nullable(branches[0].model, self.key_field)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        order_by = self.get_order_by(reverse)
+
+        # Un élément de plus pour savoir s'il existe une page suivante
+        limit = self.page_size + 1
+        windows = []
+        for branch in branches:
+            branch = branch.order_by(*order_by)
+            if self.cursor is not None:
+                branch = branch.filter(self.get_boundary(self.cursor.position, reverse))
+            if fields is not None:
+                branch = branch.values(*dict.fromkeys(('id', self.key_field, *fields)))
+            windows.append(branch[:limit])
+
+        if len(windows) == 1:
+            return windows[0]
+        combined = windows[0].union(*windows[1:], all=True)
+        return combined.order_by(*order_by)[:limit]
+
+    def set_page(self, results):
+        """Découpe les lignes lues (page_size + 1) en page et liens"""
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset(self, request, queryset, view):
+        """Retourne (champ, décroissant) pour le premier critère de tri"""
+        if view is not None and getattr(view, 'filter_backends', None):
+            ordering = self.get_ordering(request, queryset, view)
+        else:
+            ordering = (self.ordering,)
+        order = ordering[0] if ordering else self.ordering
+        field = order.lstrip('-')
+        return ('id' if field == 'pk' else field), order.startswith('-')
+
+    def get_order_by(self, reverse=False):
+        """Tri complet (champ, id) dans le sens de parcours demandé"""
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        if self.key_field == 'id':
+            return (f'{prefix}id',)
+        return (f'{prefix}{self.key_field}', f'{prefix}id')
+
+    def get_boundary(self, position, reverse=False):
+        """
+        Condition « après la position » dans le sens de parcours.
+
+        La borne large (lte/gte) est répétée devant le OR pour que
+        PostgreSQL l'utilise comme condition d'index.
+        """
+        value, pk = position
+        field = self.key_field
+        if field == 'id':
+            lookup = 'lt' if self.descending != reverse else 'gt'
+            return Q(**{f'id__{lookup}': pk})
+
+        if self.descending != reverse:
+            # Vers les valeurs plus petites (les NULL sont déjà passés)
+            if value is None:
+                return Q(**{f'{field}__isnull': False}) | Q(**{f'{field}__isnull': True, 'id__lt': pk})
+            return Q(**{f'{field}__lte': value}) & (Q(**{f'{field}__lt': value}) | Q(id__lt=pk))
+
+        # Vers les valeurs plus grandes (les NULL viennent en dernier)
+        if value is None:
+            return Q(**{f'{field}__isnull': True, 'id__gt': pk})
+        condition = Q(**{f'{field}__gte': value}) & (Q(**{f'{field}__gt': value}) | Q(id__gt=pk))
+        if self.nullable:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            value, pk, reverse = json.loads(b64decode(encoded.encode('ascii')))
+            value = self._to_python(value)
+            pk = int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=bool(reverse), position=(value, pk))
+
+    def encode_cursor(self, cursor):
+        value, pk = cursor.position
+        payload = json.dumps([value, pk, int(cursor.reverse)], cls=CursorJSONEncoder)
+        encoded = b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Page précédente vide : on repart du début de la liste
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        position = self._get_position_from_instance(self.page[-1])
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0])
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering=None):
+        if isinstance(instance, dict):
+            return instance[self.key_field], instance['id']
+        return getattr(instance, self.key_field), instance.pk
+
+    def _to_python(self, value):
+        if value is None or self._model_field is None:
+            return value
+        return self._model_field.to_python(value)
+
+    def _is_nullable(self, model, field_name):
+        try:
+            self._model_field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            # Annotation : pas de conversion ni de NULL attendus
+            self._model_field = None
+            return False
+        return self._model_field.null
@@ -0,0 +1,76 @@
+import logging
+import resource
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+# Lignes de /proc/self/smaps_rollup reprises dans le rapport mémoire
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def _compile_patterns(patterns):
+    count = 0
+    for pattern in patterns:
+        # Expression régulière compilée à la première lecture, puis gardée
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            count += _compile_patterns(pattern.url_patterns)
+        else:
+            count += 1
+    return count
+
+
+def warm_routes():
+    """
+    Importe les urlconf, compile l'expression de chaque route et remplit
+    les tables de reverse(). Retourne le nombre de routes.
+    """
+    resolver = get_resolver()
+    count = _compile_patterns(resolver.url_patterns)
+    resolver.reverse_dict
+    return count
+
+
+def warm_connections(keep=True):
+    """
+    Ouvre une connexion par base. keep=False la referme aussitôt : elle
+    vérifie seulement que la base répond (workers dont les requêtes
+    s'exécutent dans d'autres threads, qui ont leurs propres connexions).
+    Avec un pool, celui-ci est rempli jusqu'à min_size et la connexion
+    lui est rendue, utilisable par tous les threads.
+    """
+    for connection in connections.all():
+        pooled = getattr(connection, 'pool', None) is not None
+        try:
+            connection.ensure_connection()
+            if pooled:
+                connection.fill_pool()
+        except Exception:
+            logger.warning('Base %s injoignable au démarrage du worker', connection.alias, exc_info=True)
+        if pooled or not keep:
+            connection.close()
+
+
+def memory_usage():
+    """Mémoire du processus en Kio {Rss, Pss, Shared, Private} (Linux), sinon le pic de RSS"""
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            values = {}
+            for line in smaps:
+                name, _, rest = line.partition(':')
+                if name in SMAPS_FIELDS:
+                    values[name] = int(rest.split()[0])
+    except OSError:
+        return {'MaxRss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return {
+        'Rss': values['Rss'],
+        'Pss': values['Pss'],
+        'Shared': values['Shared_Clean'] + values['Shared_Dirty'],
+        'Private': values['Private_Clean'] + values['Private_Dirty'],
+    }
+
+
+def memory_report():
+    """« Rss=120.5 Mio Pss=48.2 Mio ... » pour les journaux"""
+    return ' '.join(f'{name}={kib / 1024:.1f} Mio' for name, kib in memory_usage().items())
@@ -0,0 +1,229 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.models import User
+from apps.publications.models import Publication
+from core.db.middleware import PIN_COOKIE
+from core.db.pool import ConnectionPool, PoolTimeout, close_pools
+from core.db.routers import (
+    PrimaryReplicaRouter,
+    RoutingState,
+    primary_reads,
+    replica_health,
+    routing_state
+)
+
+
+class ConnectionPoolTest(TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool('test', max_size=2, timeout=0.05, check_after=0)
+        self.addCleanup(self.pool.close)
+    
+    def getconn(self):
+        return self.pool.getconn(connection.new_pool_connection)
+    
+    def test_returned_connection_is_reused(self):
+        conn = self.getconn()
+        self.pool.putconn(conn)
+        self.assertIs(self.getconn(), conn)
+        self.pool.putconn(conn)
+        self.assertEqual(self.pool.stats()['created'], 1)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+    
+    def test_timeout_when_exhausted(self):
+        first, second = self.getconn(), self.getconn()
+        with self.assertRaises(PoolTimeout):
+            self.getconn()
+        stats = self.pool.stats()
+        self.assertEqual((stats['in_use'], stats['waits'], stats['timeouts']), (2, 1, 1))
+        self.pool.putconn(first)
+        self.pool.putconn(second)
+    
+    def test_open_transaction_rolled_back(self):
+        conn = self.getconn()
+        conn.autocommit = False
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.pool.putconn(conn)
+        self.assertEqual(conn.info.transaction_status, 0)
+        self.assertIs(self.getconn(), conn)
+        self.pool.putconn(conn)
+    
+    def test_broken_connections_replaced(self):
+        conn = self.getconn()
+        conn.close()
+        self.pool.putconn(conn)
+        self.assertEqual(self.pool.stats()['size'], 0)
+        
+        # Coupée pendant son inactivité : écartée par la vérification
+        conn = self.getconn()
+        self.pool.putconn(conn)
+        conn.close()
+        replacement = self.getconn()
+        self.assertIsNot(replacement, conn)
+        self.pool.putconn(replacement)
+        self.assertEqual(self.pool.stats()['failed_checks'], 1)
+    
+    def test_idle_connections_expire_down_to_min_size(self):
+        pool = ConnectionPool('idle', min_size=1, max_size=3, max_idle=0)
+        self.addCleanup(pool.close)
+        pool.fill(connection.new_pool_connection)
+        conns = [pool.getconn(connection.new_pool_connection) for _ in range(3)]
+        for conn in conns:
+            pool.putconn(conn)
+        pool.putconn(pool.getconn(connection.new_pool_connection))
+        self.assertEqual(pool.stats()['size'], 1)
+        self.assertEqual(pool.stats()['closed'], 2)
+
+
+class DatabasePoolEndpointTest(APITestCase):
+    def setUp(self):
+        self.url = reverse('internal:db-pool')
+        self.admin = User.objects.create_user(
+            email='admin-pool@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+    
+    def test_admin_sees_pool_and_server_connections(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        name = f"default/{connection.settings_dict['NAME']}"
+        self.assertGreaterEqual(response.data['pools'][name]['in_use'], 1)
+        self.assertGreater(response.data['server']['max_connections'], 0)
+    
+    def test_reserved_to_admins(self):
+        user = User.objects.create_user(email='user-pool@example.com', password='testpass123')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Deux connexions : le « réplica » lit la même base de test que le primaire"""
+    
+    def setUp(self):
+        cache.clear()
+        replica_health.reset()
+        self.add_database('replica', connection.settings_dict)
+        self.author = User.objects.create_user(
+            email='replica@example.com',
+            password='testpass123',
+            first_name='Replica',
+            last_name='Test'
+        )
+        self.publication = Publication.objects.create(
+            author=self.author,
+            title='Répliquée',
+            content='Contenu',
+            status=Publication.Status.PUBLISHED
+        )
+        self.list_url = reverse('publications:publication-list')
+        self.client = APIClient()
+    
+    def add_database(self, alias, settings_dict):
+        connections.settings[alias] = {**settings_dict}
+        
+        def remove():
+            connections[alias].close()
+            close_pools(alias)
+            del connections[alias]
+            del connections.settings[alias]
+        self.addCleanup(remove)
+    
+    def get_routed(self, path, **extra):
+        """Réponse, et nombre de requêtes sur (primaire, réplica)"""
+        with CaptureQueriesContext(connection) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(path, **extra)
+        return response, len(primary), len(replica)
+    
+    def reader_header(self):
+        """Lecteur authentifié (réponses hors cache partagé), compte déjà en cache"""
+        reader = User.objects.create_user(
+            email='reader@example.com',
+            password='testpass123',
+            first_name='Reader',
+            last_name='Test'
+        )
+        header = f'Bearer {AccessToken.for_user(reader)}'
+        self.client.get(self.list_url, HTTP_AUTHORIZATION=header)
+        return header
+    
+    def test_safe_reads_go_to_replica(self):
+        response, primary, replica = self.get_routed(self.list_url, HTTP_AUTHORIZATION=self.reader_header())
+        self.assertEqual(response.data['results'][0]['id'], self.publication.pk)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+    
+    def test_shared_cache_filled_from_primary(self):
+        response, primary, replica = self.get_routed(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        response, primary, replica = self.get_routed(self.list_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual((primary, replica), (0, 0))
+    
+    def test_replica_chosen_once_per_request(self):
+        router = PrimaryReplicaRouter()
+        state = RoutingState(replica_reads=True)
+        token = routing_state.set(state)
+        try:
+            with mock.patch.object(replica_health, 'available', return_value=True) as available:
+                aliases = {router.db_for_read(Publication) for _ in range(5)}
+            self.assertEqual(aliases, {'replica'})
+            self.assertEqual(available.call_count, 1)
+            with primary_reads():
+                self.assertEqual(router.db_for_read(Publication), 'default')
+            self.assertEqual(router.db_for_read(Publication), 'replica')
+        finally:
+            routing_state.reset(token)
+    
+    def test_router_keeps_accounts_and_writes_on_primary(self):
+        router = PrimaryReplicaRouter()
+        token = routing_state.set(RoutingState(replica_reads=True))
+        try:
+            self.assertEqual(router.db_for_read(Publication), 'replica')
+            self.assertEqual(router.db_for_read(User), 'default')
+            router.db_for_write(Publication)
+            # Après une écriture, la requête lit ses propres données
+            self.assertEqual(router.db_for_read(Publication), 'default')
+        finally:
+            routing_state.reset(token)
+        # Hors requête (commandes, tâches) : primaire
+        self.assertEqual(router.db_for_read(Publication), 'default')
+    
+    def test_writer_sticks_to_primary(self):
+        header = f'Bearer {AccessToken.for_user(self.author)}'
+        response = self.client.post(
+            self.list_url, {'title': 'Nouvelle', 'content': 'Contenu'}, HTTP_AUTHORIZATION=header
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        
+        # Sans le cookie : reconnu par son token
+        self.client.cookies.clear()
+        response, primary, replica = self.get_routed(
+            reverse('publications:publication-my-publications'), HTTP_AUTHORIZATION=header
+        )
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(replica, 0)
+        
+        # Un autre client lit toujours sur le réplica
+        _, primary, replica = self.get_routed(self.list_url, HTTP_AUTHORIZATION=self.reader_header())
+        self.assertEqual(primary, 0)
+    
+    def test_unavailable_replica_falls_back_to_primary(self):
+        self.add_database('replica_down', {**connection.settings_dict, 'HOST': '/nonexistent', 'OPTIONS': {}})
+        with self.settings(DATABASE_REPLICAS=['replica_down']):
+            with self.assertLogs('core.db.routers', 'WARNING'):
+                response = self.client.get(self.list_url, HTTP_AUTHORIZATION=self.reader_header())
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(replica_health.available('replica_down'))
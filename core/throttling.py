@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from .localstore import SharedLocalStore
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """« 10/min » -> (capacité 10, 10 jetons rendus par minute en jetons/seconde)"""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class TokenBucketStore:
+    """
+    Seaux à jetons partagés par les workers d'une machine (SQLite, sans Redis).
+
+    Un seau plein est implicite : seuls les seaux entamés ont une ligne.
+    Les refus sont mémorisés dans le processus jusqu'à la date de retour
+    d'un jeton : un client déjà refusé l'est sans accès au magasin.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL
+        ) WITHOUT ROWID;
+    """
+    # Nettoyage des seaux redevenus pleins, une fois sur N passages
+    PRUNE_EVERY = 1000
+    PRUNE_AFTER = 86400
+
+    def __init__(self, name='throttle'):
+        self.store = SharedLocalStore(name, self.SCHEMA)
+        self._blocked = {}
+        self._lock = threading.Lock()
+
+    def blocked_for(self, keys, now):
+        """Attente restante si l'une des clés a déjà été refusée, sinon 0"""
+        with self._lock:
+            return max((self._blocked.get(key, 0) - now for key in keys), default=0)
+
+    def consume(self, buckets, now=None):
+        """
+        Prend un jeton dans chacun des seaux [(clé, capacité, débit)], ou
+        dans aucun. Retourne 0 si accepté, sinon l'attente en secondes.
+        """
+        now = now or time.time()
+        wait = self.blocked_for([key for key, _, _ in buckets], now)
+        if wait > 0:
+            return wait
+
+        wait = 0
+        with self.store.transaction() as conn:
+            levels = {}
+            for key, capacity, rate in buckets:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                levels[key] = tokens
+            if not wait:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                    [(key, tokens - 1, now) for key, tokens in levels.items()]
+                )
+            if random.randrange(self.PRUNE_EVERY) == 0:
+                conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.PRUNE_AFTER,))
+
+        if wait:
+            with self._lock:
+                for key, tokens in levels.items():
+                    if tokens < 1:
+                        self._blocked[key] = now + wait
+                if len(self._blocked) > 10000:
+                    self._blocked = {k: until for k, until in self._blocked.items() if until > now}
+        return wait
+
+    def reset(self):
+        self.store.execute('DELETE FROM buckets')
+        with self._lock:
+            self._blocked.clear()
+
+
+bucket_store = TokenBucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Limitation par seaux à jetons, par route (scope) et par identité.
+
+    Chaque identité retournée par get_identities() a son débit dans
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] sous « scope.identité »
+    (ex. login.ip, login.email) ; la requête doit obtenir un jeton de
+    chacun de ses seaux. Le refus renvoie 429 avec Retry-After.
+    """
+
+    scope = None
+
+    def __init__(self, scope=None):
+        self.scope = scope or self.scope
+
+    def get_identities(self, request, view):
+        """{nom de politique: identifiant} ; None pour ne pas limiter"""
+        return {'ip': self.get_ident(request)}
+
+    def get_buckets(self, request, view):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        buckets = []
+        for policy, ident in self.get_identities(request, view).items():
+            rate = rates.get(f'{self.scope}.{policy}')
+            if ident is None or rate is None:
+                continue
+            capacity, refill = parse_rate(rate)
+            buckets.append((f'{self.scope}:{policy}:{ident}', capacity, refill))
+        return buckets
+
+    def allow_request(self, request, view):
+        buckets = self.get_buckets(request, view)
+        if not buckets:
+            return True
+        self._wait = bucket_store.consume(buckets)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
+
+
+class UserOrIPThrottle(TokenBucketThrottle):
+    """Par utilisateur connecté, sinon par adresse IP"""
+
+    def get_identities(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return {'user': request.user.pk}
+        return {'ip': self.get_ident(request)}
+
+
+class AnonymousThrottle(TokenBucketThrottle):
+    """Par adresse IP, pour les seuls visiteurs anonymes"""
+
+    def get_identities(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return {}
+        return {'ip': self.get_ident(request)}
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import db_pool_view
+
+app_name = 'internal'
+
+urlpatterns = [
+    path('db-pool/', db_pool_view, name='db-pool'),
+]
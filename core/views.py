@@ -0,0 +1,32 @@
+import os
+from django.db import connection
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .db.pool import pool_stats
+
+SERVER_CONNECTIONS_SQL = """
+    SELECT current_setting('max_connections')::int,
+           (SELECT count(*) FROM pg_stat_activity WHERE datname = current_database())
+"""
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_view(request):
+    """
+    Pools de connexions du worker qui répond, et connexions vues par
+    PostgreSQL (tous les workers et services) pour dimensionner max_connections
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SERVER_CONNECTIONS_SQL)
+        max_connections, open_connections = cursor.fetchone()
+    
+    return Response({
+        'pid': os.getpid(),
+        'pools': pool_stats(),
+        'server': {
+            'max_connections': max_connections,
+            'connections': open_connections,
+        },
+    })
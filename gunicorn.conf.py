@@ -0,0 +1,89 @@
+"""
+Profil de service gunicorn (chargé automatiquement depuis la racine du projet).
+
+- ASGI (workers uvicorn) par défaut, WSGI avec ASYNC_READS=False ;
+- application chargée une fois dans le maître (preload_app) puis gelée
+  (gc.freeze) : les workers partagent ces pages en copie sur écriture ;
+- chaque worker compile les routes et ouvre ses connexions avant sa
+  première requête, puis journalise sa mémoire ;
+- workers recyclés après max_requests (± jitter) requêtes.
+
+Variables : WEB_CONCURRENCY, GUNICORN_THREADS, GUNICORN_WORKER_CLASS,
+GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_PRELOAD.
+"""
+
+import gc
+import os
+from decouple import config
+
+
+def _cpu_count():
+    # Processeurs réellement attribués au processus (conteneurs)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cpus = _cpu_count()
+asgi = config('ASYNC_READS', default=True, cast=bool)
+
+wsgi_app = 'config.asgi:application' if asgi else 'config.wsgi:application'
+if asgi:
+    # Une boucle d'événements par processeur
+    worker_class = config('GUNICORN_WORKER_CLASS', default='uvicorn.workers.UvicornWorker')
+    workers = config('WEB_CONCURRENCY', default=cpus + 1, cast=int)
+    threads = 1
+else:
+    # Au-delà d'un thread, gunicorn passe en workers gthread
+    worker_class = config('GUNICORN_WORKER_CLASS', default='sync')
+    workers = config('WEB_CONCURRENCY', default=2 * cpus + 1, cast=int)
+    threads = config('GUNICORN_THREADS', default=2 if cpus == 1 else 1, cast=int)
+
+preload_app = config('GUNICORN_PRELOAD', default=True, cast=bool)
+max_requests = config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = config('GUNICORN_MAX_REQUESTS_JITTER', default=max_requests // 10, cast=int)
+
+
+def when_ready(server):
+    """Maître : application chargée, avant la création des workers"""
+    if not preload_app:
+        return
+    from django.db import connections
+    from core.db.pool import close_pools
+    from core.serving import memory_report, warm_routes
+
+    routes = warm_routes()
+    # Aucune connexion ne doit être héritée par les workers
+    connections.close_all()
+    close_pools()
+    gc.collect()
+    gc.freeze()
+    server.log.info('Application préchargée (%d routes) : %s', routes, memory_report())
+
+
+def post_worker_init(worker):
+    """Worker (après le fork et le chargement) : routes et connexions prêtes avant la première requête"""
+    from gunicorn.workers.sync import SyncWorker
+    from core.serving import memory_report, warm_connections, warm_routes
+
+    warm_routes()
+    # Sans pool, seul le worker sync sert ses requêtes dans ce thread
+    # (gthread et uvicorn ont un thread par requête, avec leur connexion)
+    warm_connections(keep=type(worker) is SyncWorker)
+    worker.log.info('Worker %s prêt : %s', worker.pid, memory_report())
+
+
+def on_exit(server):
+    """Arrêt : les vues encore en tampon sont écrites (disque non conservé au redéploiement)"""
+    if not preload_app:
+        return
+    from django.db import connections
+    from apps.publications.services import view_counter
+
+    try:
+        view_counter.flush()
+    except Exception:
+        server.log.exception('Échec du flush des compteurs de vues')
+    finally:
+        connections.close_all()